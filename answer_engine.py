@@ -1,10 +1,52 @@
+import os
 import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from .schulkontext import SchulKontext
 from .safety_guardrails import SafetyGuard
 from .knowledge_verification import KnowledgeVerifier
 from .deepseek_engine import DeepseekEngine
 from .hybrid_inference_router import HybridInferenceRouter, QuestionClassifier
+from .cache_tier import CacheTier
+from .llama_scheduler import PRIORITAET_NORMAL, PRIORITAET_SAFETY, Abbruch
+from . import keyword_matcher
+from .message_analysis import MessageAnalysis, registriere_verwandte
+
+# Höchstens so lange (Sekunden) wartet eine Anfrage auf das lokale Modell
+LLAMA_TIMEOUT = float(os.getenv("SULEE_LLAMA_TIMEOUT", "60"))
+
+# Hedged Requests: nach dem Budget läuft Llama parallel zu DeepSeek.
+# SULEE_HEDGE_BUDGET (Sekunden) fest setzen, sonst zählt das live p95 von DeepSeek.
+HEDGE_AKTIV = os.getenv("SULEE_HEDGE", "1") != "0"
+HEDGE_BUDGET = float(os.environ["SULEE_HEDGE_BUDGET"]) if os.getenv("SULEE_HEDGE_BUDGET") else None
+HEDGE_BUDGET_STANDARD = 3.0  # solange es noch keine Messwerte gibt
+# Harte Obergrenze für das ganze Rennen; danach wird aufgegeben statt weiter zu warten
+HEDGE_TIMEOUT = float(os.getenv("SULEE_HEDGE_TIMEOUT", str(LLAMA_TIMEOUT + 5)))
+HEDGE_WORKER = 16
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKER, thread_name_prefix="sulee-hedge")
+# Freie Worker je Backend (halbe-halbe, damit hängende DeepSeek-Aufrufe die Absicherung
+# nicht aussperren). Was keinen Platz bekommt, wird nicht in die Warteschlange hinter
+# hängende Aufrufe gestellt, sondern direkt (bzw. gar nicht) ausgeführt
+_hedge_plaetze = {
+    "deepseek": threading.BoundedSemaphore(HEDGE_WORKER // 2),
+    "llama": threading.BoundedSemaphore(HEDGE_WORKER // 2),
+}
+
+
+def _hedge_starten(backend: str, funktion, *args):
+    """Startet ``funktion`` im Hedge-Pool, falls für ``backend`` ein Worker frei ist, sonst None."""
+    plaetze = _hedge_plaetze[backend]
+    if not plaetze.acquire(blocking=False):
+        return None
+    try:
+        future = _hedge_pool.submit(funktion, *args)
+    except BaseException:
+        plaetze.release()
+        raise
+    future.add_done_callback(lambda _: plaetze.release())
+    return future
 
 # Lazy-Loading
 _llama_engine = None
@@ -14,20 +56,43 @@ _router = None
 def _get_router():
     global _router
     if _router is None:
-        _router = HybridInferenceRouter()
+        from . import llama_engine
+        _router = HybridInferenceRouter(llama_bereit=llama_engine.ist_bereit, cache=CacheTier(_get_deepseek_engine))
+        _router.registriere_probe("llama", _llama_probe)
+        _router.registriere_probe("deepseek", _deepseek_probe)
     return _router
 
+def _llama_probe() -> bool:
+    """Nur ein gescheitertes Laden zählt als Ausfall; "lädt noch" regelt schon llama_bereit."""
+    from .llama_engine import ist_fehlgeschlagen
+    return not ist_fehlgeschlagen()
+
+def _deepseek_probe() -> bool:
+    deepseek = _get_deepseek_engine()
+    return bool(deepseek) and deepseek.health_check()
+
 def _get_llama_engine():
+    """
+    Geteilte Llama-Instanz (eine pro Prozess, lädt im Hintergrund) hinter ihrem Scheduler.
+    Das Modell selbst ist nicht thread-sicher, alle Aufrufe laufen über die Warteschlange.
+    Wartet nicht: solange das Modell noch lädt, gibt es None.
+    """
     global _llama_engine
     if _llama_engine is None:
-        try:
-            from .llama_engine import LlamaEngine
-            _llama_engine = LlamaEngine()
-        except Exception as e:
-            print(f"[Warnung] Llama-Engine konnte nicht geladen werden: {e}")
+        from .llama_engine import ist_fehlgeschlagen
+        from .llama_scheduler import get_shared_scheduler
+        scheduler = get_shared_scheduler()
+        if scheduler is not None:
+            _llama_engine = scheduler
+        elif ist_fehlgeschlagen():
             _llama_engine = False
     return _llama_engine if _llama_engine else None
 
+def warm_up(praefixe=()):
+    """Beim Start aufrufen: lädt das lokale Modell im Hintergrund vor."""
+    from .llama_engine import starte_aufwaermen
+    return starte_aufwaermen(praefixe=praefixe)
+
 def _get_deepseek_engine():
     global _deepseek_engine
     if _deepseek_engine is None:
@@ -44,24 +109,38 @@ class AnswerEngine:
     NEU: Integriertes Biologisches & Intellektuelles Aging System.
     """
 
+    # Stichwörter für die schnellen Kategorie-Antworten (siehe _ist_*)
+    KATEGORIE_KEYWORDS = {
+        "gruss": ("hallo", "hi", "guten tag", "onkel"),
+        "familie": ("bruder", "mutter", "vater", "onkel", "andy", "zürich"),
+        "schule": ("schule", "lehrer", "fach", "prüfung"),
+    }
+
+    # Bekannte Personen/Orte: Alias -> Name (der erste passende Alias gewinnt)
+    KNOWN_RELATIVES = {
+        "andy": "Andy", "bruder": "Andy",
+        "mutter": "Mama", "vater": "Papa",
+        "mikael": "Onkel Mikael", "onkel": "Onkel Mikael", "onkel mikael": "Onkel Mikael",
+        "zürich": "Zürich", "toronto": "Toronto"
+    }
+
     def __init__(self, suleeki):
         self.suleeki = suleeki
         self.safety = SafetyGuard()
         self.verifier = KnowledgeVerifier()
         self.router = _get_router()
         self.classifier = QuestionClassifier()
+        self.hedge_statistik = {"gestartet": 0, "gewonnen_deepseek": 0, "gewonnen_llama": 0, "aufgegeben": 0}
+        self._hedge_lock = threading.Lock()
+        if os.getenv("SULEE_LLAMA_AUFWAERMEN", "1") != "0":
+            warm_up(praefixe=[self._llama_praefix(self._build_system_prompt())])
         
         # --- AGING SYSTEM ---
         # Simulierter Geburtstag für Tests. 
         # In Produktion: self.suleeki.backstory.get("geburtsdatum")
         self.geburtsdatum = datetime.strptime("2011-06-15", "%Y-%m-%d") # Beispiel: Start 13 Jahre alt
 
-        self.known_relatives = {
-            "andy": "Andy", "bruder": "Andy",
-            "mutter": "Mama", "vater": "Papa",
-            "mikael": "Onkel Mikael", "onkel": "Onkel Mikael", "onkel mikael": "Onkel Mikael",
-            "zürich": "Zürich", "toronto": "Toronto"
-        }
+        self.known_relatives = self.KNOWN_RELATIVES
 
     def _get_current_alter(self):
         """
@@ -110,26 +189,61 @@ class AnswerEngine:
         )
         return prompt
 
-    def _find_known_relative(self, frage: str):
-        q = frage.lower()
-        for alias, canon in self.known_relatives.items():
-            if alias in q:
-                return canon
-        return None
+    def _llama_praefix(self, system_prompt: str) -> str:
+        """Gemeinsamer Anfang aller Llama-Prompts (wird im KV-Cache wiederverwendet)."""
+        return f"{system_prompt}\n\n"
+
+    def _llama_auftrag(self, system_prompt: str, frage: str, question_type: str) -> dict:
+        """Argumente für den LlamaScheduler: Prompt, Präfix für den KV-Cache, Priorität."""
+        praefix = self._llama_praefix(system_prompt)
+        # Neue Altersstufe = neuer System-Prompt: der Worker wertet ihn einmal aus, danach aus dem Cache
+        return {
+            "prompt": f"{praefix}Frage: {frage}",
+            "praefix": praefix,
+            "prioritaet": PRIORITAET_SAFETY if question_type == "safety" else PRIORITAET_NORMAL,
+            "timeout": LLAMA_TIMEOUT,
+        }
+
+    def _find_known_relative(self, frage: str, analyse=None):
+        return (analyse or MessageAnalysis(frage)).verwandter
 
     # ---------------------------------------------------------
     # HAUPTFUNKTION
     # ---------------------------------------------------------
 
-    def generate_answer(self, frage: str) -> str:
-        frage_lower = frage.lower()
+    def generate_answer(self, frage: str, analyse: MessageAnalysis | None = None) -> str:
+        """``analyse``: die MessageAnalysis des Zuges, falls der Aufrufer sie schon hat."""
+        analyse = analyse or MessageAnalysis(frage)
+        vorab = self._vorab_antwort(frage, analyse)
+        if vorab is not None:
+            return vorab
+
+        # --- FALLBACK (DAS GEHIRN MIT ALTER) ---
+        return self._antwort_fallback_mit_alter(frage, analyse)
+
+    def generate_answer_stream(self, frage: str, analyse: MessageAnalysis | None = None):
+        """
+        Wie generate_answer, aber als Generator: KI-Antworten kommen Token für Token,
+        damit die UI schon nach dem ersten Token etwas anzeigen kann.
+        Schnelle Antworten (Safety, Wissen, Kategorien) kommen als ein Stück.
+        """
+        analyse = analyse or MessageAnalysis(frage)
+        vorab = self._vorab_antwort(frage, analyse)
+        if vorab is not None:
+            yield vorab
+            return
+        yield from self._antwort_fallback_stream(frage, analyse)
+
+    def _vorab_antwort(self, frage: str, analyse: MessageAnalysis):
+        """Alles vor dem KI-Fallback. Gibt None zurück, wenn die KI ran muss."""
+        frage_lower = analyse.text_low
 
         # Safety first: kritische / medizinische Fragen (MIT ALTER)
         alter = self.suleeki.status.get("alter", 13) # Alter holen
 
-        if self.safety.is_critical_question(frage_lower):
+        if self.safety.is_critical_question(frage_lower, analyse):
             return self.safety.critical_response(frage_lower, alter) # <--- NEU
-        if self.safety.is_medical_question(frage_lower):
+        if self.safety.is_medical_question(frage_lower, analyse):
             return self.safety.medical_response(frage_lower, alter)   # <--- NEU
 
         # Knowledge Check
@@ -140,34 +254,33 @@ class AnswerEngine:
             return gelernt
 
         # --- KATEGORIEN (Behalten wir für schnelle Antworten) ---
-        if self._ist_gruss(frage_lower):
-            return self._antwort_gruss(frage_lower)
-        if self._ist_familiefrage(frage_lower):
-            return self._antwort_familie(frage_lower)
-        if self._ist_schulfrage(frage_lower):
+        if self._ist_gruss(analyse):
+            return self._antwort_gruss(frage_lower, analyse)
+        if self._ist_familiefrage(analyse):
+            return self._antwort_familie(frage_lower, analyse)
+        if self._ist_schulfrage(analyse):
             return self._antwort_schule(frage_lower)
         
         # ... (Die anderen Checks für Musik, Emotion, etc. können hier eingefügt werden, 
         # ich lasse sie hier raus, um den Code lesbar zu halten, sie bleiben gleich wie vorher) ...
 
-        # --- FALLBACK (DAS GEHIRN MIT ALTER) ---
-        return self._antwort_fallback_mit_alter(frage)
+        return None
 
     # ---------------------------------------------------------
     # HILFSFUNKTIONEN
     # ---------------------------------------------------------
 
-    def _ist_gruss(self, frage): return any(w in frage for w in ["hallo", "hi", "guten tag", "onkel"])
-    def _ist_familiefrage(self, frage): return any(w in frage for w in ["bruder", "mutter", "vater", "onkel", "andy", "zürich"])
-    def _ist_schulfrage(self, frage): return any(w in frage for w in ["schule", "lehrer", "fach", "prüfung"])
+    def _ist_gruss(self, analyse): return analyse.hat("antwort.gruss")
+    def _ist_familiefrage(self, analyse): return analyse.hat("antwort.familie")
+    def _ist_schulfrage(self, analyse): return analyse.hat("antwort.schule")
 
     # ---------------------------------------------------------
     # ANTWORTEN (Adaptiert an Aging)
     # ---------------------------------------------------------
 
-    def _antwort_gruss(self, frage):
+    def _antwort_gruss(self, frage, analyse=None):
         bio = self._get_current_alter()
-        rel = self._find_known_relative(frage.lower())
+        rel = self._find_known_relative(frage, analyse)
         
         if rel:
             if "onkel" in rel.lower():
@@ -185,11 +298,12 @@ class AnswerEngine:
         else:
             return "Hallo. Ich freue mich, dich kennenzulernen."
 
-    def _antwort_familie(self, frage):
-        rel = self._find_known_relative(frage.lower())
+    def _antwort_familie(self, frage, analyse=None):
+        analyse = analyse or MessageAnalysis(frage)
+        rel = self._find_known_relative(frage, analyse)
         if rel and "onkel" in rel.lower():
              return "Mein Onkel Mikael ist super! Er wohnt in Zürich und versteht Technik. Wir verstehen uns prächtig."
-        if "bruder" in frage or "andy" in frage:
+        if "Andy" in analyse.verwandte:  # "bruder" oder "andy"
             return "Andy? Der ist der beste Bruder der Welt. Er wohnt zwar weg, aber er ist immer für mich da."
         return "Meine Familie ist meine Ankerstelle."
 
@@ -206,63 +320,223 @@ class AnswerEngine:
     # DAS NEUE GEHIRN (FALLBACK MIT AI & AGING)
     # ---------------------------------------------------------
 
-    def _antwort_fallback_mit_alter(self, frage: str) -> str:
+    def _waehle_backend(self, frage: str, analyse: MessageAnalysis | None = None):
         """
-        Hier passiert die Magie.
-        Wir nutzen DeepSeek/Llama, aber geben ihnen den Alters-Prompt mit.
+        System-Prompt (mit Alter) bauen und Backend per Router wählen.
+        Bei einem Cache-Treffer ist das Backend "cache" und die Antwort steht schon fest.
         """
-        
-        # 1. System Prompt generieren (Das Alter!)
         system_prompt = self._build_system_prompt()
-        
-        raw_info = None
-        source = None
-        
-        # Router nutzen (wie vorher)
-        question_type = self.classifier.classify(frage)
-        chosen_backend = self.router.route(frage, question_type, False)
-        
+        question_type = self.classifier.classify(frage, analyse)
+        chosen_backend, cache_antwort = self.router.route_oder_cache(
+            frage, question_type, False, system_prompt, wissen=getattr(self.suleeki, "wissen", None)
+        )
         print(f"[Router] Alter: {self._get_current_alter()} | Backend: {chosen_backend}")
+        return system_prompt, chosen_backend, question_type, cache_antwort
 
-        # 2. Anfrage an das Backend
-        if chosen_backend == "deepseek":
-            try:
-                deepseek = _get_deepseek_engine()
-                if deepseek and deepseek.is_active:
-                    # Hier injizieren wir den Prompt!
-                    # Wir hoffen, dass deine Deepseek-Engine einen Parameter für System Prompt hat.
-                    # Falls nicht, hängen wir es an die Frage dran.
-                    
-                    # FALLBACK WEN ENGINE KEIN SYSTEM PROMPT HAT:
-                    # Wir übergeben den System-Prompt direkt an die Engine
-                    
-                    raw_info = deepseek.fetch_info(frage, system_prompt) # <-- Parameter anpassen, falls nötig!
-                    
-                    if raw_info and len(raw_info.strip()) > 10:
-                        source = "deepseek"
-            except Exception as e:
-                print(f"[DeepSeek Fehler]: {e}")
+    def _lerne(self, frage: str, raw_info: str, source: str):
+        """Speichert eine KI-Antwort fürs Gedächtnis."""
+        try:
+            self.suleeki.wissen.speichere_wissen(frage, raw_info, source=source, allow_overwrite=False)
+        except Exception:
+            pass
+
+    def _notfall_antwort(self) -> str:
+        antworten = ["Hmm, darüber muss ich nachdenken...", "Das ist tiefgründig.", "Erklär mir das mal genauer?"]
+        return random.choice(antworten)
 
+    def _cache_nicht_gezaehlt(self) -> bool:
+        """True, wenn keine Cache-Stufe vor DeepSeek sitzt; sonst hat sie die Anfrage im Cache schon gezählt."""
+        return self.router.cache is None
+
+    def _frage_deepseek(self, frage: str, system_prompt: str):
+        """DeepSeek mit Alters-Prompt. Gibt eine brauchbare Antwort oder None zurück und meldet dem Router."""
+        deepseek = _get_deepseek_engine()
+        if not deepseek or not deepseek.is_active:
+            return None
+        # Cache-Treffer sind kein Netzwerk-Aufruf: nicht in die Latenz-Statistik des Routers
+        cached = deepseek.cached_info(frage, system_prompt, zaehlen=self._cache_nicht_gezaehlt())
+        if cached is not None:
+            return cached if len(cached.strip()) > 10 else None
+        start = time.perf_counter()
+        raw_info = None
+        try:
+            # Wir übergeben den System-Prompt direkt an die Engine
+            raw_info = deepseek.fetch_info(frage, system_prompt, cache_zaehlen=False)
+        except Exception as e:
+            print(f"[DeepSeek Fehler]: {e}")
+        ok = bool(raw_info and len(raw_info.strip()) > 10)
+        self.router.melde_ergebnis("deepseek", time.perf_counter() - start, ok)
+        return raw_info if ok else None
+
+    def _frage_llama(self, frage: str, system_prompt: str, question_type: str, stop=None):
+        """
+        Lokales Modell über den Scheduler. Mit ``stop`` (llama_scheduler.Abbruch) wird gestreamt:
+        ein verlorenes Hedge-Rennen nimmt den Auftrag aus der Warteschlange bzw. beendet
+        die Generierung nach dem nächsten Token.
+        """
+        llama = _get_llama_engine()
+        if not llama:
+            return None
+        start = time.perf_counter()
+        raw_info = None
+        auftrag = self._llama_auftrag(system_prompt, frage, question_type)
+        try:
+            if stop is None:
+                raw_info = llama.generate(**auftrag)
+            else:
+                teile = []
+                strom = llama.generate_stream(**auftrag, abbruch=stop)
+                try:
+                    for teil in strom:
+                        if stop.is_set():
+                            return None
+                        teile.append(teil)
+                finally:
+                    strom.close()
+                if stop.is_set():
+                    # Abgebrochen, bevor (oder während) gerechnet wurde: kein Ergebnis für den Router
+                    return None
+                raw_info = "".join(teile)
+        except Exception as e:
+            print(f"[Llama Fehler]: {e}")
+        ok = bool(raw_info and len(raw_info.strip()) > 10)
+        self.router.melde_ergebnis("llama", time.perf_counter() - start, ok)
+        return raw_info if ok else None
+
+    def _hedged(self, frage: str, system_prompt: str, question_type: str):
+        """
+        Hedged Request: DeepSeek zuerst. Antwortet es nicht innerhalb des Budgets
+        (oder scheitert), läuft Llama parallel los; die erste brauchbare Antwort gewinnt.
+        Llama wird beim Verlieren abgebrochen, ein laufender DeepSeek-Aufruf nur
+        verlassen (seine Antwort landet trotzdem im Cache; er endet spätestens nach
+        dem Timeout der Session). Nach HEDGE_TIMEOUT wird das Rennen aufgegeben.
+        Ist der Pool voll, läuft DeepSeek ohne Absicherung im aufrufenden Thread.
+        Returns: (antwort, quelle) oder (None, None)
+        """
+        frist = time.monotonic() + HEDGE_TIMEOUT
+        primaer = _hedge_starten("deepseek", self._frage_deepseek, frage, system_prompt)
+        if primaer is None:
+            print("[Warnung] Hedge-Pool ausgelastet, DeepSeek ohne Absicherung")
+            return self._frage_deepseek(frage, system_prompt), "deepseek"
+        laeufer = {primaer: "deepseek"}
+        fertig, offen = wait(laeufer, timeout=self._hedge_budget())
+        if fertig and primaer.result():
+            return primaer.result(), "deepseek"
+
+        stop = Abbruch()
+        absicherung = _hedge_starten("llama", self._frage_llama, frage, system_prompt, question_type, stop)
+        if absicherung is not None:
+            print("[Router] DeepSeek zu langsam oder gescheitert, Llama läuft mit")
+            self._zaehle_hedge("gestartet")
+            laeufer[absicherung] = "llama"
+        offen = set(laeufer) - fertig
+        try:
+            while offen:
+                rest = frist - time.monotonic()
+                if rest <= 0:
+                    print(f"[Warnung] Keine Antwort nach {HEDGE_TIMEOUT:g}s, Hedge aufgegeben")
+                    self._zaehle_hedge("aufgegeben")
+                    return None, None
+                fertig, offen = wait(offen, timeout=rest, return_when=FIRST_COMPLETED)
+                for future in fertig:
+                    antwort = future.result()
+                    if antwort:
+                        if absicherung is not None:
+                            self._zaehle_hedge(f"gewonnen_{laeufer[future]}")
+                        return antwort, laeufer[future]
+            return None, None
+        finally:
+            # Verlierer freigeben: ein wartender Llama-Auftrag fliegt aus der Warteschlange
+            # des Schedulers, ein laufender bricht nach dem nächsten Token ab
+            stop.set()
+            for verlierer in laeufer:
+                verlierer.cancel()
+
+    def _zaehle_hedge(self, schluessel):
+        """Zählt in hedge_statistik (aus mehreren Threads, daher mit Lock)."""
+        with self._hedge_lock:
+            self.hedge_statistik[schluessel] += 1
+
+    def _hedge_budget(self) -> float:
+        """Wartezeit bis zum Absicherungs-Aufruf: fest per Umgebung oder das live p95 von DeepSeek."""
+        if HEDGE_BUDGET is not None:
+            return HEDGE_BUDGET
+        return self.router.latenz_budget("deepseek", standard=HEDGE_BUDGET_STANDARD)
+
+    def _antwort_fallback_mit_alter(self, frage: str, analyse: MessageAnalysis | None = None) -> str:
+        """
+        Hier passiert die Magie.
+        Wir nutzen DeepSeek/Llama, aber geben ihnen den Alters-Prompt mit.
+        """
+        
+        # 1. System Prompt generieren (Das Alter!) und Router nutzen (wie vorher)
+        system_prompt, chosen_backend, question_type, cache_antwort = self._waehle_backend(frage, analyse)
+        if cache_antwort:
+            # Schon einmal beantwortet: kein Modell nötig
+            return cache_antwort
+        
+        # 2. Anfrage an das Backend (DeepSeek ggf. mit Llama als Absicherung, siehe _hedged)
+        if chosen_backend == "deepseek" and HEDGE_AKTIV and _get_llama_engine():
+            raw_info, source = self._hedged(frage, system_prompt, question_type)
+        elif chosen_backend == "deepseek":
+            raw_info, source = self._frage_deepseek(frage, system_prompt), "deepseek"
         elif chosen_backend == "llama":
-            try:
-                llama = _get_llama_engine()
-                if llama:
-                    full_query = f"{system_prompt}\n\nFrage: {frage}"
-                    raw_info = llama.generate(full_query)
-                    if raw_info and len(raw_info.strip()) > 10:
-                        source = "llama"
-            except Exception as e:
-                print(f"[Llama Fehler]: {e}")
+            raw_info, source = self._frage_llama(frage, system_prompt, question_type), "llama"
+        else:
+            raw_info, source = None, None
 
         # 3. Antwort verarbeiten
         if raw_info and source:
             # Speichern fürs Gedächtnis
-            try:
-                self.suleeki.wissen.speichere_wissen(frage, raw_info, source=source, allow_overwrite=False)
-            except Exception:
-                pass
+            self._lerne(frage, raw_info, source)
             return raw_info
 
         # 4. Notfall-Fallback (wenn KI versagt)
-        antworten = ["Hmm, darüber muss ich nachdenken...", "Das ist tiefgründig.", "Erklär mir das mal genauer?"]
-        return random.choice(antworten)
\ No newline at end of file
+        return self._notfall_antwort()
+
+    def _antwort_fallback_stream(self, frage: str, analyse: MessageAnalysis | None = None):
+        """Streaming-Variante von _antwort_fallback_mit_alter."""
+        system_prompt, chosen_backend, question_type, cache_antwort = self._waehle_backend(frage, analyse)
+        if cache_antwort:
+            yield cache_antwort
+            return
+
+        teile = []
+        source = None
+        start = time.perf_counter()
+        try:
+            if chosen_backend == "deepseek":
+                deepseek = _get_deepseek_engine()
+                if deepseek and deepseek.is_active:
+                    cached = deepseek.cached_info(frage, system_prompt, zaehlen=self._cache_nicht_gezaehlt())
+                    if cached:
+                        # Aus dem Cache: kein Netzwerk-Aufruf, also keine Latenz-Meldung an den Router
+                        yield cached
+                        return
+                    source = "deepseek"
+                    for teil in deepseek.stream_info(frage, system_prompt, cache_zaehlen=False):
+                        teile.append(teil)
+                        yield teil
+
+            elif chosen_backend == "llama":
+                llama = _get_llama_engine()
+                if llama:
+                    source = "llama"
+                    for teil in llama.generate_stream(**self._llama_auftrag(system_prompt, frage, question_type)):
+                        teile.append(teil)
+                        yield teil
+        except Exception as e:
+            print(f"[{source or chosen_backend} Fehler]: {e}")
+
+        raw_info = "".join(teile).strip()
+        if source:
+            self.router.melde_ergebnis(source, time.perf_counter() - start, len(raw_info) > 10)
+        if source and len(raw_info) > 10:
+            self._lerne(frage, raw_info, source)
+        elif not teile:
+            # Notfall-Fallback (wenn KI versagt)
+            yield self._notfall_antwort()
+
+
+keyword_matcher.registriere("antwort", AnswerEngine.KATEGORIE_KEYWORDS)
+registriere_verwandte(AnswerEngine.KNOWN_RELATIVES)
@@ -0,0 +1,157 @@
+"""
+Begrenzter Antwort-Cache mit Ablaufzeit (TTL) für Sulees KI-Backends.
+LRU im Speicher, persistiert zeilenweise in SQLite: ein neuer Eintrag schreibt
+genau eine Zeile statt die ganze Cache-Datei neu.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class AntwortCache:
+    """
+    max_eintraege: Obergrenze, darüber wird der am längsten ungenutzte Eintrag verdrängt
+    ttl:           Lebensdauer eines Eintrags in Sekunden (None = unbegrenzt)
+
+    Die LRU-Reihenfolge lebt im Speicher. Nach einem Neustart gilt die
+    Reihenfolge der Erstellung, Treffer lösen keine Schreibzugriffe aus.
+    """
+
+    def __init__(self, datei, max_eintraege: int = 5000, ttl: float | None = 7 * 24 * 3600):
+        self.datei = str(datei)
+        self.max_eintraege = max_eintraege
+        self.ttl = ttl
+        ordner = os.path.dirname(self.datei)
+        if ordner:
+            os.makedirs(ordner, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.datei, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS antwort_cache (
+                schluessel TEXT PRIMARY KEY,
+                wert TEXT NOT NULL,
+                erstellt REAL NOT NULL,
+                ablauf REAL
+            )
+        """)
+        self._conn.commit()
+
+        self._eintraege = OrderedDict()   # schluessel -> (wert, ablauf), zuletzt genutzt am Ende
+        self.statistik_zaehler = {"treffer": 0, "fehlschlaege": 0, "verdraengt": 0, "abgelaufen": 0}
+        self._lade()
+
+    def _lade(self):
+        jetzt = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM antwort_cache WHERE ablauf IS NOT NULL AND ablauf <= ?", (jetzt,))
+            zeilen = self._conn.execute(
+                "SELECT schluessel, wert, ablauf FROM antwort_cache ORDER BY erstellt"
+            ).fetchall()
+            for schluessel, wert, ablauf in zeilen:
+                self._eintraege[schluessel] = (wert, ablauf)
+            self._verdraenge()
+
+    def _verdraenge(self):
+        while len(self._eintraege) > self.max_eintraege:
+            schluessel, _ = self._eintraege.popitem(last=False)
+            self._conn.execute("DELETE FROM antwort_cache WHERE schluessel = ?", (schluessel,))
+            self.statistik_zaehler["verdraengt"] += 1
+
+    def get(self, schluessel: str, default=None, zaehlen: bool = True):
+        """
+        Wert oder ``default``. Mit ``zaehlen=False`` geht die Abfrage nicht in
+        treffer/fehlschlaege ein (für eine zweite Abfrage derselben Anfrage,
+        z.B. nachdem die Cache-Stufe schon gefragt hat).
+        """
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is None:
+                if zaehlen:
+                    self.statistik_zaehler["fehlschlaege"] += 1
+                return default
+            wert, ablauf = eintrag
+            if ablauf is not None and ablauf <= time.time():
+                del self._eintraege[schluessel]
+                with self._conn:
+                    self._conn.execute("DELETE FROM antwort_cache WHERE schluessel = ?", (schluessel,))
+                self.statistik_zaehler["abgelaufen"] += 1
+                if zaehlen:
+                    self.statistik_zaehler["fehlschlaege"] += 1
+                return default
+            self._eintraege.move_to_end(schluessel)
+            if zaehlen:
+                self.statistik_zaehler["treffer"] += 1
+            return wert
+
+    def set(self, schluessel: str, wert: str, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        jetzt = time.time()
+        ablauf = jetzt + ttl if ttl else None
+        with self._lock, self._conn:
+            self._eintraege[schluessel] = (wert, ablauf)
+            self._eintraege.move_to_end(schluessel)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO antwort_cache (schluessel, wert, erstellt, ablauf) VALUES (?, ?, ?, ?)",
+                (schluessel, wert, jetzt, ablauf),
+            )
+            self._verdraenge()
+
+    def importiere_json(self, pfad, schluessel_fn=None) -> int:
+        """
+        Übernimmt einen alten JSON-Cache ({frage: antwort}), falls der Cache noch leer ist.
+        ``schluessel_fn`` rechnet alte Schlüssel auf das aktuelle Schlüssel-Format um.
+        """
+        if len(self) > 0 or not os.path.exists(pfad):
+            return 0
+        try:
+            with open(pfad, "r", encoding="utf-8") as f:
+                daten = json.load(f)
+        except Exception as e:
+            print(f"[Warnung] Konnte alten Cache nicht importieren: {e}")
+            return 0
+        jetzt = time.time()
+        ablauf = jetzt + self.ttl if self.ttl else None
+        # Eine Transaktion für alle Zeilen; erstellt steigt minimal an, damit die Reihenfolge erhalten bleibt
+        zeilen = [
+            (schluessel_fn(schluessel) if schluessel_fn else schluessel, wert, jetzt + i * 1e-6, ablauf)
+            for i, (schluessel, wert) in enumerate(daten.items())
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO antwort_cache (schluessel, wert, erstellt, ablauf) VALUES (?, ?, ?, ?)",
+                zeilen,
+            )
+            for schluessel, wert, _, ablauf_zeile in zeilen:
+                self._eintraege[schluessel] = (wert, ablauf_zeile)
+                self._eintraege.move_to_end(schluessel)
+            self._verdraenge()
+        return len(daten)
+
+    def statistik(self) -> dict:
+        with self._lock:
+            z = dict(self.statistik_zaehler)
+            z["eintraege"] = len(self._eintraege)
+        anfragen = z["treffer"] + z["fehlschlaege"]
+        z["trefferquote"] = round(z["treffer"] / anfragen, 3) if anfragen else 0.0
+        return z
+
+    def __contains__(self, schluessel):
+        # Nur Existenz-Prüfung, ohne Statistik und ohne LRU-Update
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            return eintrag is not None and (eintrag[1] is None or eintrag[1] > time.time())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._eintraege)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
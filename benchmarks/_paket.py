@@ -0,0 +1,17 @@
+"""
+Hilfsfunktion für die Benchmarks: importiert Module aus dem Sulee-Paket,
+auch wenn das Skript direkt aus dem Checkout gestartet wird.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+PAKET_WURZEL = Path(__file__).resolve().parent.parent
+
+
+def lade(modul: str):
+    """Importiert ``<paket>.<modul>`` (relative Importe im Paket bleiben gültig)."""
+    if str(PAKET_WURZEL.parent) not in sys.path:
+        sys.path.insert(0, str(PAKET_WURZEL.parent))
+    return importlib.import_module(f"{PAKET_WURZEL.name}.{modul}")
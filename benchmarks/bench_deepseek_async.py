@@ -0,0 +1,59 @@
+"""
+Benchmark: Durchsatz von AsyncDeepseekEngine gegen einen lokalen Stub-Server
+bei steigender Nebenläufigkeit (vs. sequentielle DeepseekEngine).
+
+Aufruf:  python benchmarks/bench_deepseek_async.py [--anfragen 64] [--verzoegerung 0.1]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from _paket import lade
+from deepseek_stub import starte_stub
+
+deepseek_engine = lade("deepseek_engine")
+deepseek_async = lade("deepseek_async")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--anfragen", type=int, default=64)
+    parser.add_argument("--verzoegerung", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    server, base_url = starte_stub(args.verzoegerung)
+    cache_ordner = Path(tempfile.mkdtemp())
+
+    sync_engine = deepseek_engine.DeepseekEngine(
+        api_key="stub", base_url=base_url, cache_file=cache_ordner / "sync.sqlite"
+    )
+    start = time.perf_counter()
+    for i in range(args.anfragen):
+        sync_engine.fetch_info(f"sync frage {i}")
+    dauer = time.perf_counter() - start
+    print(f"{'Modus':>14} {'Dauer s':>8} {'Anfragen/s':>11}")
+    print(f"{'sequentiell':>14} {dauer:>8.2f} {args.anfragen / dauer:>11.1f}")
+
+    async def lauf(concurrency):
+        engine = deepseek_async.AsyncDeepseekEngine(
+            api_key="stub", base_url=base_url, max_concurrency=concurrency,
+            cache_file=cache_ordner / f"async_{concurrency}.sqlite",
+        )
+        async with engine:
+            start = time.perf_counter()
+            await engine.agather_info([f"frage {concurrency} {i}" for i in range(args.anfragen)])
+            return time.perf_counter() - start
+
+    for concurrency in args.concurrency:
+        dauer = asyncio.run(lauf(concurrency))
+        print(f"{'async x' + str(concurrency):>14} {dauer:>8.2f} {args.anfragen / dauer:>11.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
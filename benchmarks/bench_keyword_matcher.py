@@ -0,0 +1,87 @@
+"""
+Micro-Benchmark: Stichwort-Erkennung pro Nachricht.
+
+"alt":        ein Zug wie früher: Frage-Typ, Safety, Tonfall und Kategorien der
+              AnswerEngine scannen jeweils selbst mit any(k in text ...)
+"matcher":    nur der eine Scan über den gemeinsamen KeywordMatcher (ohne Merk-Cache)
+"pro Zug":    dieselben Abfragen wie "alt" über die Engines, ein Scan + Cache-Treffer
+
+Aufruf:  python benchmarks/bench_keyword_matcher.py [--runden 20000]
+"""
+
+import argparse
+import time
+
+from _paket import lade
+
+keyword_matcher = lade("keyword_matcher")
+router = lade("hybrid_inference_router")
+safety = lade("safety_guardrails")
+toleranz = lade("tolerance_engine")
+antwort = lade("answer_engine")
+
+NACHRICHTEN = [
+    "Hallo Sulee, wie geht es dir heute?",
+    "Kannst du mir bitte erklären, wie funktioniert eigentlich ein Vulkan und warum bricht er aus?",
+    "Ich habe seit Tagen Angst und fühle mich niedergeschlagen, soll ich zum Arzt?",
+    "Was denkst du über die Schule und deine Lehrer? Magst du Mathe als Fach?",
+    "Du nervst, verschwinde einfach!",
+    "Erzähl mir von deinem Bruder Andy und deiner Mutter in Zürich.",
+]
+
+
+def _alt_classify(text):
+    tl = text.lower()
+    for qtype, keywords in router.QuestionClassifier.KEYWORDS.items():
+        if any(kw in tl for kw in keywords):
+            return qtype
+    return "factual"
+
+
+def _alt_liste(text, keywords):
+    tl = text.lower()
+    return any(k in tl for k in keywords)
+
+
+def alt(text):
+    """Ein Zug wie vor dem Matcher: jede Engine scannt selbst."""
+    _alt_classify(text)
+    _alt_liste(text, safety.SafetyGuard.CRITICAL_KEYWORDS)
+    _alt_liste(text, safety.SafetyGuard.MEDICAL_KEYWORDS)
+    _alt_liste(text, toleranz.ToleranceEngine.NEGATIV) or _alt_liste(text, toleranz.ToleranceEngine.POSITIV)
+    for keywords in antwort.AnswerEngine.KATEGORIE_KEYWORDS.values():
+        _alt_liste(text, keywords)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runden", type=int, default=20000)
+    args = parser.parse_args()
+    matcher = keyword_matcher.gemeinsamer_matcher()
+    guard = safety.SafetyGuard()
+
+    def einmal(text):
+        matcher._scan(text.lower())
+
+    def pro_zug(text):
+        router.QuestionClassifier.classify(text)
+        guard.is_critical_question(text)
+        guard.is_medical_question(text)
+        toleranz.ToleranceEngine.ton_aenderung(text, matcher.kategorien_von(text))
+        matcher.hat(text, "antwort.gruss")
+        matcher.hat(text, "antwort.familie")
+        matcher.hat(text, "antwort.schule")
+
+    print(f"{len(matcher.kategorien)} Kategorien, {sum(map(len, matcher.kategorien.values()))} Stichwörter")
+    print(f"{'Variante':>10} {'µs/Nachricht':>14}")
+    for name, fn in (("alt", alt), ("matcher", einmal), ("pro Zug", pro_zug)):
+        start = time.perf_counter()
+        for i in range(args.runden):
+            # Zahl anhängen, damit "pro Zug" jede Runde einen neuen Text scannt
+            fn(f"{NACHRICHTEN[i % len(NACHRICHTEN)]} {i}")
+        dauer = time.perf_counter() - start
+        print(f"{name:>10} {dauer / args.runden * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: Time-to-first-token der Llama-Engine mit und ohne Prefix-Cache.
+
+Simuliert verschachtelte Sessions (Modellzustand wird vor jeder Frage
+zurückgesetzt) und misst, wie lange es bis zum ersten Token dauert, wenn
+Sulees System-Prompt jedes Mal neu ausgewertet wird bzw. aus dem Cache kommt.
+
+Aufruf:  python benchmarks/bench_llama_prefix_cache.py [--model pfad.gguf] [--fragen 5]
+Braucht llama_cpp und ein lokales GGUF-Modell.
+"""
+
+import argparse
+import statistics
+import time
+
+from _paket import lade
+
+llama_engine = lade("llama_engine")
+
+SYSTEM_PROMPT = (
+    "Du bist Sulee. Du bist biologisch 13 Jahre alt.\n"
+    "DEIN INTELLEKT: sehr klug für ihr Alter (Denkvermögen wie 16), neugierig, sprunghaft, emotional, sucht Sicherheit.\n"
+    "DEIN TON: kindlich, aber intelligent, fragend, manchmal unsicher.\n"
+    "DEINE PERSÖNLICHKEIT: Musikliebhaberin (Gitarre), Technik-Fan (Robo-Kids), emphatisch, Familie ist wichtig.\n"
+    "WICHTIG: Antworte immer passend zum biologischen Alter (13), nutze aber den intellektuellen Hintergrund. "
+    "Sei menschlich, nutze Emojis wenn es passt, zeige Gefühle."
+)
+FRAGEN = [
+    "Warum ist der Himmel blau?",
+    "Was ist dein Lieblingslied auf der Gitarre?",
+    "Wie funktioniert ein Roboter?",
+    "Was machst du am Wochenende?",
+    "Erklär mir, was ein Vulkan ist.",
+    "Wie heißt dein Bruder?",
+]
+
+
+def ttft(engine, prompt):
+    engine.llm.reset()   # andere Session war dazwischen: kein eingebauter Prefix-Reuse
+    start = time.perf_counter()
+    for _ in engine.llm(prompt, max_tokens=1, temperature=0.0, stream=True):
+        return time.perf_counter() - start
+    return time.perf_counter() - start
+
+
+def lauf(engine, fragen, vorwaermen):
+    praefix = f"{SYSTEM_PROMPT}\n\n"
+    if vorwaermen:
+        engine.praefix_vorwaermen(praefix)
+    return [ttft(engine, f"{praefix}Frage: {frage}") for frage in fragen]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="Pfad zum GGUF-Modell (sonst Konfiguration)")
+    parser.add_argument("--fragen", type=int, default=len(FRAGEN))
+    args = parser.parse_args()
+    fragen = (FRAGEN * (args.fragen // len(FRAGEN) + 1))[:args.fragen]
+
+    ohne = llama_engine.LlamaEngine(model_path=args.model, prompt_cache_mb=0)
+    zeiten_ohne = lauf(ohne, fragen, vorwaermen=False)
+    del ohne
+
+    mit = llama_engine.LlamaEngine(model_path=args.model)
+    zeiten_mit = lauf(mit, fragen, vorwaermen=True)
+
+    print(f"{'Modus':>12} {'TTFT median ms':>15} {'TTFT max ms':>12}")
+    for name, zeiten in (("ohne Cache", zeiten_ohne), ("mit Cache", zeiten_mit)):
+        print(f"{name:>12} {statistics.median(zeiten) * 1000:>15.1f} {max(zeiten) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Lasttest: LlamaScheduler unter gleichzeitigen Sessions.
+
+Eine Fake-Engine rechnet pro Anfrage eine feste Zeit und erkennt gleichzeitige
+Zugriffe (wie sie bei direktem Zugriff auf ``Llama`` aus mehreren Threads
+passieren). Gemessen werden Latenz-Perzentile pro Nebenläufigkeit, getrennt
+nach Safety- und normalen Anfragen.
+
+Aufruf:  python benchmarks/bench_llama_scheduler.py [--rechenzeit 0.005] [--anfragen 20]
+"""
+
+import argparse
+import threading
+import time
+
+from _paket import lade
+
+llama_scheduler = lade("llama_scheduler")
+metriken = lade("metriken")
+
+
+class FakeEngine:
+    def __init__(self, rechenzeit):
+        self.rechenzeit = rechenzeit
+        self._aktiv = 0
+        self.kollisionen = 0
+
+    def generate(self, prompt):
+        self._aktiv += 1
+        if self._aktiv > 1:
+            self.kollisionen += 1
+        time.sleep(self.rechenzeit)
+        self._aktiv -= 1
+        return f"Antwort auf {prompt}"
+
+    def generate_stream(self, prompt):
+        yield self.generate(prompt)
+
+
+def session(aufruf, nummer, anfragen, latenzen):
+    for i in range(anfragen):
+        safety = (nummer + i) % 5 == 0
+        start = time.perf_counter()
+        aufruf(f"Frage {nummer}/{i}", safety)
+        latenzen["safety" if safety else "normal"].append(time.perf_counter() - start)
+
+
+def lauf(aufruf, sessions, anfragen):
+    latenzen = {"safety": [], "normal": []}
+    threads = [threading.Thread(target=session, args=(aufruf, n, anfragen, latenzen)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latenzen, time.perf_counter() - start
+
+
+def zeile(name, sessions, werte, dauer, kollisionen):
+    p = [metriken.perzentil(werte, q) * 1000 for q in (50, 95, 99)]
+    print(f"{name:>10} {sessions:>9} {p[0]:>8.1f} {p[1]:>8.1f} {p[2]:>8.1f} {dauer:>7.2f}s {kollisionen:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rechenzeit", type=float, default=0.005)
+    parser.add_argument("--anfragen", type=int, default=20, help="Anfragen pro Session")
+    args = parser.parse_args()
+
+    print(f"{'Modus':>10} {'Sessions':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Dauer':>8} {'Kollisionen':>11}")
+    for sessions in (1, 4, 16, 32):
+        direkt = FakeEngine(args.rechenzeit)
+        latenzen, dauer = lauf(lambda frage, safety: direkt.generate(frage), sessions, args.anfragen)
+        zeile("direkt", sessions, latenzen["safety"] + latenzen["normal"], dauer, direkt.kollisionen)
+
+        engine = FakeEngine(args.rechenzeit)
+        scheduler = llama_scheduler.LlamaScheduler(engine, max_tiefe=sessions + 1)
+
+        def ueber_scheduler(frage, safety):
+            prioritaet = llama_scheduler.PRIORITAET_SAFETY if safety else llama_scheduler.PRIORITAET_NORMAL
+            return scheduler.generate(frage, prioritaet=prioritaet, timeout=30)
+
+        latenzen, dauer = lauf(ueber_scheduler, sessions, args.anfragen)
+        scheduler.stop()
+        zeile("safety", sessions, latenzen["safety"], dauer, engine.kollisionen)
+        zeile("normal", sessions, latenzen["normal"], dauer, engine.kollisionen)
+        print(f"{'':>10} max. Warteschlange: {scheduler.get_metriken()['max_tiefe_gesehen']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: Feed-Abruf der NewsEngine gegen lokale RSS-Feeds mit
+unterschiedlicher Verzögerung. Parallel sollte die Dauer ungefähr dem
+langsamsten Feed entsprechen, beim zweiten Scan antworten alle Feeds 304.
+
+Aufruf:  python benchmarks/bench_news_fetch.py [--feeds 0.3 0.5 0.8]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _paket import lade
+from feed_stub import starte_feeds
+
+news_engine = lade("news_engine")
+news_schema = lade("news_schema")
+
+
+def scan(engine) -> tuple:
+    conn = news_schema.verbinde(engine.db_path)
+    start = time.perf_counter()
+    items = engine._fetch_raw_feeds(conn)
+    dauer = time.perf_counter() - start
+    engine._speichere_feed_validatoren(conn)  # wie nach einer erfolgreichen Analyse
+    conn.close()
+    return dauer, len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", type=float, nargs="+", default=[0.3, 0.5, 0.8])
+    args = parser.parse_args()
+
+    verzoegerungen = {f"feed{i}": v for i, v in enumerate(args.feeds)}
+    server, feeds, zaehler = starte_feeds(verzoegerungen)
+    ordner = Path(tempfile.mkdtemp())
+    print(f"Feeds: {args.feeds}  Summe {sum(args.feeds):.2f}s  Max {max(args.feeds):.2f}s\n")
+    print(f"{'Modus':>24} {'Dauer s':>8} {'Artikel':>8}")
+
+    # groq_client wird für den Abruf nicht gebraucht
+    sequentiell = news_engine.NewsEngine(ordner / "seq.db", feeds=feeds, groq_client=object(), max_parallel=1)
+    dauer, anzahl = scan(sequentiell)
+    print(f"{'sequentiell':>24} {dauer:>8.2f} {anzahl:>8}")
+
+    parallel = news_engine.NewsEngine(ordner / "par.db", feeds=feeds, groq_client=object())
+    dauer, anzahl = scan(parallel)
+    print(f"{'parallel (1. Scan)':>24} {dauer:>8.2f} {anzahl:>8}")
+    dauer, anzahl = scan(parallel)
+    print(f"{'parallel (2. Scan, 304)':>24} {dauer:>8.2f} {anzahl:>8}")
+
+    print(f"\nServer-Antworten: {zaehler}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: Analyse eines großen Scans mit der NewsEngine gegen einen
+nachgeahmten Groq-Client (Latenz wächst mit der Prompt-Länge, einzelne
+Aufrufe schlagen fehl). Vergleicht einen Riesen-Prompt mit Häppchen,
+die parallel und mit Wiederholung analysiert werden.
+
+Aufruf:  python benchmarks/bench_news_groq.py [--artikel 300] [--fehlerquote 0.2]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from _paket import lade
+
+news_engine = lade("news_engine")
+
+
+class StubGroq:
+    """Ahmt ``client.chat.completions.create`` nach: Kontextgrenze, Latenz pro Token, Zufallsfehler."""
+
+    def __init__(self, kontext_tokens=8192, sekunden_pro_1k=0.05, grundlatenz=0.2, fehlerquote=0.0):
+        self.kontext_tokens = kontext_tokens
+        self.sekunden_pro_1k = sekunden_pro_1k
+        self.grundlatenz = grundlatenz
+        self.fehlerquote = fehlerquote
+        self.aufrufe = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, **kwargs):
+        with self._lock:
+            self.aufrufe += 1
+        prompt = messages[-1]["content"]
+        tokens = news_engine.schaetze_tokens(prompt)
+        if tokens > self.kontext_tokens:
+            raise RuntimeError(f"context_length_exceeded ({tokens} Tokens)")
+        time.sleep(self.grundlatenz + tokens / 1000 * self.sekunden_pro_1k)
+        if random.random() < self.fehlerquote:
+            raise RuntimeError("503 Service Unavailable")
+        titel = [zeile[7:] for zeile in prompt.splitlines() if zeile.startswith("Titel: ")]
+        facts = [{"topic_id": t.lower().replace(" ", "_"), "fact": t, "artikel": i} for i, t in enumerate(titel, 1)]
+        inhalt = json.dumps({"facts": facts})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=inhalt))])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artikel", type=int, default=300)
+    parser.add_argument("--fehlerquote", type=float, default=0.2)
+    args = parser.parse_args()
+
+    random.seed(1)
+    items = [
+        {"title": f"Meldung {i}", "description": "Ein Satz Nachrichtentext. " * 12, "published": None}
+        for i in range(args.artikel)
+    ]
+    db = Path(tempfile.mkdtemp()) / "news.db"
+    print(f"{args.artikel} Artikel, Fehlerquote {args.fehlerquote:.0%}\n")
+    print(f"{'Modus':>24} {'Dauer s':>8} {'Fakten':>7} {'Häppchen':>9} {'Aufrufe':>8}")
+
+    varianten = [
+        ("ein Prompt", dict(chunk_tokens=10 ** 9, groq_parallel=1, groq_versuche=1)),
+        ("Häppchen, seriell", dict(groq_parallel=1, groq_backoff=0.05)),
+        ("Häppchen, parallel", dict(groq_parallel=4, groq_backoff=0.05)),
+    ]
+    for name, optionen in varianten:
+        client = StubGroq(fehlerquote=args.fehlerquote)
+        engine = news_engine.NewsEngine(db, feeds=[], groq_client=client, **optionen)
+        start = time.perf_counter()
+        facts = engine._analysiere_mit_groq(items)
+        dauer = time.perf_counter() - start
+        statistik = engine.analyse_statistik
+        print(f"{name:>24} {dauer:>8.2f} {len(facts):>7} {statistik['chunks']:>9} {client.aufrufe:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: News-Datenbank mit großem Puffer (Standard 1 Mio. Zeilen in news_buffer).
+Vergleicht die alte Datenbank ohne Indizes mit dem migrierten Schema
+(news_schema) bei Validierung, Aufräumen und dem Schreiben eines Scans.
+
+Aufruf:  python benchmarks/bench_news_schema.py [--zeilen 1000000] [--themen 50000] [--tage 14]
+"""
+
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from _paket import lade
+
+news_engine = lade("news_engine")
+news_schema = lade("news_schema")
+
+ALTES_SCHEMA = """
+CREATE TABLE news_buffer (id INTEGER PRIMARY KEY, topic_id TEXT, content TEXT, date DATE);
+CREATE TABLE knowledge_base (topic_id TEXT, fact TEXT, last_updated DATE);
+"""
+
+
+def baue_alte_db(pfad: Path, zeilen: int, themen: int, tage: int):
+    random.seed(7)
+    heute = date.today()
+    conn = sqlite3.connect(pfad)
+    conn.executescript(ALTES_SCHEMA)
+    with conn:
+        conn.executemany(
+            "INSERT INTO news_buffer (topic_id, content, date) VALUES (?, ?, ?)",
+            (
+                (f"thema_{random.randrange(themen)}", f"Fakt {i}", (heute - timedelta(days=random.randrange(tage))).isoformat())
+                for i in range(zeilen)
+            ),
+        )
+        # Alte knowledge_base ohne UNIQUE, mit ein paar Doppelten
+        conn.executemany(
+            "INSERT INTO knowledge_base (topic_id, fact, last_updated) VALUES (?, ?, ?)",
+            ((f"thema_{i % themen}", f"Alt {i}", heute.isoformat()) for i in range(themen + themen // 10)),
+        )
+    conn.close()
+
+
+def messe(funktion, wiederholungen: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(wiederholungen):
+        funktion()
+    return (time.perf_counter() - start) / wiederholungen
+
+
+def scan_schreiben(conn, facts, validieren):
+    """Schreibteil eines Scans: Puffer und Validierung in einer Transaktion."""
+    conn.execute("BEGIN IMMEDIATE")
+    themen = news_engine.NewsEngine._speichere_in_buffer(conn, facts)
+    validieren(conn, themen)
+    conn.execute("COMMIT")
+
+
+def validiere_alt(conn, themen=None):
+    """Die frühere Validierung: SELECT, dann ein INSERT OR REPLACE pro Thema."""
+    cutoff = (date.today() - timedelta(days=5)).isoformat()
+    rows = conn.execute(
+        "SELECT topic_id, content, MAX(date) FROM news_buffer WHERE date >= ? GROUP BY topic_id HAVING COUNT(*) >= 2",
+        (cutoff,),
+    ).fetchall()
+    for topic_id, content, last_seen in rows:
+        conn.execute(
+            "INSERT OR REPLACE INTO knowledge_base (topic_id, fact, last_updated) VALUES (?, ?, ?)",
+            (topic_id, content, last_seen),
+        )
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zeilen", type=int, default=1_000_000)
+    parser.add_argument("--themen", type=int, default=50_000)
+    parser.add_argument("--tage", type=int, default=14, help="über so viele Tage verteilt")
+    parser.add_argument("--facts", type=int, default=200, help="neue Fakten pro Scan")
+    args = parser.parse_args()
+
+    ordner = Path(tempfile.mkdtemp())
+    vorlage = ordner / "vorlage.db"
+    start = time.perf_counter()
+    baue_alte_db(vorlage, args.zeilen, args.themen, args.tage)
+    print(f"Alte Datenbank: {args.zeilen:,} Puffer-Zeilen, {args.themen:,} Themen, "
+          f"{args.tage} Tage ({time.perf_counter() - start:.1f}s)\n")
+
+    alt_pfad, neu_pfad = ordner / "alt.db", ordner / "neu.db"
+    shutil.copy(vorlage, alt_pfad)
+    shutil.copy(vorlage, neu_pfad)
+
+    alt = sqlite3.connect(alt_pfad, isolation_level=None)
+    start = time.perf_counter()
+    neu = news_schema.verbinde(neu_pfad)
+    migration = time.perf_counter() - start
+    doppelte = args.themen // 10
+    rest = neu.execute("SELECT COUNT(*) - COUNT(DISTINCT topic_id) FROM knowledge_base").fetchone()[0]
+    print(f"Migration auf Version {news_schema.version(neu)}: {migration:.2f}s "
+          f"(Doppelte in knowledge_base: {doppelte} -> {rest})\n")
+
+    cutoff_5 = (date.today() - timedelta(days=5)).isoformat()
+    plan = neu.execute(
+        "EXPLAIN QUERY PLAN SELECT topic_id, content, MAX(date) FROM news_buffer "
+        "WHERE date >= ? AND topic_id IN (SELECT value FROM json_each(?)) GROUP BY topic_id HAVING COUNT(*) >= 2",
+        (cutoff_5, '["thema_1"]'),
+    ).fetchall()
+    print("Plan Validierung (neu):", "; ".join(zeile[-1] for zeile in plan))
+
+    facts = [{"topic_id": f"thema_{random.randrange(args.themen)}", "fact": "Neu"} for _ in range(args.facts)]
+    print(f"\n{'Schritt':>28} {'alt s':>8} {'neu s':>8}")
+
+    def validierung_neu(conn, themen):
+        news_engine.NewsEngine._validiere_und_update(conn, themen)
+
+    def validierung_voll(conn, themen):
+        news_engine.NewsEngine._validiere_und_update(conn)
+
+    zeit_alt = messe(lambda: scan_schreiben(alt, facts, validiere_alt), 3)
+    zeit_neu = messe(lambda: scan_schreiben(neu, facts, validierung_neu), 3)
+    print(f"{'Puffer + Validierung':>28} {zeit_alt:>8.3f} {zeit_neu:>8.3f}")
+    zeit_voll = messe(lambda: scan_schreiben(neu, facts, validierung_voll))
+    print(f"{'  (neu, ganzer Puffer)':>28} {'':>8} {zeit_voll:>8.3f}")
+
+    cutoff_7 = (date.today() - timedelta(days=7)).isoformat()
+    loesche = "DELETE FROM news_buffer WHERE date < ?"
+    zeit_alt = messe(lambda: alt.execute(loesche, (cutoff_7,)))
+    zeit_neu = messe(lambda: neu.execute(loesche, (cutoff_7,)))
+    print(f"{'Aufräumen (erster Lauf)':>28} {zeit_alt:>8.3f} {zeit_neu:>8.3f}")
+    # Danach der Normalfall: täglich wenig oder nichts zu löschen
+    zeit_alt = messe(lambda: alt.execute(loesche, (cutoff_7,)), 5)
+    zeit_neu = messe(lambda: neu.execute(loesche, (cutoff_7,)), 5)
+    print(f"{'Aufräumen (Folgeläufe)':>28} {zeit_alt:>8.3f} {zeit_neu:>8.3f}")
+
+    zeit_alt = messe(lambda: scan_schreiben(alt, facts, validiere_alt), 3)
+    zeit_neu = messe(lambda: scan_schreiben(neu, facts, validierung_neu), 3)
+    print(f"{'Puffer + Validierung (7 T.)':>28} {zeit_alt:>8.3f} {zeit_neu:>8.3f}")
+
+    alt.close()
+    neu.close()
+
+
+if __name__ == "__main__":
+    main()
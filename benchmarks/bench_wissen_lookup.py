@@ -0,0 +1,89 @@
+"""
+Benchmark: Wissens-Lookup mit N-Gramm-Index und SQLite-Speicher vs. linearer Substring-Scan.
+
+Aufruf:  python benchmarks/bench_wissen_lookup.py [--groessen 1000 10000 50000]
+"""
+
+import argparse
+import json
+import random
+import string
+import tempfile
+import time
+import os
+
+from _paket import lade
+
+wissen_mod = lade("wissen")
+wissen_sqlite = lade("wissen_sqlite")
+
+WOERTER = [
+    "wie", "warum", "was", "ist", "der", "die", "das", "mond", "sonne", "gitarre",
+    "schule", "roboter", "toronto", "musik", "planet", "wasser", "energie", "computer",
+    "sprache", "geschichte", "tier", "baum", "stadt", "meer", "zeit", "licht",
+]
+
+
+def zufalls_frage(rng):
+    woerter = rng.sample(WOERTER, 4)
+    woerter.append("".join(rng.choices(string.ascii_lowercase, k=6)))
+    return " ".join(woerter)
+
+
+def linearer_scan(wissen, frage_low):
+    """Die frühere Implementierung von Wissen.pruefe_wissen (nur Trefferfindung)."""
+    for gespeicherte_frage in wissen:
+        if gespeicherte_frage in frage_low or frage_low in gespeicherte_frage:
+            return gespeicherte_frage
+    return None
+
+
+def messe(fn, anfragen):
+    start = time.perf_counter()
+    for frage in anfragen:
+        fn(frage)
+    return (time.perf_counter() - start) / len(anfragen) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groessen", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--anfragen", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'Einträge':>10} {'linear µs':>12} {'Index µs':>12} {'Faktor':>8} {'SQLite µs':>10}")
+    for groesse in args.groessen:
+        with tempfile.TemporaryDirectory() as tmp:
+            w = wissen_mod.Wissen(datei=os.path.join(tmp, "wissen.json"))
+            for _ in range(groesse):
+                w.wissen[zufalls_frage(rng)] = {"antwort": "x", "quelle": "deepseek", "status": "pending"}
+            w._index = wissen_mod.NGramIndex(w.wissen)
+
+            gespeichert = list(w.wissen)
+            anfragen = []
+            for i in range(args.anfragen):
+                if i % 2:
+                    # Treffer: gespeicherte Frage eingebettet in eine längere Nachricht
+                    anfragen.append(f"sag mal {rng.choice(gespeichert)} bitte")
+                else:
+                    anfragen.append(zufalls_frage(rng))
+
+            json_datei = os.path.join(tmp, "import.json")
+            with open(json_datei, "w", encoding="utf-8") as f:
+                json.dump(w.wissen, f)
+            db = wissen_sqlite.SQLiteWissen(os.path.join(tmp, "wissen.db"), json_datei=json_datei)
+            for frage in anfragen:
+                erwartet = w._index.erster_treffer(frage)
+                gefunden = db._treffer(frage, limit=1)
+                assert (gefunden[0][0] if gefunden else None) == erwartet, frage
+
+            linear = messe(lambda f: linearer_scan(w.wissen, f), anfragen)
+            indiziert = messe(w._index.erster_treffer, anfragen)
+            sqlite = messe(lambda f: db._treffer(f, limit=1), anfragen)
+            db.close()
+            print(f"{groesse:>10} {linear:>12.1f} {indiziert:>12.1f} {linear / indiziert:>7.1f}x {sqlite:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
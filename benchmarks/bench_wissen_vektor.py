@@ -0,0 +1,80 @@
+"""
+Benchmark: Recall und Latenz des semantischen VektorIndex.
+
+Erzeugt synthetische Fragen, formuliert jede Suchanfrage um (andere Fragewörter,
+Füllwörter, Wortreihenfolge) und misst, wie oft die Originalfrage gefunden wird.
+
+Aufruf:  python benchmarks/bench_wissen_vektor.py [--groessen 10000 100000]
+"""
+
+import argparse
+import random
+import time
+
+from _paket import lade
+
+wissen_vektor = lade("wissen_vektor")
+
+THEMEN = [
+    "mond", "sonne", "gitarre", "roboter", "toronto", "vulkan", "planet", "ozean", "klima",
+    "computer", "internet", "dinosaurier", "pyramiden", "regenbogen", "gewitter", "bienen",
+    "photosynthese", "schwerkraft", "magnet", "elektrizität", "sprache", "musik", "schule",
+    "demokratie", "mathematik", "atom", "galaxie", "wal", "wüste", "gletscher",
+]
+EIGENSCHAFTEN = [
+    "entstehung", "geschichte", "größe", "farbe", "bedeutung", "funktion", "alter",
+    "temperatur", "gefahr", "zukunft", "nutzen", "aufbau", "herkunft", "wirkung",
+]
+FRAGEWOERTER = ["was ist", "erklär mir", "wie funktioniert", "was weißt du über", "beschreib"]
+FUELLWOERTER = ["bitte", "mal", "eigentlich", "genau", "kurz"]
+
+
+def original(rng, i):
+    return f"{rng.choice(FRAGEWOERTER)} die {rng.choice(EIGENSCHAFTEN)} von {rng.choice(THEMEN)} nummer {i}"
+
+
+def umformulieren(rng, frage):
+    teile = frage.split()
+    # Fragewort austauschen, Füllwort einstreuen, Reihenfolge leicht ändern
+    kern = teile[-6:]
+    kern[1], kern[3] = kern[3], kern[1]
+    return f"{rng.choice(FRAGEWOERTER)} {rng.choice(FUELLWOERTER)} " + " ".join(kern) + "?"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groessen", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--anfragen", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--dimensionen", type=int, default=512)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'Einträge':>10} {'Aufbau s':>9} {'Recall@1':>9} {'Recall@5':>9} {'einzeln ms':>11} {'Batch ms/Frage':>15}")
+    for groesse in args.groessen:
+        fragen = [original(rng, i) for i in range(groesse)]
+        index = wissen_vektor.VektorIndex(dimensionen=args.dimensionen, schwelle=0.0)
+
+        start = time.perf_counter()
+        index.hinzufuegen_viele(fragen)
+        aufbau = time.perf_counter() - start
+
+        ziele = rng.sample(fragen, args.anfragen)
+        anfragen = [umformulieren(rng, f) for f in ziele]
+
+        start = time.perf_counter()
+        einzeln = [index.suche(a, k=5) for a in anfragen]
+        latenz_einzeln = (time.perf_counter() - start) / len(anfragen) * 1000
+
+        start = time.perf_counter()
+        for i in range(0, len(anfragen), args.batch):
+            index.suche_batch(anfragen[i:i + args.batch], k=5)
+        latenz_batch = (time.perf_counter() - start) / len(anfragen) * 1000
+
+        recall1 = sum(bool(t) and t[0][0] == z for t, z in zip(einzeln, ziele)) / len(ziele)
+        recall5 = sum(z in [k for k, _ in t] for t, z in zip(einzeln, ziele)) / len(ziele)
+        print(f"{groesse:>10} {aufbau:>9.1f} {recall1:>9.2%} {recall5:>9.2%} {latenz_einzeln:>11.2f} {latenz_batch:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Lokaler Stub-Server, der die DeepSeek Chat-Completions-API nachahmt.
+Antwortet nach einer festen Verzögerung, damit Benchmarks ohne echte API laufen.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def starte_stub(verzoegerung: float = 0.1, antwort: str = "Stub-Antwort"):
+    """Startet den Server in einem Hintergrund-Thread. Gibt (server, base_url) zurück."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            body = json.dumps({"object": "list", "data": [{"id": "deepseek-chat"}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            laenge = int(self.headers.get("Content-Length", 0))
+            anfrage = json.loads(self.rfile.read(laenge) or b"{}")
+            time.sleep(verzoegerung)
+            if anfrage.get("stream"):
+                self._sende_stream()
+                return
+            body = json.dumps({"choices": [{"message": {"content": antwort}}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _sende_stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for wort in antwort.split(" "):
+                chunk = {"choices": [{"delta": {"content": wort + " "}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
@@ -0,0 +1,70 @@
+"""
+Lokaler Stub-Server mit RSS-Feeds für die NewsEngine-Benchmarks und -Tests.
+Jeder Feed antwortet nach einer eigenen Verzögerung und unterstützt
+bedingte GETs (ETag / If-None-Match -> 304).
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def rss(name: str, anzahl: int = 20) -> bytes:
+    eintraege = "".join(
+        f"<item><title>{name} Meldung {i}</title>"
+        f"<description>Beschreibung {i} aus {name}.</description></item>"
+        for i in range(anzahl)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{name}</title>{eintraege}</channel></rss>"
+    ).encode("utf-8")
+
+
+def starte_feeds(verzoegerungen: dict, anzahl: int = 20):
+    """
+    verzoegerungen: {"feed_name": sekunden, ...}
+    Gibt (server, feeds, zaehler) zurück; feeds ist direkt für NewsEngine(feeds=...)
+    verwendbar, zaehler zählt {"200": n, "304": n}.
+    """
+    inhalte = {name: rss(name, anzahl) for name in verzoegerungen}
+    zaehler = {"200": 0, "304": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            name = self.path.strip("/")
+            if name not in inhalte:
+                self.send_error(404)
+                return
+            time.sleep(verzoegerungen[name])
+            etag = f'"{name}-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                with lock:
+                    zaehler["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = inhalte[name]
+            with lock:
+                zaehler["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    basis = f"http://127.0.0.1:{server.server_port}"
+    feeds = [{"name": name, "url": f"{basis}/{name}"} for name in verzoegerungen]
+    return server, feeds, zaehler
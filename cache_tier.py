@@ -0,0 +1,67 @@
+"""
+Cache-Stufe vor den Inferenz-Backends.
+Beantwortet wiederholte Fragen aus dem DeepSeek-Antwort-Cache oder aus
+bestätigtem Wissen, bevor ein Modell gefragt wird.
+"""
+
+import threading
+from typing import Callable
+
+
+class CacheTier:
+    """
+    Reihenfolge der Suche:
+    1. DeepSeek-Cache: gleicher System-Prompt + normalisierte Frage
+    2. Wissen: wörtliche, dann normalisierte Frage; nur core/accepted Einträge.
+       Pending Modell-Antworten sind ungeprüft und hängen vom System-Prompt
+       (Alter) ab, mit dem sie entstanden sind; sie gelten wie in pruefe_wissen
+       nicht als Wissen. Für solche Antworten ist der prompt-genaue
+       DeepSeek-Cache zuständig.
+    """
+
+    def __init__(self, deepseek: Callable[[], object] | None = None):
+        # Liefert die DeepSeek-Engine (oder None), lazy wie in answer_engine
+        self.deepseek = deepseek
+        self._lock = threading.Lock()
+        self.zaehler = {"anfragen": 0, "treffer_deepseek": 0, "treffer_wissen": 0}
+
+    def _aus_deepseek(self, frage, system_prompt):
+        engine = self.deepseek() if self.deepseek else None
+        if not engine:
+            return None
+        return engine.cached_info(frage, system_prompt)
+
+    def _aus_wissen(self, frage, wissen):
+        if wissen is None or not hasattr(wissen, "nachschlagen"):
+            return None
+        eintrag = wissen.nachschlagen(frage)
+        if not eintrag:
+            return None
+        if eintrag.get("quelle") != "core" and eintrag.get("status") != "accepted":
+            return None
+        return eintrag.get("antwort")
+
+    def suche(self, frage: str, system_prompt: str | None = None, wissen=None) -> str | None:
+        """Gecachte Antwort oder None (dann muss ein Backend ran)."""
+        antwort, quelle = None, None
+        try:
+            antwort = self._aus_deepseek(frage, system_prompt)
+            quelle = "treffer_deepseek"
+            if not antwort:
+                antwort = self._aus_wissen(frage, wissen)
+                quelle = "treffer_wissen"
+        except Exception as e:
+            print(f"[Warnung] Cache-Abfrage fehlgeschlagen: {e}")
+            antwort = None
+        with self._lock:
+            self.zaehler["anfragen"] += 1
+            if antwort:
+                self.zaehler[quelle] += 1
+        return antwort or None
+
+    def statistik(self) -> dict:
+        with self._lock:
+            zaehler = dict(self.zaehler)
+        treffer = zaehler["treffer_deepseek"] + zaehler["treffer_wissen"]
+        zaehler["trefferquote"] = round(treffer / zaehler["anfragen"], 3) if zaehler["anfragen"] else 0.0
+        return zaehler
@@ -0,0 +1,134 @@
+"""
+Asynchroner DeepSeek-Client für Sulee.
+Mehrere Fragen können gleichzeitig unterwegs sein, begrenzt durch eine Semaphore,
+statt einen Worker pro Anfrage bis zu 15-20 s zu blockieren.
+"""
+
+import asyncio
+import time
+
+from .deepseek_engine import RETRY_AFTER_MAX, DeepseekEngine
+
+try:
+    import httpx
+except ImportError:  # optional: nur für den Async-Client nötig
+    httpx = None
+
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class AsyncDeepseekEngine(DeepseekEngine):
+    """
+    Async-Variante von DeepseekEngine (gleicher Cache, gleiche Prompts, gleiche Metriken).
+
+    max_concurrency: wie viele Anfragen gleichzeitig an die API gehen dürfen
+    """
+
+    def __init__(self, *args, max_concurrency: int = 8, **kwargs):
+        if httpx is None:
+            raise ImportError("httpx wird für AsyncDeepseekEngine benötigt")
+        super().__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._max_retries = kwargs.get("max_retries", 3)
+        self._backoff_factor = kwargs.get("backoff_factor", 0.5)
+        self._client = None
+        self._semaphore = None
+
+    def _async_client(self):
+        # Lazy, damit Client und Semaphore an die laufende Event-Loop gebunden werden
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                limits=limits,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _apost_chat(self, data: dict, timeout: float, art: str) -> dict:
+        """
+        Wie _post_chat, inkl. Backoff-Retries bei 429/5xx und Retry-After (höchstens
+        RETRY_AFTER_MAX). Die Semaphore gilt nur für den Request selbst: wer auf einen
+        Retry wartet, hält keinen Platz der anderen Anfragen besetzt.
+        """
+        client = self._async_client()
+        start = time.perf_counter()
+        erfolg = False
+        try:
+            for versuch in range(self._max_retries + 1):
+                async with self._semaphore:
+                    resp = await client.post("/chat/completions", json=data, timeout=timeout)
+                if resp.status_code in RETRY_STATUS and versuch < self._max_retries:
+                    warte = self._backoff_factor * (2 ** versuch)
+                    retry_after = resp.headers.get("Retry-After")
+                    if retry_after and retry_after.isdigit():
+                        warte = max(warte, min(float(retry_after), RETRY_AFTER_MAX))
+                    await asyncio.sleep(warte)
+                    continue
+                resp.raise_for_status()
+                j = resp.json()
+                erfolg = True
+                return j
+        finally:
+            self.metriken[art].melde(time.perf_counter() - start, erfolg)
+
+    async def afetch_info(self, frage: str, system_prompt: str | None = None) -> str:
+        """Async-Variante von fetch_info."""
+        if not self.is_active:
+            return ""
+
+        frage_key = self._cache_key(frage, system_prompt)
+        cached = self.cache.get(frage_key)
+        if cached is not None:
+            return cached
+
+        try:
+            j = await self._apost_chat(self._fetch_payload(frage, system_prompt), timeout=15, art="fetch_info")
+            info = self._antwort_text(j)
+            self._merke_antwort(frage_key, info)
+            return info
+        except Exception as e:
+            print(f"[DeepSeek Fehler]: {e}")
+            return ""
+
+    async def asmooth_answer(self, frage: str, roh: str) -> str:
+        """Async-Variante von smooth_answer."""
+        if not self.is_active:
+            return roh
+
+        try:
+            j = await self._apost_chat(self._smooth_payload(frage, roh), timeout=20, art="smooth_answer")
+            return self._antwort_text(j)
+        except Exception:
+            return roh
+
+    async def agather_info(self, fragen, system_prompt: str | None = None) -> list:
+        """
+        Holt Infos zu mehreren Fragen gleichzeitig, Ergebnisse in Eingabe-Reihenfolge.
+        system_prompt: wie bei fetch_info (z.B. Sulees Alters-Prompt), gilt für alle Fragen
+        """
+        return list(await asyncio.gather(*(self.afetch_info(f, system_prompt) for f in fragen)))
+
+    async def agather_smooth(self, paare) -> list:
+        """Glättet mehrere (frage, roh)-Paare gleichzeitig."""
+        return list(await asyncio.gather(*(self.asmooth_answer(f, r) for f, r in paare)))
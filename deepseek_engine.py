@@ -1,91 +1,273 @@
 import os
+import time
+import hashlib
 import requests
 import json
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metriken import LatenzStatistik
+from .antwort_cache import AntwortCache
+from .text_normalisierung import normalisiere
+
+DEFAULT_BASE_URL = "https://api.deepseek.com"
+MODEL = "deepseek-chat"
+# Höchstens so lange (Sekunden) wird ein ``Retry-After`` des Servers vor einem Retry befolgt
+RETRY_AFTER_MAX = 5.0
+
+FETCH_SYSTEM_PROMPT = (
+    "Beantworte die Frage factisch und knapp auf Deutsch. "
+    "Keine Metaphern, keine Nebensächlichkeiten. "
+    "Maximum 200 Zeichen. Fokus auf Kern-Facts."
+)
+SMOOTH_SYSTEM_PROMPT = (
+    "Formuliere die Antwort natürlich, warm, flüssig und klar auf Deutsch. "
+    "Behalte Inhalt und Intention, aber mach es menschlicher. "
+    "Du bist Sulee, 13, empathisch, neugierig, nicht formell."
+)
+
+
+class GedeckelterRetry(Retry):
+    """Retry, der ``Retry-After`` auf RETRY_AFTER_MAX begrenzt (sonst blockiert ein 429 minutenlang)."""
+
+    def get_retry_after(self, response):
+        warte = super().get_retry_after(response)
+        return None if warte is None else min(warte, RETRY_AFTER_MAX)
 
 
 class DeepseekEngine:
-    def __init__(self, api_key: str | None = None, cache_file: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache_file: str | None = None,
+        base_url: str | None = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache_max_entries: int = 5000,
+        cache_ttl: float | None = 7 * 24 * 3600,
+    ):
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         self.is_active = bool(self.api_key)
-        self.cache_file = cache_file or Path(__file__).parent.parent / "cache" / "deepseek_cache.json"
-        self.cache = self._load_cache()
+        # base_url ist überschreibbar, z.B. für einen lokalen Stub-Server in Tests
+        self.base_url = (base_url or os.getenv("DEEPSEEK_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.cache_file = Path(cache_file) if cache_file else Path(__file__).parent.parent / "cache" / "deepseek_cache.sqlite"
+        self.cache = self._load_cache(cache_max_entries, cache_ttl)
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+        self.metriken = {
+            "fetch_info": LatenzStatistik(),
+            "smooth_answer": LatenzStatistik(),
+            "stream_info": LatenzStatistik(),       # gesamte Stream-Dauer
+            "stream_erstes_token": LatenzStatistik(),
+        }
 
-    def _load_cache(self) -> dict:
-        """Lade Antwort-Cache aus Datei"""
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """
+        Eine Session für alle Aufrufe: Keep-Alive-Verbindungen aus einem Pool
+        statt neuem TCP+TLS-Handshake pro Anfrage.
+        Retries mit exponentiellem Backoff bei 429/5xx, ``Retry-After`` wird beachtet
+        (höchstens RETRY_AFTER_MAX Sekunden pro Retry).
+        Lese-Timeouts werden nicht wiederholt (ein hängender Server soll nach einem
+        Timeout aufgeben, nicht nach vier), Verbindungsfehler höchstens einmal.
+        """
+        retry = GedeckelterRetry(
+            total=max_retries,
+            connect=min(1, max_retries),
+            read=False,         # Lese-Timeout direkt als requests.ReadTimeout
+            other=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
+        return session
+
+    def _post_chat(self, data: dict, timeout: float, art: str) -> dict:
+        """Schickt eine Chat-Completion und misst die Latenz (inkl. Retries)."""
+        start = time.perf_counter()
+        erfolg = False
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+            resp = self.session.post(f"{self.base_url}/chat/completions", json=data, timeout=timeout)
+            resp.raise_for_status()
+            j = resp.json()
+            erfolg = True
+            return j
+        finally:
+            self.metriken[art].melde(time.perf_counter() - start, erfolg)
 
-    def _save_cache(self):
-        """Speichere Cache in Datei"""
+    def health_check(self, timeout: float = 3.0) -> bool:
+        """Günstiger Erreichbarkeits-Check ohne Token-Kosten (GET /models)."""
+        if not self.is_active:
+            return False
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+            resp = self.session.get(f"{self.base_url}/models", timeout=timeout)
+            return resp.status_code == 200
+        except requests.RequestException:
+            return False
 
-    def fetch_info(self, frage: str) -> str:
+    def get_metriken(self) -> dict:
+        """Latenz-Statistik pro Aufruf-Art (p50/p95 in ms, Fehlerquote) und Cache-Zähler."""
+        metriken = {art: stat.als_dict() for art, stat in self.metriken.items()}
+        metriken["cache"] = self.cache.statistik()
+        return metriken
+
+    def _load_cache(self, max_entries: int, ttl: float | None) -> AntwortCache:
+        """
+        Lade Antwort-Cache (SQLite, begrenzt, mit TTL).
+        Ein alter JSON-Cache (deepseek_cache.json) wird beim ersten Start übernommen.
+        """
+        datei = self.cache_file
+        alte_json = datei.with_suffix(".json")
+        if datei.suffix == ".json":
+            datei = datei.with_suffix(".sqlite")
+        cache = AntwortCache(datei, max_eintraege=max_entries, ttl=ttl)
+        # Alte Einträge stammen alle vom Standard-Prompt
+        cache.importiere_json(alte_json, schluessel_fn=self._cache_key)
+        return cache
+
+    # ---------------------------------------------------------
+    # PAYLOADS & CACHE (geteilt mit AsyncDeepseekEngine)
+    # ---------------------------------------------------------
+
+    def _fetch_payload(self, frage: str, system_prompt: str | None = None) -> dict:
+        return {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt or FETCH_SYSTEM_PROMPT},
+                {"role": "user", "content": frage},
+            ],
+            "temperature": 0.5,
+            "top_p": 0.8,
+        }
+
+    def _smooth_payload(self, frage: str, roh: str) -> dict:
+        return {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": SMOOTH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Frage: {frage}\nRohantwort: {roh}"},
+            ],
+            "temperature": 0.7,
+            "top_p": 0.9,
+        }
+
+    def _cache_key(self, frage: str, system_prompt: str | None = None) -> str:
+        """
+        Cache-Schlüssel = Hash aus System-Prompt, Modell und Sampling-Parametern
+        + normalisierte Frage (Groß/klein, Leerraum, Satzzeichen, Umlaute).
+        Unterschiedliche Alters-Prompts teilen sich so keine Antworten,
+        identische Prompts aber schon.
+        """
+        payload = self._fetch_payload(frage, system_prompt)
+        kontext = {k: v for k, v in payload.items() if k not in ("messages", "stream")}
+        kontext["system"] = [m["content"] for m in payload["messages"] if m["role"] == "system"]
+        prompt_hash = hashlib.sha256(
+            json.dumps(kontext, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        return f"{prompt_hash}:{normalisiere(frage)}"
+
+    def _merke_antwort(self, frage_key: str, info: str):
+        if info:
+            self.cache.set(frage_key, info)
+
+    @staticmethod
+    def _antwort_text(j: dict) -> str:
+        return j["choices"][0]["message"]["content"].strip()
+
+    # ---------------------------------------------------------
+    # ÖFFENTLICHE SCHNITTSTELLE
+    # ---------------------------------------------------------
+
+    def cached_info(self, frage: str, system_prompt: str | None = None, zaehlen: bool = True) -> str | None:
+        """Antwort aus dem Cache (gleicher Prompt, normalisierte Frage) ohne API-Aufruf, sonst None."""
+        return self.cache.get(self._cache_key(frage, system_prompt), zaehlen=zaehlen)
+
+    def fetch_info(self, frage: str, system_prompt: str | None = None, cache_zaehlen: bool = True) -> str:
         """
         PRIMARY: Holt faktische Informationen von DeepSeek API.
         Nutzt Cache für häufige Fragen.
+        system_prompt: ersetzt den Standard-Prompt (z.B. Sulees Alters-Prompt)
+        cache_zaehlen: False, wenn die Cache-Stufe (cached_info) diese Anfrage schon gezählt hat
         Returns: str mit faktischer Info oder "" wenn fehler/nicht aktiv
         """
         if not self.is_active:
             return ""
 
-        frage_key = frage.lower().strip()
+        frage_key = self._cache_key(frage, system_prompt)
         
         # Cache-Hit?
-        if frage_key in self.cache:
-            return self.cache[frage_key]
-
-        url = "https://api.deepseek.com/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        data = {
-            "model": "deepseek-chat",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "Beantworte die Frage factisch und knapp auf Deutsch. "
-                        "Keine Metaphern, keine Nebensächlichkeiten. "
-                        "Maximum 200 Zeichen. Fokus auf Kern-Facts."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": frage,
-                },
-            ],
-            "temperature": 0.5,
-            "top_p": 0.8,
-        }
+        cached = self.cache.get(frage_key, zaehlen=cache_zaehlen)
+        if cached is not None:
+            return cached
 
         try:
-            resp = requests.post(url, headers=headers, json=data, timeout=15)
-            resp.raise_for_status()
-            j = resp.json()
-            info = j["choices"][0]["message"]["content"].strip()
+            j = self._post_chat(self._fetch_payload(frage, system_prompt), timeout=15, art="fetch_info")
+            info = self._antwort_text(j)
             
             # Cache speichern
-            if info:
-                self.cache[frage_key] = info
-                self._save_cache()
+            self._merke_antwort(frage_key, info)
             
             return info
         except Exception as e:
             print(f"[DeepSeek Fehler]: {e}")
             return ""
 
+    def stream_info(self, frage: str, system_prompt: str | None = None, cache_zaehlen: bool = True):
+        """
+        Wie fetch_info, liefert die Antwort aber stückweise (Server-Sent Events,
+        ``stream: true``), sobald DeepSeek die Tokens erzeugt.
+        Bei Cache-Treffer kommt die ganze Antwort als ein Stück.
+        """
+        if not self.is_active:
+            return
+
+        frage_key = self._cache_key(frage, system_prompt)
+        cached = self.cache.get(frage_key, zaehlen=cache_zaehlen)
+        if cached is not None:
+            yield cached
+            return
+
+        data = dict(self._fetch_payload(frage, system_prompt), stream=True)
+        teile = []
+        start = time.perf_counter()
+        erfolg = False
+        try:
+            with self.session.post(
+                f"{self.base_url}/chat/completions", json=data, timeout=15, stream=True
+            ) as resp:
+                resp.raise_for_status()
+                for zeile in resp.iter_lines(decode_unicode=True):
+                    if not zeile or not zeile.startswith("data:"):
+                        continue
+                    inhalt = zeile[len("data:"):].strip()
+                    if inhalt == "[DONE]":
+                        break
+                    delta = json.loads(inhalt)["choices"][0].get("delta", {}).get("content")
+                    if not delta:
+                        continue
+                    if not teile:
+                        self.metriken["stream_erstes_token"].melde(time.perf_counter() - start)
+                    teile.append(delta)
+                    yield delta
+            erfolg = True
+        except Exception as e:
+            print(f"[DeepSeek Fehler]: {e}")
+        finally:
+            self.metriken["stream_info"].melde(time.perf_counter() - start, erfolg)
+
+        if erfolg:
+            self._merke_antwort(frage_key, "".join(teile).strip())
+
     def smooth_answer(self, frage: str, roh: str) -> str:
         """
         SECUNDARY: Nimmt die Rohantwort und macht sie natürlicher, flüssiger, klarer.
@@ -94,36 +276,9 @@ class DeepseekEngine:
         if not self.is_active:
             return roh
 
-        url = "https://api.deepseek.com/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        data = {
-            "model": "deepseek-chat",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "Formuliere die Antwort natürlich, warm, flüssig und klar auf Deutsch. "
-                        "Behalte Inhalt und Intention, aber mach es menschlicher. "
-                        "Du bist Sulee, 13, empathisch, neugierig, nicht formell."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": f"Frage: {frage}\nRohantwort: {roh}",
-                },
-            ],
-            "temperature": 0.7,
-            "top_p": 0.9,
-        }
-
         try:
-            resp = requests.post(url, headers=headers, json=data, timeout=20)
-            resp.raise_for_status()
-            j = resp.json()
-            return j["choices"][0]["message"]["content"].strip()
+            j = self._post_chat(self._smooth_payload(frage, roh), timeout=20, art="smooth_answer")
+            return self._antwort_text(j)
         except Exception:
             # Fallback: lieber eine etwas rohe Antwort als gar keine
             return roh
@@ -1,6 +1,7 @@
 from .answer_engine import AnswerEngine
 from .emotion_engine import EmotionEngine
 from .growth_engine import GrowthEngine
+from .message_analysis import MessageAnalysis
 
 
 class SuleeEngine:
@@ -36,8 +37,11 @@ class SuleeEngine:
         Returns:
             str: Emotionsgefärbte Antwort
         """
+        # Nachricht einmal analysieren, alle Engines nutzen das Ergebnis
+        analyse = MessageAnalysis(frage)
+
         # Rohantwort generieren
-        roh = self.answer_engine.generate_answer(frage)
+        roh = self.answer_engine.generate_answer(frage, analyse)
         
         # Mit Stimmung färben
         gefärbt = self.emotion_engine.färbe_antwort(roh)
@@ -47,6 +51,24 @@ class SuleeEngine:
         
         return gefärbt
 
+    def generate_answer_stream(self, frage: str):
+        """
+        Streaming-Variante von generate_answer: liefert die Antwort stückweise,
+        die Stimmungs-Färbung wird am Ende angehängt.
+        """
+        teile = []
+        for teil in self.answer_engine.generate_answer_stream(frage, MessageAnalysis(frage)):
+            teile.append(teil)
+            yield teil
+
+        roh = "".join(teile)
+        gefärbt = self.emotion_engine.färbe_antwort(roh)
+        # EmotionEngine hängt nur an, deshalb reicht der Rest hinter der Rohantwort
+        if gefärbt.startswith(roh) and len(gefärbt) > len(roh):
+            yield gefärbt[len(roh):]
+
+        self.growth_engine.add_erfahrung(1)
+
     # ---------------------------------------------------------
     # STIMMUNGS-SCHNITTSTELLE
     # ---------------------------------------------------------
@@ -6,7 +6,84 @@ Für Sulees Charakter-Stabilität: Kontext bestimmt die beste Quelle.
 """
 
 import os
-from typing import Literal
+import random
+import threading
+import time
+from typing import Callable, Literal
+
+from .metriken import LatenzStatistik
+from . import keyword_matcher
+
+
+class Schutzschalter:
+    """
+    Circuit Breaker für ein Backend.
+
+    - geschlossen: Anfragen laufen normal
+    - offen: nach ``fehler_schwelle`` Fehlern in Folge wird das Backend ``pause`` Sekunden gemieden
+    - halb_offen: danach darf genau ein Versuch durch (wer ``reserviere()`` zuerst ruft);
+      Erfolg schließt, Fehler öffnet wieder. Meldet sich der Versuch nicht binnen
+      ``pause`` Sekunden, wird er freigegeben.
+    """
+
+    def __init__(self, fehler_schwelle: int = 3, pause: float = 30.0):
+        self.fehler_schwelle = fehler_schwelle
+        self.pause = pause
+        self.zustand = "geschlossen"
+        self.fehler_in_folge = 0
+        self.geoeffnet_um = 0.0
+        self._versuch_seit = None   # Start des laufenden Versuchs im halb-offenen Zustand
+        self._lock = threading.Lock()
+
+    def _pause_vorbei(self):
+        if self.zustand == "offen" and time.monotonic() - self.geoeffnet_um >= self.pause:
+            self.zustand = "halb_offen"
+            self._versuch_seit = None
+
+    def _versuch_frei(self) -> bool:
+        return self._versuch_seit is None or time.monotonic() - self._versuch_seit >= self.pause
+
+    def erlaubt(self) -> bool:
+        """Dürfte eine Anfrage durch? Belegt den Versuch im halb-offenen Zustand nicht."""
+        with self._lock:
+            self._pause_vorbei()
+            if self.zustand == "halb_offen":
+                return self._versuch_frei()
+            return self.zustand == "geschlossen"
+
+    def reserviere(self) -> bool:
+        """Wie erlaubt(), belegt im halb-offenen Zustand aber den einen Versuch. Ergebnis per melde()."""
+        with self._lock:
+            self._pause_vorbei()
+            if self.zustand == "halb_offen":
+                if not self._versuch_frei():
+                    return False
+                self._versuch_seit = time.monotonic()
+                return True
+            return self.zustand == "geschlossen"
+
+    def melde(self, erfolg: bool):
+        with self._lock:
+            self._versuch_seit = None
+            if erfolg:
+                self.zustand = "geschlossen"
+                self.fehler_in_folge = 0
+                return
+            self.fehler_in_folge += 1
+            if self.zustand == "halb_offen" or self.fehler_in_folge >= self.fehler_schwelle:
+                self.zustand = "offen"
+                self.geoeffnet_um = time.monotonic()
+
+    def probe(self, ok: bool):
+        """Ergebnis eines Health-Checks: Ausfall öffnet sofort, Erreichbarkeit erlaubt einen echten Versuch."""
+        with self._lock:
+            if not ok:
+                self.zustand = "offen"
+                self.geoeffnet_um = time.monotonic()
+                self._versuch_seit = None
+            elif self.zustand == "offen":
+                self.zustand = "halb_offen"
+                self._versuch_seit = None
 
 
 class HybridInferenceRouter:
@@ -19,10 +96,140 @@ class HybridInferenceRouter:
     - Charakter-Kohärenz
     """
 
-    def __init__(self):
+    BACKENDS = ("deepseek", "llama")
+
+    def __init__(
+        self,
+        llama_bereit: Callable[[], bool] | None = None,
+        adaptiv: bool | None = None,
+        probe_intervall: float = 30.0,
+        min_aufrufe: int = 5,
+        tempo_faktor: float = 1.5,
+        erkundung: float = 0.05,
+        cache=None,
+    ):
         self.deepseek_available = bool(os.getenv("DEEPSEEK_API_KEY"))
         self.llama_available = True  # Annahme: lokal vorhanden
         self.prefer_offline = False  # Kann vom Nutzer gesetzt werden
+        # Meldet, ob das lokale Modell fertig geladen ist (z.B. llama_engine.ist_bereit)
+        self.llama_bereit = llama_bereit
+        # Cache-Stufe vor allen Backends (cache_tier.CacheTier), None = aus
+        self.cache = cache
+
+        # Adaptives Routing: Latenz/Fehler pro Backend, Circuit Breaker, Health-Probes
+        if adaptiv is None:
+            adaptiv = os.getenv("SULEE_ROUTER_ADAPTIV", "1") != "0"
+        self.adaptiv = adaptiv
+        self.probe_intervall = probe_intervall
+        self.min_aufrufe = min_aufrufe        # erst ab so vielen Messungen wird nach Tempo umgeleitet
+        self.tempo_faktor = tempo_faktor      # so viel schneller (p50) muss das andere Backend sein
+        self.erkundung = erkundung            # Anteil, der trotzdem zum Stamm-Backend geht (hält dessen Werte aktuell)
+        self.statistik = {b: LatenzStatistik() for b in self.BACKENDS}
+        self.schalter = {b: Schutzschalter() for b in self.BACKENDS}
+        self._probes = {}
+        self._probe_ergebnis = {}
+        self._letzte_probe = 0.0
+        self._probe_lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # GESUNDHEIT & STATISTIK
+    # ---------------------------------------------------------
+
+    def melde_ergebnis(self, backend: str, latenz: float, erfolg: bool):
+        """Nach jedem Backend-Aufruf melden (Dauer in Sekunden, Erfolg ja/nein)."""
+        if backend not in self.statistik:
+            return
+        self.statistik[backend].melde(latenz, erfolg)
+        self.schalter[backend].melde(erfolg)
+
+    def registriere_probe(self, backend: str, probe: Callable[[], bool]):
+        """Günstiger Gesundheits-Check (z.B. GET /models), läuft höchstens alle ``probe_intervall`` Sekunden."""
+        self._probes[backend] = probe
+
+    def _pruefe_probes(self):
+        """Startet fällige Probes im Hintergrund, damit route() nie auf das Netz wartet."""
+        if not self._probes or time.monotonic() - self._letzte_probe < self.probe_intervall:
+            return
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        self._letzte_probe = time.monotonic()
+        threading.Thread(target=self._lauf_probes, name="router-probes", daemon=True).start()
+
+    def _lauf_probes(self):
+        try:
+            for backend, probe in list(self._probes.items()):
+                start = time.perf_counter()
+                try:
+                    ok = bool(probe())
+                except Exception:
+                    ok = False
+                self._probe_ergebnis[backend] = {"ok": ok, "ms": round((time.perf_counter() - start) * 1000, 1)}
+                # Probes messen nur Erreichbarkeit: sie schalten den Breaker, aber nicht die Latenz-Statistik
+                self.schalter[backend].probe(ok)
+        finally:
+            self._probe_lock.release()
+
+    def latenz_budget(self, backend: str, perzentil: float = 95, standard: float | None = None):
+        """Live-Perzentil der Latenz (Sekunden), ``standard`` solange es zu wenige Messungen gibt."""
+        statistik = self.statistik.get(backend)
+        if statistik is None or len(statistik) < self.min_aufrufe:
+            return standard
+        return statistik.perzentil(perzentil)
+
+    def _ist_gesund(self, backend: str) -> bool:
+        if backend == "deepseek":
+            verfuegbar = self.deepseek_available
+        else:
+            verfuegbar = self._ist_llama_bereit()
+        if not verfuegbar:
+            return False
+        return not self.adaptiv or self.schalter[backend].erlaubt()
+
+    def _anpassen(self, backend: str) -> str:
+        """Weicht auf das andere Backend aus, wenn dieses gestört oder deutlich schneller ist."""
+        if not self.adaptiv:
+            return backend
+        anderes = "llama" if backend == "deepseek" else "deepseek"
+        if not self._ist_gesund(anderes):
+            return backend
+        if not self._ist_gesund(backend):
+            return anderes
+        if anderes == "deepseek" and self.prefer_offline:
+            return backend
+        eigen, fremd = self.statistik[backend], self.statistik[anderes]
+        if len(eigen) < self.min_aufrufe or len(fremd) < self.min_aufrufe:
+            return backend
+        if fremd.perzentil(50) * self.tempo_faktor < eigen.perzentil(50) and random.random() >= self.erkundung:
+            return anderes
+        return backend
+
+    def _belege(self, backend: str) -> str:
+        """
+        Belegt für das gewählte Backend den einen Versuch, falls sein Breaker halb offen ist.
+        Ist der schon vergeben, geht die Anfrage zum anderen Backend (sofern das durchkommt).
+        """
+        if not self.adaptiv or self.schalter[backend].reserviere():
+            return backend
+        anderes = "llama" if backend == "deepseek" else "deepseek"
+        if self._ist_gesund(anderes) and self.schalter[anderes].reserviere():
+            return anderes
+        # Beide gesperrt: wie bisher beim gewählten Backend bleiben
+        return backend
+
+    # ---------------------------------------------------------
+    # ROUTING
+    # ---------------------------------------------------------
+
+    def _ist_llama_bereit(self) -> bool:
+        if not self.llama_available:
+            return False
+        return self.llama_bereit() if self.llama_bereit else True
+
+    def _llama_oder_ausweich(self) -> str:
+        """Llama, solange es noch lädt aber DeepSeek, damit niemand auf den Kaltstart wartet."""
+        if not self._ist_llama_bereit() and self.deepseek_available:
+            return "deepseek"
+        return "llama"
 
     def route(self, frage: str, question_type: str, is_critical: bool = False) -> Literal["deepseek", "llama", "cache"]:
         """
@@ -36,13 +243,42 @@ class HybridInferenceRouter:
         Returns:
             "deepseek" | "llama" | "cache"
         """
-        
-        # PRIORITÄT 1: Safety/kritische Fragen → immer Llama (lokal, kontrolliert)
+        backend, _ = self.route_oder_cache(frage, question_type, is_critical)
+        return backend
+
+    def route_oder_cache(
+        self,
+        frage: str,
+        question_type: str,
+        is_critical: bool = False,
+        system_prompt: str | None = None,
+        wissen=None,
+    ) -> tuple[str, str | None]:
+        """
+        Wie route(), fragt aber vorher die Cache-Stufe.
+
+        Returns:
+            ("cache", antwort) bei einem Treffer, sonst (backend, None)
+        """
+        # PRIORITÄT 1: Safety bleibt immer lokal, auch wenn ein anderes Backend schneller wäre
+        # (und kommt nie aus dem Cache)
         if is_critical or question_type == "safety":
-            return "llama"
-        
+            return "llama", None
+
+        # PRIORITÄT 0: Schon beantwortet → kein Modell nötig
+        if self.cache is not None:
+            antwort = self.cache.suche(frage, system_prompt, wissen)
+            if antwort:
+                return "cache", antwort
+
+        self._pruefe_probes()
+        return self._belege(self._anpassen(self._route_nach_typ(frage, question_type))), None
+
+    def _route_nach_typ(self, frage: str, question_type: str) -> str:
+        """Statische Wahl nach Frage-Typ und Verfügbarkeit (ohne Latenz/Gesundheit)."""
+        # PRIORITÄT 1: Safety/kritische Fragen → immer Llama (lokal, kontrolliert), siehe route()
         # PRIORITÄT 2: Character-Kohärenz → lokal Llama (konsistent, im Charakter)
-        if question_type == "character" and self.llama_available and not self.deepseek_available:
+        if question_type == "character" and self._ist_llama_bereit() and not self.deepseek_available:
             return "llama"
         
         # PRIORITÄT 3: Reasoning/komplexe Fragen → DeepSeek (besser, wenn verfügbar)
@@ -52,29 +288,42 @@ class HybridInferenceRouter:
         
         # PRIORITÄT 4: Emotionale Fragen → Sulee-voice via Llama (persönlicher)
         if question_type == "emotion":
-            return "llama"
+            return self._llama_oder_ausweich()
         
         # DEFAULT: DeepSeek wenn verfügbar, sonst Llama
         if self.deepseek_available and not self.prefer_offline:
             return "deepseek"
         
-        return "llama"
+        return self._llama_oder_ausweich()
 
-    def should_use_cache_only(self, frage: str) -> bool:
+    def should_use_cache_only(self, frage: str, system_prompt: str | None = None, wissen=None) -> bool:
         """
         Wenn die Antwort bereits im Cache ist, nutze sie direkt.
         Spart API-Kosten und ist schneller.
         """
-        # Das wird von answer_engine.py geprüft
-        return True
+        if self.cache is None:
+            return False
+        return self.cache.suche(frage, system_prompt, wissen) is not None
 
     def get_strategy(self) -> dict:
         """Gib die aktuelle Strategie aus zur Debugging."""
         return {
             "deepseek_available": self.deepseek_available,
             "llama_available": self.llama_available,
+            "llama_ready": self._ist_llama_bereit(),
             "prefer_offline": self.prefer_offline,
             "strategy": "Context-aware routing (intelligent hybrid)"
+            + (" + latency/health-aware" if self.adaptiv else ""),
+            "backends": {
+                backend: {
+                    **self.statistik[backend].als_dict(),
+                    "breaker": self.schalter[backend].zustand,
+                    "gesund": self._ist_gesund(backend),
+                    "probe": self._probe_ergebnis.get(backend),
+                }
+                for backend in self.BACKENDS
+            },
+            "cache": self.cache.statistik() if self.cache is not None else None,
         }
 
 
@@ -107,12 +356,21 @@ class QuestionClassifier:
     }
 
     @staticmethod
-    def classify(frage: str) -> str:
-        """Klassifiziere die Frage in einen Typ."""
-        frage_low = frage.lower()
-        
-        for qtype, keywords in QuestionClassifier.KEYWORDS.items():
-            if any(kw in frage_low for kw in keywords):
+    def classify(frage: str, analyse=None) -> str:
+        """
+        Klassifiziere die Frage in einen Typ (erster passender Typ in KEYWORDS-Reihenfolge).
+        Mit ``analyse`` (MessageAnalysis des Zuges) wird nicht neu gescannt.
+        """
+        if analyse is not None:
+            gefunden = analyse.kategorien
+        else:
+            gefunden = keyword_matcher.gemeinsamer_matcher().kategorien_von(frage)
+
+        for qtype in QuestionClassifier.KEYWORDS:
+            if f"frage.{qtype}" in gefunden:
                 return qtype
-        
+
         return "factual"  # Default
+
+
+keyword_matcher.registriere("frage", QuestionClassifier.KEYWORDS)
@@ -2,7 +2,9 @@ import datetime
 import re
 
 # Importe aus deiner sauberen Struktur
-from .safety_guard import SafetyGuard
+from .safety_guardrails import SafetyGuard
+from . import keyword_matcher
+from .message_analysis import MessageAnalysis, registriere_zeitlinie
 # Wir gehen davon aus, dass wissen.py via suleeki erreichbar ist
 
 class IntelligenceEngine:
@@ -11,6 +13,21 @@ class IntelligenceEngine:
     Verbindet: Zeit (Alter), Gedächtnis (Wissen), Beziehungen und Neurologie.
     """
 
+    # --- DATEN QUELLE (THE DATA BRIDGE) ---
+    # Hier definieren wir die wichtigen Eckdaten für 2000-2026.
+    # Wenn du diese in deiner DB hast, kann Sulee sie dort finden.
+    # Wenn nicht, nutzt sie diese Liste (Fallback).
+    HISTORICAL_EVENTS = {
+        # Welt-Ereignisse (Wissen für Sulee, auch wenn sie nicht da war)
+        "9/11": {"datum": datetime.date(2001, 9, 11), "typ": "historie", "info": "Terroranschlag in den USA."},
+        "finanzkrise": {"datum": datetime.date(2008, 9, 15), "typ": "historie", "info": "Finanzkrise weltweit."},
+        
+        # Erlebnisse (Sulee war da)
+        "corona": {"datum": datetime.date(2020, 3, 15), "typ": "erlebnis", "info": "Lockdown beginnt."},
+        "ukraine": {"datum": datetime.date(2022, 2, 24), "typ": "erlebnis", "info": "Krieg in der Ukraine beginnt."},
+        "corona_ende": {"datum": datetime.date(2022, 4, 1), "typ": "erlebnis", "info": "Schule öffnet wieder."}
+    }
+
     def __init__(self, suleeki):
         self.suleeki = suleeki
         
@@ -21,20 +38,7 @@ class IntelligenceEngine:
         # --- TIME ZERO (Geburtsdatum) ---
         self.geburtstag = datetime.date(2011, 12, 25) # Sulees Time-Zero
         
-        # --- DATEN QUELLE (THE DATA BRIDGE) ---
-        # Hier definieren wir die wichtigen Eckdaten für 2000-2026.
-        # Wenn du diese in deiner DB hast, kann Sulee sie dort finden.
-        # Wenn nicht, nutzt sie diese Liste (Fallback).
-        self.historical_events = {
-            # Welt-Ereignisse (Wissen für Sulee, auch wenn sie nicht da war)
-            "9/11": {"datum": datetime.date(2001, 9, 11), "typ": "historie", "info": "Terroranschlag in den USA."},
-            "finanzkrise": {"datum": datetime.date(2008, 9, 15), "typ": "historie", "info": "Finanzkrise weltweit."},
-            
-            # Erlebnisse (Sulee war da)
-            "corona": {"datum": datetime.date(2020, 3, 15), "typ": "erlebnis", "info": "Lockdown beginnt."},
-            "ukraine": {"datum": datetime.date(2022, 2, 24), "typ": "erlebnis", "info": "Krieg in der Ukraine beginnt."},
-            "corona_ende": {"datum": datetime.date(2022, 4, 1), "typ": "erlebnis", "info": "Schule öffnet wieder."}
-        }
+        self.historical_events = self.HISTORICAL_EVENTS
 
         # Beziehungs-Speicher initialisieren
         if "relationships" not in self.suleeki.status:
@@ -44,23 +48,25 @@ class IntelligenceEngine:
     # KERNLOGIK
     # ---------------------------------------------------------
 
-    def generate_answer(self, frage: str, user_name: str = "User") -> str:
+    def generate_answer(self, frage: str, user_name: str = "User", analyse: MessageAnalysis | None = None) -> str:
         """
         Der Haupt-Denkprozess.
+        ``analyse``: die MessageAnalysis des Zuges, falls der Aufrufer sie schon hat.
         """
-        frage_low = frage.lower()
+        analyse = analyse or MessageAnalysis(frage)
+        frage_low = analyse.text_low
         
         # 1. ALTER BESTIMMEN
         bio_alter = self.suleeki.status.get("alter", 13)
         
         # 2. SAFETY CHECK (Höchste Priorität)
-        if self.safety.is_critical_question(frage_low):
+        if self.safety.is_critical_question(frage_low, analyse):
             return self.safety.critical_response(frage_low, bio_alter)
-        if self.safety.is_medical_question(frage_low):
+        if self.safety.is_medical_question(frage_low, analyse):
             return self.safety.medical_response(frage_low, bio_alter)
 
         # 3. ZEIT-LINIE PRÜFEN (History vs. Erlebnis)
-        zeit_kontext = self._pruefe_zeitlinie(frage_low)
+        zeit_kontext = self._pruefe_zeitlinie(frage_low, analyse)
         
         # 4. NEURO-UPDATE (Gefühlsmässige Reaktion)
         if zeit_kontext and zeit_kontext['typ'] == "erlebnis":
@@ -75,13 +81,13 @@ class IntelligenceEngine:
             return self._antwort_zeitlinie(frage, bio_alter, zeit_kontext, beziehung)
         
         # Wenn kein Thema: Standard-Fallout
-        return self._antwort_standard(frage, bio_alter, beziehung)
+        return self._antwort_standard(frage, bio_alter, beziehung, analyse)
 
     # ---------------------------------------------------------
     # HILFSFUNKTIONEN (LOGIK)
     # ---------------------------------------------------------
 
-    def _pruefe_zeitlinie(self, frage: str):
+    def _pruefe_zeitlinie(self, frage: str, analyse: MessageAnalysis | None = None):
         """
         Die Time-Zero Logik.
         Prüft: War das History (Sulee war nicht da) oder Experience (Sulee war da)?
@@ -95,9 +101,11 @@ class IntelligenceEngine:
             # Falls die DB nur Text hat, nutzen wir das als Kontext ohne Zeit-Logik
             return {"key": "db_found", "info": db_info.get("antwort", ""), "typ": "wissen_db"}
         
-        # B) FALLBACK: HISTORISCHE DATEN PRÜFEN
-        for key, data in self.historical_events.items():
-            if key in frage or data["info"].lower() in frage:
+        # B) FALLBACK: HISTORISCHE DATEN PRÜFEN (Treffer kommen aus der MessageAnalysis)
+        analyse = analyse or MessageAnalysis(frage)
+        for key in analyse.zeitlinie:
+            data = self.historical_events.get(key)
+            if data:
                 datum = data["datum"]
                 
                 # MAGISCHE RECHNUNG: War sie da?
@@ -177,11 +185,11 @@ class IntelligenceEngine:
 
         return "Das prägt mich."
 
-    def _antwort_standard(self, frage, bio_alter, beziehung):
+    def _antwort_standard(self, frage, bio_alter, beziehung, analyse=None):
         """Standardantworten für Alltag, Familie, Freunde."""
         
         # Beziehungs-Check für Höflichkeit (Score Update)
-        if "danke" in frage or "bitte" in frage:
+        if (analyse or MessageAnalysis(frage)).hat("intelligenz.hoeflich"):
             self._update_beziehung("User", True)
         
         if bio_alter < 15:
@@ -197,4 +205,10 @@ class IntelligenceEngine:
                 return f"({bio_alter} Jahre) Hallo alter Freund. Was machst du heute Schönes?"
 
         else:
-            return f"({bio_alter} Jahre) Guten Tag. Ich bin Sulee. Wie kann ich Ihnen helfen?"
\ No newline at end of file
+            return f"({bio_alter} Jahre) Guten Tag. Ich bin Sulee. Wie kann ich Ihnen helfen?"
+
+
+keyword_matcher.registriere("intelligenz", {"hoeflich": ("danke", "bitte")})
+registriere_zeitlinie({
+    key: (key, data["info"].lower()) for key, data in IntelligenceEngine.HISTORICAL_EVENTS.items()
+})
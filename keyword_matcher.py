@@ -0,0 +1,125 @@
+"""
+Schlüsselwort-Erkennung in einem Durchgang.
+Alle Stichwort-Listen (Frage-Typen, Safety, Tonfall, Kategorien der AnswerEngine)
+werden zu einem einzigen regulären Ausdruck kompiliert. Eine Nachricht wird
+einmal gescannt und liefert alle passenden Kategorien auf einmal.
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+
+def _trie_muster(woerter) -> str:
+    """Regex aus einem Präfix-Baum: gemeinsame Anfänge werden nur einmal geprüft."""
+    baum = {}
+    for wort in woerter:
+        knoten = baum
+        for zeichen in wort:
+            knoten = knoten.setdefault(zeichen, {})
+        knoten[""] = {}
+
+    def muster(knoten):
+        ende = "" in knoten
+        zweige = []
+        for zeichen in sorted(z for z in knoten if z):
+            zweige.append(re.escape(zeichen) + muster(knoten[zeichen]))
+        if not zweige:
+            return ""
+        rumpf = zweige[0] if len(zweige) == 1 else "(?:" + "|".join(zweige) + ")"
+        if ende:
+            # Gierig: erst weiterlesen, damit an jeder Position das längste Wort gewinnt
+            rumpf = "(?:" + rumpf + ")?"
+        return rumpf
+
+    return muster(baum)
+
+
+class KeywordMatcher:
+    """
+    Findet in einem Text alle Kategorien, von denen mindestens ein Stichwort
+    als Teilstring vorkommt (gleiche Semantik wie ``any(k in text for k in liste)``).
+
+    Technik: ``(?=(...))`` prüft an jeder Position das längste passende Stichwort.
+    Jedes andere Stichwort, das dort passt, ist ein Präfix davon; deshalb erbt
+    jedes Stichwort die Kategorien all seiner Präfixe. So gehen auch
+    überlappende Treffer (``angst`` in ``angststörung``) nicht verloren.
+    """
+
+    def __init__(self, kategorien: dict):
+        self.kategorien = {name: tuple(k.lower() for k in woerter) for name, woerter in kategorien.items()}
+        direkt = {}
+        for name, woerter in self.kategorien.items():
+            for wort in woerter:
+                if wort:
+                    direkt.setdefault(wort, set()).add(name)
+        # Stichwort -> Kategorien aller Stichwörter, die ein Präfix davon sind
+        self._geerbt = {}
+        for wort in direkt:
+            geerbt = set()
+            for laenge in range(1, len(wort) + 1):
+                geerbt |= direkt.get(wort[:laenge], set())
+            self._geerbt[wort] = frozenset(geerbt)
+        self._regex = re.compile("(?=(" + _trie_muster(direkt) + "))") if direkt else None
+        self._cache = lru_cache(maxsize=256)(self._scan)
+
+    def _scan(self, text: str) -> frozenset:
+        if self._regex is None:
+            return frozenset()
+        gefunden = set()
+        alle = len(self.kategorien)
+        for treffer in self._regex.finditer(text):
+            gefunden |= self._geerbt[treffer.group(1)]
+            if len(gefunden) == alle:
+                break
+        return frozenset(gefunden)
+
+    def kategorien_von(self, text: str) -> frozenset:
+        """Alle Kategorien mit mindestens einem Treffer (ein Scan, Ergebnis wird gemerkt)."""
+        return self._cache(text.lower())
+
+    def hat(self, text: str, kategorie: str) -> bool:
+        return kategorie in self.kategorien_von(text)
+
+    def treffer(self, text: str) -> set:
+        """Alle Stichwörter, die im Text vorkommen."""
+        text = text.lower()
+        if self._regex is None:
+            return set()
+        gefunden = set()
+        for treffer in self._regex.finditer(text):
+            wort = treffer.group(1)
+            gefunden.update(wort[:laenge] for laenge in range(1, len(wort) + 1) if wort[:laenge] in self._geerbt)
+        return gefunden
+
+
+# ---------------------------------------------------------
+# GEMEINSAMER MATCHER
+# ---------------------------------------------------------
+# Jede Engine registriert ihre Listen unter einem Namensraum ("safety.medical", ...).
+# Alle teilen sich einen kompilierten Ausdruck: pro Nachricht ein einziger Scan.
+
+_registry = {}
+_gemeinsam = None
+_lock = threading.Lock()
+
+
+def registriere(namensraum: str, kategorien: dict):
+    """Nimmt Stichwort-Listen auf, z.B. registriere("safety", {"medical": [...], "critical": [...]})."""
+    global _gemeinsam
+    with _lock:
+        for name, woerter in kategorien.items():
+            _registry[f"{namensraum}.{name}"] = tuple(woerter)
+        _gemeinsam = None
+
+
+def gemeinsamer_matcher() -> KeywordMatcher:
+    """Der Matcher über alle registrierten Listen (wird bei Änderungen neu kompiliert)."""
+    global _gemeinsam
+    matcher = _gemeinsam
+    if matcher is not None:
+        return matcher
+    with _lock:
+        if _gemeinsam is None:
+            _gemeinsam = KeywordMatcher(_registry)
+        return _gemeinsam
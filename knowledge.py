@@ -1,13 +1,36 @@
 import os
 import json
 from datetime import datetime
+from .wissen_index import NGramIndex
+from .wissen_journal import WissenJournal
+from .persistenz import atomar_json_schreiben
+from .text_normalisierung import normalisiere
+from . import wissen_vektor
 
 class Wissen:
-    def __init__(self, datei="sulee_data/sulee_wissen.json"):
+    def __init__(self, datei="sulee_data/sulee_wissen.json", speicher_modus="json", journal_schwelle=1000,
+                 vektor_index=False, aehnlichkeit_schwelle=0.55):
         self.datei = datei
         os.makedirs(os.path.dirname(datei), exist_ok=True)
+        # "journal": Append-only-Journal mit Hintergrund-Kompaktierung statt Komplett-Rewrite
+        self.speicher_modus = speicher_modus
+        self._journal = WissenJournal(datei, schwelle=journal_schwelle) if speicher_modus == "journal" else None
         self.wissen = {}
         self._lade_wissen()
+        self._index = NGramIndex(self.wissen)
+        # Normalisierte Frage -> gespeicherte Frage (für Cache-Treffer bei anderer Schreibweise)
+        self._normalisiert = {}
+        for key in self.wissen:
+            self._normalisiert.setdefault(normalisiere(key), key)
+
+        # Optional: semantische Suche für umformulierte Fragen (braucht numpy)
+        self._vektoren = None
+        if vektor_index:
+            if wissen_vektor.ist_verfuegbar():
+                self._vektoren = wissen_vektor.VektorIndex(schwelle=aehnlichkeit_schwelle)
+                self._vektoren.hinzufuegen_viele(self.wissen)
+            else:
+                print("[Warnung] numpy nicht installiert, Vektor-Index deaktiviert.")
 
     def _lade_wissen(self):
         if os.path.exists(self.datei):
@@ -17,34 +40,60 @@ class Wissen:
             except Exception as e:
                 print(f"[Warnung] Konnte Wissen nicht laden: {e}")
                 self.wissen = {}
+        if self._journal:
+            try:
+                self._journal.wiederherstellen(self.wissen)
+            except Exception as e:
+                print(f"[Warnung] Konnte Wissens-Journal nicht einspielen: {e}")
 
     def _speichere_wissen(self):
         try:
-            with open(self.datei, "w", encoding="utf-8") as f:
-                json.dump(self.wissen, f, ensure_ascii=False, indent=2)
+            # Läuft bei jedem lerne/korrigiere im Anfrage-Pfad: atomar, aber ohne fsync
+            atomar_json_schreiben(self.datei, self.wissen, fsync=False)
         except Exception as e:
             print(f"[Fehler] Konnte Wissen nicht speichern: {e}")
 
+    def _persistiere(self, frage_low: str, entry: dict):
+        if not self._journal:
+            self._speichere_wissen()
+            return
+        try:
+            self._journal.anhaengen(frage_low, entry)
+            if self._journal.braucht_kompaktierung():
+                self._journal.kompaktieren(self.wissen)
+        except Exception as e:
+            print(f"[Fehler] Konnte Wissen nicht ins Journal schreiben: {e}")
+
     def pruefe_wissen(self, frage: str) -> str:
         frage_low = frage.lower().strip()
-        for gespeicherte_frage, meta in self.wissen.items():
-            if gespeicherte_frage in frage_low or frage_low in gespeicherte_frage:
-                if meta.get("quelle") == "core":
-                    return meta
-                status = meta.get("status")
-                if status == "accepted":
-                    return meta
-                return None # Pending Facts werden nicht als "Wissen" ausgegeben, nur für Reflexion
-        return None
+        gespeicherte_frage = self._index.erster_treffer(frage_low)
+        if gespeicherte_frage is None:
+            return None
+        meta = self.wissen[gespeicherte_frage]
+        if meta.get("quelle") == "core":
+            return meta
+        status = meta.get("status")
+        if status == "accepted":
+            return meta
+        return None # Pending Facts werden nicht als "Wissen" ausgegeben, nur für Reflexion
 
     def get_relevant_context(self, frage: str):
         """Gibt ALLE relevanten Infos zurück (auch Pending) für die Reflexion."""
         frage_low = frage.lower().strip()
-        relevant = []
-        for key, val in self.wissen.items():
-            if key in frage_low or frage_low in key:
-                relevant.append(val)
-        return relevant
+        keys = self._index.treffer(frage_low)
+        if self._vektoren is not None:
+            # Wörtliche Treffer zuerst, danach ähnliche Fragen nach Ähnlichkeit
+            gefunden = set(keys)
+            keys += [key for key, _ in self._vektoren.suche(frage_low) if key not in gefunden]
+        return [self.wissen[key] for key in keys]
+
+    def nachschlagen(self, frage: str):
+        """Eintrag genau zu dieser Frage (auch pending), sonst zur normalisierten Frage, sonst None."""
+        frage_low = frage.lower().strip()
+        if frage_low in self.wissen:
+            return self.wissen[frage_low]
+        key = self._normalisiert.get(normalisiere(frage_low))
+        return self.wissen[key] if key is not None else None
 
     def speichere_wissen(self, frage: str, antwort: str, source: str = "user", allow_overwrite: bool = False):
         frage_low = frage.lower().strip()
@@ -67,7 +116,11 @@ class Wissen:
             entry["status"] = "pending"
 
         self.wissen[frage_low] = entry
-        self._speichere_wissen()
+        self._index.hinzufuegen(frage_low)
+        self._normalisiert.setdefault(normalisiere(frage_low), frage_low)
+        if self._vektoren is not None:
+            self._vektoren.hinzufuegen(frage_low)
+        self._persistiere(frage_low, entry)
         return True
 
     def get_all(self):
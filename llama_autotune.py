@@ -0,0 +1,118 @@
+"""
+Auto-Tuning für die lokale Llama-Engine.
+Misst Prompt-Auswertung und Generierung (Tokens/Sekunde) für verschiedene
+Thread-Zahlen auf der aktuellen CPU und speichert die besten Werte in llama_config.json.
+
+Aufruf:  python -m <paket>.llama_autotune [--threads 2 4 8] [--tokens 64]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from .llama_engine import CONFIG_DATEI, Llama, lade_konfiguration
+from .persistenz import atomar_json_schreiben
+
+BENCH_PROMPT = (
+    "Du bist Sulee, 13 Jahre alt, neugierig und empathisch. Du liebst Gitarre und Robotik. "
+    "Beantworte die folgende Frage in zwei bis drei Sätzen auf Deutsch.\n\n"
+    "Frage: Warum ist der Himmel blau, und warum ist der Sonnenuntergang rot?"
+)
+
+
+def _kandidaten_threads() -> list:
+    kerne = os.cpu_count() or 4
+    werte = {1, 2, 4, kerne // 2, kerne}
+    werte.update(range(6, kerne + 1, 4))
+    return sorted(w for w in werte if 1 <= w <= kerne)
+
+
+def messe(llm, prompt: str, max_tokens: int) -> dict:
+    """
+    Ein Durchlauf ohne Prefix-Wiederverwendung:
+    Zeit bis zum ersten Token = Prompt-Auswertung, danach reine Generierung.
+    """
+    llm.reset()
+    prompt_tokens = len(llm.tokenize(prompt.encode("utf-8")))
+    start = time.perf_counter()
+    erstes = None
+    anzahl = 0
+    for _ in llm(prompt, max_tokens=max_tokens, temperature=0.0, stream=True):
+        if erstes is None:
+            erstes = time.perf_counter()
+        anzahl += 1
+    ende = time.perf_counter()
+    erstes = erstes or ende
+    return {
+        "prompt_tps": prompt_tokens / max(erstes - start, 1e-9),
+        "gen_tps": (anzahl - 1) / max(ende - erstes, 1e-9) if anzahl > 1 else 0.0,
+    }
+
+
+def autotune(threads=None, max_tokens: int = 64, wiederholungen: int = 2, speichern: bool = True) -> dict:
+    """
+    Probiert alle Thread-Zahlen aus und gibt die besten Einstellungen zurück.
+    n_threads wird nach Generierungs-Tempo gewählt, n_threads_batch nach Prompt-Tempo.
+    """
+    if Llama is None:
+        raise ImportError("llama_cpp ist nicht installiert")
+
+    basis = lade_konfiguration()
+    ergebnisse = []
+    for n in threads or _kandidaten_threads():
+        llm = Llama(
+            model_path=basis["model_path"],
+            n_ctx=basis["n_ctx"],
+            n_batch=basis["n_batch"],
+            n_gpu_layers=basis["n_gpu_layers"],
+            n_threads=n,
+            n_threads_batch=n,
+            verbose=False,
+        )
+        messe(llm, BENCH_PROMPT, 8)   # Aufwärmen (Page-Cache, Allokationen)
+        laeufe = [messe(llm, BENCH_PROMPT, max_tokens) for _ in range(wiederholungen)]
+        ergebnis = {
+            "threads": n,
+            "prompt_tps": round(max(l["prompt_tps"] for l in laeufe), 2),
+            "gen_tps": round(max(l["gen_tps"] for l in laeufe), 2),
+        }
+        ergebnisse.append(ergebnis)
+        print(f"[Autotune] threads={n:>3}  prompt {ergebnis['prompt_tps']:>8.1f} tok/s  "
+              f"generierung {ergebnis['gen_tps']:>6.1f} tok/s")
+        del llm
+
+    beste = {
+        "n_threads": max(ergebnisse, key=lambda e: e["gen_tps"])["threads"],
+        "n_threads_batch": max(ergebnisse, key=lambda e: e["prompt_tps"])["threads"],
+    }
+
+    if speichern:
+        gespeichert = {}
+        if CONFIG_DATEI.exists():
+            with open(CONFIG_DATEI, "r", encoding="utf-8") as f:
+                gespeichert = json.load(f)
+        gespeichert.update(beste)
+        gespeichert["autotune"] = {
+            "datum": datetime.now().isoformat(),
+            "cpu_count": os.cpu_count(),
+            "ergebnisse": ergebnisse,
+        }
+        atomar_json_schreiben(CONFIG_DATEI, gespeichert)
+        print(f"[Autotune] Gespeichert in {CONFIG_DATEI}: {beste}")
+    return beste
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thread-Einstellungen der Llama-Engine auf dieser CPU optimieren.")
+    parser.add_argument("--threads", type=int, nargs="+", help="zu testende Thread-Zahlen")
+    parser.add_argument("--tokens", type=int, default=64, help="generierte Tokens pro Messung")
+    parser.add_argument("--wiederholungen", type=int, default=2)
+    parser.add_argument("--nicht-speichern", action="store_true")
+    args = parser.parse_args()
+    autotune(args.threads, args.tokens, args.wiederholungen, speichern=not args.nicht_speichern)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,113 @@
-from llama_cpp import Llama
+import os
+import json
+import threading
+from pathlib import Path
+
+try:
+    from llama_cpp import Llama, LlamaRAMCache
+except ImportError:  # Engine meldet den Fehler erst beim Laden
+    Llama = None
+    LlamaRAMCache = None
+
+DEFAULT_MODEL_PATH = "/workspaces/sulee_ki/models/Llama-3.2-3B-Instruct-Q4_K_M.gguf"
+
+# Persistierte Einstellungen (z.B. vom Auto-Tuning, siehe llama_autotune.py)
+CONFIG_DATEI = Path(os.getenv("SULEE_LLAMA_CONFIG", Path(__file__).parent / "llama_config.json"))
+
+# Standardwerte: Threads wie llama_cpp selbst (Hälfte der logischen Kerne, meist = physische)
+DEFAULT_CONFIG = {
+    "model_path": DEFAULT_MODEL_PATH,
+    "n_ctx": 2048,
+    "n_threads": max(1, (os.cpu_count() or 8) // 2),
+    "n_threads_batch": None,   # None = wie n_threads
+    "n_batch": 512,
+    "n_gpu_layers": 0,
+    "prompt_cache_mb": 256,    # KV-Cache für gemeinsame Prompt-Präfixe, 0 = aus
+}
+
+ENV_VARIABLEN = {
+    "model_path": "SULEE_LLAMA_MODEL",
+    "n_ctx": "SULEE_LLAMA_N_CTX",
+    "n_threads": "SULEE_LLAMA_N_THREADS",
+    "n_threads_batch": "SULEE_LLAMA_N_THREADS_BATCH",
+    "n_batch": "SULEE_LLAMA_N_BATCH",
+    "n_gpu_layers": "SULEE_LLAMA_N_GPU_LAYERS",
+    "prompt_cache_mb": "SULEE_LLAMA_PROMPT_CACHE_MB",
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    wert = os.getenv(name)
+    if wert is None:
+        return default
+    return wert.strip().lower() in ("1", "true", "ja", "yes", "on")
+
+
+def lade_konfiguration(**overrides) -> dict:
+    """
+    Modell-Einstellungen in dieser Reihenfolge (später gewinnt):
+    Standardwerte < llama_config.json < Umgebungsvariablen < explizite Argumente.
+    """
+    config = dict(DEFAULT_CONFIG)
+    if CONFIG_DATEI.exists():
+        try:
+            with open(CONFIG_DATEI, "r", encoding="utf-8") as f:
+                gespeichert = json.load(f)
+            config.update({k: v for k, v in gespeichert.items() if k in DEFAULT_CONFIG})
+        except Exception as e:
+            print(f"[Warnung] Konnte Llama-Konfiguration nicht laden: {e}")
+    for key, env in ENV_VARIABLEN.items():
+        wert = os.getenv(env)
+        if wert:
+            config[key] = wert if key == "model_path" else int(wert)
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    if config["n_threads_batch"] is None:
+        config["n_threads_batch"] = config["n_threads"]
+    return config
+
 
 class LlamaEngine:
-    def __init__(self):
-        self.model_path = "/workspaces/sulee_ki/models/Llama-3.2-3B-Instruct-Q4_K_M.gguf"
+    def __init__(self, use_mmap: bool | None = None, use_mlock: bool | None = None, **config):
+        if Llama is None:
+            raise ImportError("llama_cpp ist nicht installiert")
+        self.config = lade_konfiguration(**config)
+        self.model_path = self.config["model_path"]
+        # mmap: mehrere Prozesse teilen sich die Modell-Seiten im Page-Cache
+        # mlock: Modell im RAM festhalten (kein Auslagern), braucht ggf. Rechte
+        self.use_mmap = _env_bool("SULEE_LLAMA_MMAP", True) if use_mmap is None else use_mmap
+        self.use_mlock = _env_bool("SULEE_LLAMA_MLOCK", False) if use_mlock is None else use_mlock
         self.llm = Llama(
             model_path=self.model_path,
-            n_ctx=2048,
-            n_threads=4
+            n_ctx=self.config["n_ctx"],
+            n_threads=self.config["n_threads"],
+            n_threads_batch=self.config["n_threads_batch"],
+            n_batch=self.config["n_batch"],
+            n_gpu_layers=self.config["n_gpu_layers"],
+            use_mmap=self.use_mmap,
+            use_mlock=self.use_mlock
         )
 
+        # Prefix-Cache: der KV-Zustand gemeinsamer Prompt-Anfänge (Sulees System-Prompt)
+        # wird gespeichert und bei der nächsten Anfrage geladen statt neu berechnet.
+        self._vorgewaermt = set()
+        if self.config["prompt_cache_mb"] > 0:
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=self.config["prompt_cache_mb"] << 20))
+
+    def praefix_vorwaermen(self, praefix: str) -> bool:
+        """
+        Wertet einen Prompt-Anfang einmal aus und legt den Zustand im Prefix-Cache ab
+        (z.B. den System-Prompt einer Altersstufe). Spätere Prompts, die damit beginnen,
+        überspringen diesen Teil. Gibt True zurück, wenn neu ausgewertet wurde.
+        """
+        if self.llm.cache is None or praefix in self._vorgewaermt:
+            return False
+        tokens = self.llm.tokenize(praefix.encode("utf-8"))
+        self.llm.reset()
+        self.llm.eval(tokens)
+        self.llm.cache[tokens] = self.llm.save_state()
+        self._vorgewaermt.add(praefix)
+        return True
+
     def generate(self, prompt: str) -> str:
         response = self.llm(
             prompt,
@@ -17,3 +116,85 @@ class LlamaEngine:
             top_p=0.9
         )
         return response["choices"][0]["text"].strip()
+
+    def generate_stream(self, prompt: str):
+        """Wie generate, liefert die Tokens aber einzeln, sobald sie erzeugt sind."""
+        erstes = True
+        for chunk in self.llm(
+            prompt,
+            max_tokens=256,
+            temperature=0.7,
+            top_p=0.9,
+            stream=True
+        ):
+            text = chunk["choices"][0]["text"]
+            if erstes:
+                # generate() strippt die Antwort, also führenden Leerraum weglassen
+                text = text.lstrip()
+                if not text:
+                    continue
+                erstes = False
+            yield text
+
+
+# ---------------------------------------------------------
+# GETEILTE INSTANZ & AUFWÄRMEN IM HINTERGRUND
+# ---------------------------------------------------------
+# Ein Modell pro Prozess, für alle Sessions und Routen.
+# Das Laden läuft in einem Hintergrund-Thread, damit kein Nutzer den Kaltstart abwartet.
+
+_shared_engine = None
+_lade_fehler = None
+_lade_thread = None
+_bereit = threading.Event()
+_lock = threading.Lock()
+
+
+def _lade_shared_engine(kwargs, praefixe):
+    global _shared_engine, _lade_fehler
+    try:
+        engine = LlamaEngine(**kwargs)
+        for praefix in praefixe:
+            engine.praefix_vorwaermen(praefix)
+        _shared_engine = engine
+        print("[LlamaEngine] Modell geladen und bereit.")
+    except Exception as e:
+        _lade_fehler = e
+        print(f"[Warnung] Llama-Engine konnte nicht geladen werden: {e}")
+    finally:
+        _bereit.set()
+
+
+def starte_aufwaermen(praefixe=(), **kwargs) -> threading.Thread:
+    """
+    Startet das Laden des Modells im Hintergrund (nur einmal pro Prozess).
+    ``praefixe`` (z.B. System-Prompts) kommen danach direkt in den Prefix-Cache.
+    """
+    global _lade_thread
+    with _lock:
+        if _lade_thread is None:
+            _lade_thread = threading.Thread(
+                target=_lade_shared_engine, args=(kwargs, list(praefixe)), name="llama-aufwaermen", daemon=True
+            )
+            _lade_thread.start()
+        return _lade_thread
+
+
+def ist_bereit() -> bool:
+    """True, sobald das geteilte Modell geladen ist und Anfragen beantworten kann."""
+    return _bereit.is_set() and _shared_engine is not None
+
+
+def ist_fehlgeschlagen() -> bool:
+    return _bereit.is_set() and _shared_engine is None
+
+
+def get_shared_engine(timeout: float | None = 0):
+    """
+    Gibt die geteilte LlamaEngine zurück.
+    Startet bei Bedarf das Aufwärmen und wartet höchstens ``timeout`` Sekunden
+    (None = bis fertig). Ist das Modell (noch) nicht da, kommt None zurück.
+    """
+    starte_aufwaermen()
+    _bereit.wait(timeout)
+    return _shared_engine
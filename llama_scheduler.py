@@ -0,0 +1,305 @@
+"""
+Warteschlange vor der lokalen Llama-Engine.
+``Llama`` ist nicht thread-sicher: ein einziger Worker-Thread besitzt das Modell,
+alle Sessions reichen ihre Anfragen über eine Prioritäts-Warteschlange mit Futures ein.
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from .metriken import LatenzStatistik
+
+PRIORITAET_SAFETY = 0       # Safety-Routen zuerst
+PRIORITAET_NORMAL = 10
+PRIORITAET_HINTERGRUND = 20
+
+_ENDE = object()
+
+
+class WarteschlangeVoll(RuntimeError):
+    """Die Warteschlange hat ihre maximale Tiefe erreicht."""
+
+
+class Abbruch(threading.Event):
+    """
+    Abbruch-Signal für einen Auftrag (``submit``/``generate_stream``). Anders als ein
+    reines Event wirkt ``set()`` auch auf Aufträge, die noch in der Warteschlange
+    stehen: sie werden entfernt, und ein wartender Stream-Leser wacht sofort auf.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._rueckrufe = []
+        self._rueckruf_lock = threading.Lock()
+
+    def bei_abbruch(self, rueckruf):
+        """Ruft ``rueckruf`` beim Setzen auf (sofort, falls schon gesetzt)."""
+        with self._rueckruf_lock:
+            if not self.is_set():
+                self._rueckrufe.append(rueckruf)
+                return
+        rueckruf()
+
+    def set(self):
+        with self._rueckruf_lock:
+            super().set()
+            rueckrufe, self._rueckrufe = self._rueckrufe, []
+        for rueckruf in rueckrufe:
+            rueckruf()
+
+
+class _Auftrag:
+    __slots__ = ("prioritaet", "nummer", "prompt", "praefix", "stream", "future", "senke",
+                 "eingang", "frist", "abgebrochen")
+
+    def __init__(self, prioritaet, nummer, prompt, praefix, stream, timeout):
+        self.prioritaet = prioritaet
+        self.nummer = nummer
+        self.prompt = prompt
+        self.praefix = praefix
+        self.stream = stream
+        self.future = Future()
+        self.senke = queue.Queue() if stream else None
+        self.eingang = time.perf_counter()
+        self.frist = self.eingang + timeout if timeout else None
+        self.abgebrochen = threading.Event()
+
+    def __lt__(self, other):
+        return (self.prioritaet, self.nummer) < (other.prioritaet, other.nummer)
+
+    def abgelaufen(self, jetzt) -> bool:
+        return self.frist is not None and jetzt > self.frist
+
+
+class LlamaScheduler:
+    """
+    Besitzt die Engine auf genau einem Worker-Thread.
+
+    - Prioritäten: kleinere Zahl zuerst, bei Gleichstand in Eingangs-Reihenfolge
+    - Timeouts: abgelaufene Aufträge werden gar nicht erst gerechnet
+    - Micro-Batching: wartende Aufträge mit identischem Prompt werden mit
+      einem einzigen Modell-Durchlauf beantwortet (llama_cpp rechnet pro
+      Kontext nur eine Sequenz, daher Zusammenfassen statt echter Batches)
+    """
+
+    def __init__(self, engine, max_tiefe: int = 64):
+        self.engine = engine
+        self.max_tiefe = max_tiefe
+        self._heap = []
+        self._nummern = itertools.count()
+        self._cond = threading.Condition()
+        self._laeuft = True
+        self.wartezeit = LatenzStatistik()
+        self.laufzeit = LatenzStatistik()
+        self.zaehler = {"angenommen": 0, "abgelehnt": 0, "abgelaufen": 0, "abgebrochen": 0,
+                        "zusammengefasst": 0, "max_tiefe_gesehen": 0}
+        self._worker = threading.Thread(target=self._arbeite, name="llama-scheduler", daemon=True)
+        self._worker.start()
+
+    # ---------------------------------------------------------
+    # EINREICHEN
+    # ---------------------------------------------------------
+
+    def _einreihen(self, prompt, prioritaet, timeout, praefix, stream, abbruch=None) -> _Auftrag:
+        with self._cond:
+            if not self._laeuft:
+                raise RuntimeError("LlamaScheduler ist gestoppt")
+            if len(self._heap) >= self.max_tiefe:
+                self.zaehler["abgelehnt"] += 1
+                raise WarteschlangeVoll(f"Llama-Warteschlange voll ({self.max_tiefe})")
+            auftrag = _Auftrag(prioritaet, next(self._nummern), prompt, praefix, stream, timeout)
+            heapq.heappush(self._heap, auftrag)
+            self.zaehler["angenommen"] += 1
+            self.zaehler["max_tiefe_gesehen"] = max(self.zaehler["max_tiefe_gesehen"], len(self._heap))
+            self._cond.notify()
+        if abbruch is not None:
+            abbruch.bei_abbruch(lambda: self._abbrechen(auftrag))
+        return auftrag
+
+    def _abbrechen(self, auftrag: _Auftrag):
+        """Nimmt einen wartenden Auftrag aus der Warteschlange; ein laufender Stream endet nach dem nächsten Token."""
+        auftrag.abgebrochen.set()
+        with self._cond:
+            if auftrag in self._heap:
+                self._heap.remove(auftrag)
+                heapq.heapify(self._heap)
+                self.zaehler["abgebrochen"] += 1
+        auftrag.future.cancel()
+        if auftrag.senke:
+            # Weckt einen Leser, der noch auf das erste Token wartet
+            auftrag.senke.put(_ENDE)
+
+    def submit(self, prompt: str, prioritaet: int = PRIORITAET_NORMAL, timeout: float | None = None,
+               praefix: str | None = None, abbruch: Abbruch | None = None) -> Future:
+        """Reiht eine Generierung ein. Das Future liefert den Antworttext, ``abbruch`` zieht sie zurück."""
+        return self._einreihen(prompt, prioritaet, timeout, praefix, stream=False, abbruch=abbruch).future
+
+    def generate(self, prompt: str, prioritaet: int = PRIORITAET_NORMAL, timeout: float | None = 60,
+                 praefix: str | None = None) -> str:
+        """Blockierende Variante von submit: wartet höchstens ``timeout`` Sekunden."""
+        future = self.submit(prompt, prioritaet, timeout, praefix)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Llama hat nicht innerhalb von {timeout}s geantwortet")
+
+    def generate_stream(self, prompt: str, prioritaet: int = PRIORITAET_NORMAL, timeout: float | None = 60,
+                        praefix: str | None = None, abbruch: Abbruch | None = None):
+        """
+        Streaming über die Warteschlange. ``timeout`` gilt bis zum ersten Token.
+        Wird ``abbruch`` gesetzt, endet der Stream ohne weitere Tokens, auch wenn der
+        Auftrag noch wartet (er wird dann gar nicht erst gerechnet).
+        """
+        auftrag = self._einreihen(prompt, prioritaet, timeout, praefix, stream=True, abbruch=abbruch)
+        warte = timeout
+        try:
+            while True:
+                try:
+                    teil = auftrag.senke.get(timeout=warte)
+                except queue.Empty:
+                    auftrag.future.cancel()
+                    raise TimeoutError(f"Llama hat nicht innerhalb von {timeout}s angefangen")
+                if teil is _ENDE:
+                    return
+                if isinstance(teil, BaseException):
+                    raise teil
+                warte = None
+                yield teil
+        finally:
+            # Leser hat aufgehört (oder Fehler): Worker soll nicht weiterrechnen bzw. gar nicht erst anfangen
+            self._abbrechen(auftrag)
+
+    # ---------------------------------------------------------
+    # WORKER
+    # ---------------------------------------------------------
+
+    def _naechster(self):
+        """Holt den wichtigsten Auftrag plus alle wartenden mit gleichem Prompt."""
+        with self._cond:
+            while self._laeuft and not self._heap:
+                self._cond.wait()
+            if not self._heap:
+                return None, []
+            auftrag = heapq.heappop(self._heap)
+            gleiche = []
+            if not auftrag.stream:
+                rest = []
+                for anderer in self._heap:
+                    if not anderer.stream and anderer.prompt == auftrag.prompt and anderer.praefix == auftrag.praefix:
+                        gleiche.append(anderer)
+                    else:
+                        rest.append(anderer)
+                if gleiche:
+                    heapq.heapify(rest)
+                    self._heap = rest
+            return auftrag, gleiche
+
+    def _aktiv(self, auftrag, jetzt) -> bool:
+        if auftrag.abgelaufen(jetzt):
+            self.zaehler["abgelaufen"] += 1
+            if auftrag.future.set_running_or_notify_cancel():
+                auftrag.future.set_exception(TimeoutError("Auftrag ist in der Warteschlange abgelaufen"))
+            if auftrag.senke:
+                auftrag.senke.put(TimeoutError("Auftrag ist in der Warteschlange abgelaufen"))
+            return False
+        if auftrag.abgebrochen.is_set():
+            auftrag.future.cancel()
+        if not auftrag.future.set_running_or_notify_cancel():
+            self.zaehler["abgebrochen"] += 1
+            return False
+        self.wartezeit.melde(jetzt - auftrag.eingang)
+        return True
+
+    def _arbeite(self):
+        while True:
+            auftrag, gleiche = self._naechster()
+            if auftrag is None:
+                return
+            jetzt = time.perf_counter()
+            aktive = [a for a in [auftrag] + gleiche if self._aktiv(a, jetzt)]
+            if not aktive:
+                continue
+            self.zaehler["zusammengefasst"] += len(aktive) - 1
+
+            start = time.perf_counter()
+            erfolg = False
+            try:
+                if auftrag.praefix and hasattr(self.engine, "praefix_vorwaermen"):
+                    self.engine.praefix_vorwaermen(auftrag.praefix)
+                if auftrag.stream:
+                    self._streame(auftrag)
+                else:
+                    text = self.engine.generate(auftrag.prompt)
+                    for a in aktive:
+                        a.future.set_result(text)
+                erfolg = True
+            except BaseException as e:
+                for a in aktive:
+                    if not a.future.done():
+                        a.future.set_exception(e)
+                if auftrag.senke:
+                    auftrag.senke.put(e)
+            finally:
+                self.laufzeit.melde(time.perf_counter() - start, erfolg)
+
+    def _streame(self, auftrag):
+        teile = []
+        for teil in self.engine.generate_stream(auftrag.prompt):
+            if auftrag.abgebrochen.is_set():
+                break
+            teile.append(teil)
+            auftrag.senke.put(teil)
+        auftrag.senke.put(_ENDE)
+        auftrag.future.set_result("".join(teile))
+
+    # ---------------------------------------------------------
+    # STATUS
+    # ---------------------------------------------------------
+
+    def queue_tiefe(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def get_metriken(self) -> dict:
+        with self._cond:
+            zaehler = dict(self.zaehler)
+            zaehler["tiefe"] = len(self._heap)
+        zaehler["wartezeit"] = self.wartezeit.als_dict()
+        zaehler["laufzeit"] = self.laufzeit.als_dict()
+        return zaehler
+
+    def stop(self, timeout: float | None = None):
+        """Nimmt keine neuen Aufträge mehr an, lässt die Warteschlange aber abarbeiten."""
+        with self._cond:
+            self._laeuft = False
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+
+# ---------------------------------------------------------
+# GETEILTER SCHEDULER
+# ---------------------------------------------------------
+# Gehört zur geteilten LlamaEngine (llama_engine.get_shared_engine):
+# alle Sessions eines Prozesses teilen sich Modell und Warteschlange.
+
+_shared_scheduler = None
+_lock = threading.Lock()
+
+
+def get_shared_scheduler():
+    """Scheduler um die geteilte LlamaEngine, None solange das Modell noch lädt."""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        from .llama_engine import get_shared_engine
+        engine = get_shared_engine(timeout=0)
+        if engine is None:
+            return None
+        with _lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = LlamaScheduler(engine)
+    return _shared_scheduler
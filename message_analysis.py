@@ -0,0 +1,63 @@
+"""
+Einmal pro Zug: alles, was die Engines über eine Nachricht wissen wollen.
+Statt dass Safety, Klassifizierer, AnswerEngine, IntelligenceEngine und
+ToleranceEngine denselben Text jeweils selbst klein schreiben und durchsuchen,
+wird er hier einmal analysiert und das Ergebnis weitergereicht.
+"""
+
+from . import keyword_matcher
+from .text_normalisierung import normalisiere, tokens
+from .tolerance_engine import ToleranceEngine
+
+# Alias -> Name, in Vorrang-Reihenfolge (registriert von der AnswerEngine)
+_verwandte = {}
+# Ereignis-Schlüssel -> Stichwörter, in Vorrang-Reihenfolge (registriert von der IntelligenceEngine)
+_zeitlinie = {}
+
+
+def registriere_verwandte(aliase: dict):
+    """Bekannte Personen/Orte: {"bruder": "Andy", ...}. Frühere Einträge haben Vorrang."""
+    _verwandte.update(aliase)
+    keyword_matcher.registriere("verwandter", {alias: (alias,) for alias in aliase})
+
+
+def registriere_zeitlinie(ereignisse: dict):
+    """Zeitlinien-Ereignisse: {"corona": ("corona", "lockdown beginnt."), ...}."""
+    _zeitlinie.update(ereignisse)
+    keyword_matcher.registriere("zeit", ereignisse)
+
+
+class MessageAnalysis:
+    """
+    Ergebnis der Analyse einer Nachricht.
+
+    - text / text_low: Original und klein geschrieben
+    - normalisiert / tokens: für Vergleiche und Suchen (siehe text_normalisierung)
+    - kategorien: alle Stichwort-Kategorien aus dem gemeinsamen KeywordMatcher
+    - verwandte / verwandter: erkannte bekannte Personen (alle bzw. die erste)
+    - zeitlinie: Schlüssel der erkannten Zeitlinien-Ereignisse
+    - ton_delta: Score-Änderung für die ToleranceEngine
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_low = text.lower()
+        self.normalisiert = normalisiere(text)
+        self.tokens = tokens(self.normalisiert)
+        self.kategorien = keyword_matcher.gemeinsamer_matcher().kategorien_von(self.text_low)
+
+        self.verwandte = []
+        for alias, name in _verwandte.items():
+            if f"verwandter.{alias}" in self.kategorien and name not in self.verwandte:
+                self.verwandte.append(name)
+        self.verwandter = self.verwandte[0] if self.verwandte else None
+
+        self.zeitlinie = [key for key in _zeitlinie if f"zeit.{key}" in self.kategorien]
+        self.ton_delta = ToleranceEngine.ton_aenderung(text, self.kategorien)
+
+    def hat(self, kategorie: str) -> bool:
+        """z.B. analyse.hat("safety.critical")"""
+        return kategorie in self.kategorien
+
+    def __repr__(self):
+        return f"MessageAnalysis({self.text!r}, kategorien={sorted(self.kategorien)})"
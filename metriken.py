@@ -0,0 +1,68 @@
+"""
+Kleine Laufzeit-Metriken (Latenzen, Fehlerquote) für Sulees Backends.
+"""
+
+import math
+import threading
+from collections import deque
+
+
+def perzentil(werte, p: float):
+    """p-Perzentil (0-100) nach Nearest-Rank. Leere Eingabe -> None."""
+    werte = sorted(werte)
+    if not werte:
+        return None
+    rang = max(1, math.ceil(p / 100.0 * len(werte)))
+    return werte[rang - 1]
+
+
+class LatenzStatistik:
+    """
+    Rollendes Fenster der letzten ``fenster`` Aufrufe: Latenzen in Sekunden
+    und Erfolg/Fehler. Thread-sicher.
+    """
+
+    def __init__(self, fenster: int = 200):
+        self._latenzen = deque(maxlen=fenster)
+        self._erfolge = deque(maxlen=fenster)
+        self._lock = threading.Lock()
+        self.aufrufe = 0
+        self.fehler = 0
+
+    def melde(self, latenz: float, erfolg: bool = True):
+        with self._lock:
+            self._latenzen.append(latenz)
+            self._erfolge.append(erfolg)
+            self.aufrufe += 1
+            if not erfolg:
+                self.fehler += 1
+
+    def __len__(self):
+        """Anzahl der Messungen im aktuellen Fenster."""
+        with self._lock:
+            return len(self._latenzen)
+
+    def perzentil(self, p: float):
+        with self._lock:
+            werte = list(self._latenzen)
+        return perzentil(werte, p)
+
+    def fehlerquote(self) -> float:
+        with self._lock:
+            if not self._erfolge:
+                return 0.0
+            return 1.0 - sum(self._erfolge) / len(self._erfolge)
+
+    def als_dict(self) -> dict:
+        p50 = self.perzentil(50)
+        p95 = self.perzentil(95)
+        with self._lock:
+            letzte = self._latenzen[-1] if self._latenzen else None
+        return {
+            "aufrufe": self.aufrufe,
+            "fehler": self.fehler,
+            "fehlerquote": round(self.fehlerquote(), 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "letzte_ms": round(letzte * 1000, 1) if letzte is not None else None,
+        }
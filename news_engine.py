@@ -1,52 +1,154 @@
 import feedparser
-import sqlite3
+import hashlib
 import json
+import random
+import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from groq import Groq
+from requests.adapters import HTTPAdapter
 import os
 
+from . import news_schema
+from .text_normalisierung import normalisiere
+
+# RSS-Feeds (Weltweit, Technologie)
+DEFAULT_FEEDS = [
+    {"name": "Google News (DE)", "url": "https://news.google.com/rss?hl=de&gl=DE&ceid=DE:de"},
+    {"name": "CNN World", "url": "http://rss.cnn.com/rss/edition.rss"}, # Für globale Sicht
+    {"name": "Tagesschau", "url": "https://www.tagesschau.de/xml/rss2/"} # Für deutsche Sicht
+]
+
+GROQ_MODELL = "llama3-70b-8192"  # Wir brauchen Qualität für die Analyse
+ZEICHEN_PRO_TOKEN = 3            # vorsichtige Schätzung für deutschen/englischen Text
+
+
+def schaetze_tokens(text: str) -> int:
+    return len(text) // ZEICHEN_PRO_TOKEN + 1
+
+
+def fingerabdruck(item) -> str:
+    """Hash aus normalisiertem Titel + Beschreibung: gleiche Meldung aus zwei Feeds = gleicher Abdruck."""
+    text = normalisiere(item.get("title") or "") + "\n" + normalisiere(item.get("description") or "")
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
 class NewsEngine:
     """
     Der professionelle Journalist für Sulee.
     1. Liest RSS-Feeds (Rohdaten).
     2. Nutzt Groq (Gehirn) zur Analyse & Extraktion (Topic ID).
     3. Speichert in einen Puffer.
-    4. Validiert nach der 3-5 Tage Regel.
+    4. Validiert nach der 3-5 Tage Regel (jedes Vorkommen eines Artikels zählt, auch
+       wenn er schon analysiert war: seine gespeicherten Fakten kommen erneut in den Puffer).
     5. Speichert verifizierte Fakten in die Knowledge Base (Überschreibt Altes).
     """
 
-    def __init__(self, db_path):
+    def __init__(
+        self,
+        db_path,
+        feeds=None,
+        groq_client=None,
+        fetch_timeout: float = 10.0,
+        max_parallel: int = 8,
+        chunk_tokens: int = 2500,
+        groq_parallel: int = 4,
+        groq_versuche: int = 3,
+        groq_backoff: float = 1.0,
+        gesehen_tage: int = 7,
+    ):
         self.db_path = db_path
-        self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        
-        # RSS-Feeds (Weltweit, Technologie)
-        self.feeds = [
-            {"name": "Google News (DE)", "url": "https://news.google.com/rss?hl=de&gl=DE&ceid=DE:de"},
-            {"name": "CNN World", "url": "http://rss.cnn.com/rss/edition.rss"}, # Für globale Sicht
-            {"name": "Tagesschau", "url": "https://www.tagesschau.de/xml/rss2/"} # Für deutsche Sicht
-        ]
+        # Client und Feeds sind injizierbar (z.B. lokale Test-Feeds ohne API-Key).
+        # Wiederholungen macht _analysiere_chunk selbst, der Client soll nicht zusätzlich warten.
+        self.groq_client = groq_client or Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0, timeout=60.0)
+        self.feeds = feeds if feeds is not None else [dict(f) for f in DEFAULT_FEEDS]
+
+        # Feeds werden parallel geladen, jeder mit eigenem Timeout
+        self.fetch_timeout = fetch_timeout
+        self.max_parallel = max_parallel
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_parallel)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.feed_statistik = {}         # letzter Scan: geladen / unveraendert / fehler
+        self._neue_validatoren = {}      # ETag/Last-Modified, gespeichert erst nach erfolgreicher Analyse
+
+        # Analyse: Artikel in Häppchen mit Token-Budget, parallel mit Wiederholung
+        self.chunk_tokens = chunk_tokens
+        self.groq_parallel = groq_parallel
+        self.groq_versuche = groq_versuche
+        self.groq_backoff = groq_backoff
+        self.analyse_statistik = {}      # letzter Scan: chunks / fehlgeschlagen
+
+        # Bereits analysierte Artikel (news_seen) werden so lange nicht erneut an Groq geschickt
+        self.gesehen_tage = gesehen_tage
+        self.scan_statistik = {}         # letzter Scan: artikel / uebersprungen / neu
+
+        # Tabellen und Indizes anlegen bzw. alte Datenbanken migrieren
+        news_schema.verbinde(self.db_path).close()
 
     def scanne_und_lerne(self):
         """
         Hauptprozess: Fetch -> Analysieren -> Buffer -> Validieren -> Speichern
+        Ein Scan nutzt eine Verbindung; alle Schreibvorgänge laufen am Ende in
+        einer Transaktion (nicht während der Netzwerk-Aufrufe, damit andere
+        Leser/Schreiber nicht so lange warten).
         """
         print(f"[NewsEngine] Starte News-Scan um {datetime.now().strftime('%H:%M')}")
-        
-        # 1. ROH-DATEN HOLEN
-        raw_items = self._fetch_raw_feeds()
-        
-        # 2. ANALYSIEREN (Mit Groq)
-        analyzed_data = self._analysiere_mit_groq(raw_items)
-        
-        # 3. IN BUFFER SPEICHERN
-        self._speichere_in_buffer(analyzed_data)
-        
-        # 4. VALIDIEREN (3-5 Tage Regel) & UPDATE KNOWLEDGE
-        validierte_count = self._validiere_und_update()
-        
-        # 5. ALTE BUFFER AUFR脛UMEN
-        self._cleanup_buffer()
-        
+        conn = news_schema.verbinde(self.db_path)
+        try:
+            # 1. ROH-DATEN HOLEN
+            raw_items = self._fetch_raw_feeds(conn)
+
+            # Nur Artikel, die noch nicht analysiert wurden, kosten einen LLM-Aufruf
+            neue_items, wiederholte = self._filtere_gesehene(conn, raw_items)
+            self.scan_statistik = {
+                "artikel": len(raw_items),
+                "uebersprungen": len(wiederholte),
+                "neu": len(neue_items),
+            }
+            print(f"[NewsEngine] {self.scan_statistik['uebersprungen']} bekannte Artikel übersprungen, "
+                  f"{self.scan_statistik['neu']} neu")
+
+            # 2. ANALYSIEREN (Mit Groq)
+            ergebnisse = self._analysiere_chunks(neue_items)
+            analyzed_data = [fact for _, facts in ergebnisse if facts is not None for fact in facts]
+
+            # Wiederholte Artikel (bekannt oder aus einem zweiten Feed) zählen für die
+            # 3-5 Tage Regel weiter mit: ihre Fakten ohne erneute Analyse in den Puffer
+            fakten = self._fakten_pro_artikel(ergebnisse)
+            fakten.update(self._gespeicherte_fakten(
+                conn, [item["fingerprint"] for item in wiederholte if item["fingerprint"] not in fakten]
+            ))
+            for item in wiederholte:
+                analyzed_data.extend(fakten.get(item["fingerprint"], []))
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 3. IN BUFFER SPEICHERN
+                neue_themen = self._speichere_in_buffer(conn, analyzed_data)
+
+                # Als gesehen merken nur, was erfolgreich analysiert wurde;
+                # Artikel aus fehlgeschlagenen Häppchen kommen beim nächsten Scan wieder dran
+                self._merke_gesehen(conn, [item for chunk, facts in ergebnisse if facts is not None for item in chunk], fakten)
+
+                # Erst jetzt die Feed-Versionen merken: scheitert die Analyse,
+                # werden die Feeds beim nächsten Scan wieder komplett geladen
+                if not self.analyse_statistik.get("fehlgeschlagen"):
+                    self._speichere_feed_validatoren(conn)
+
+                # 4. VALIDIEREN (3-5 Tage Regel) & UPDATE KNOWLEDGE
+                validierte_count = self._validiere_und_update(conn, neue_themen)
+
+                # 5. ALTE BUFFER AUFR脛UMEN
+                self._cleanup_buffer(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
         print(f"[NewsEngine] Scan beendet. {validierte_count} Themen aktualisiert.")
         return validierte_count
 
@@ -54,146 +156,310 @@ class NewsEngine:
     # HILFSFUNKTIONEN
     # ---------------------------------------------------------
 
-    def _fetch_raw_feeds(self):
-        """L盲dt rohe Artikel aus den RSS-Feeds."""
+    def _fetch_raw_feeds(self, conn):
+        """
+        L盲dt rohe Artikel aus den RSS-Feeds.
+        Alle Feeds parallel (Dauer = langsamster Feed statt Summe), mit
+        bedingtem GET: unveränderte Feeds antworten 304 und werden übersprungen.
+        """
+        validatoren = self._lade_feed_validatoren(conn)
+        # Nur Validatoren dieses Scans: Reste eines gescheiterten Scans würden sonst
+        # mit dem nächsten erfolgreichen gespeichert (und der Feed danach nur noch 304)
+        self._neue_validatoren = {}
+        if not self.feeds:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(self.feeds))) as pool:
+            ergebnisse = list(pool.map(
+                lambda feed_info: self._hole_feed(feed_info, validatoren.get(feed_info["url"])), self.feeds
+            ))
+
         raw_items = []
-        for feed_info in self.feeds:
-            try:
-                feed = feedparser.parse(feed_info["url"])
-                # Wir nehmen nur die Top 20 pro Feed, um Kosten/Tokens zu sparen
-                for entry in feed.entries[:20]:
-                    raw_items.append({
-                        "title": entry.get("title", ""),
-                        "description": entry.get("description", ""),
-                        "published": entry.get("published_parsed", datetime.now())
-                    })
-            except Exception as e:
-                print(f"[Feed Fehler] {feed_info['name']}: {e}")
+        self.feed_statistik = {"geladen": 0, "unveraendert": 0, "fehler": 0}
+        for feed_info, (status, entries, validator) in zip(self.feeds, ergebnisse):
+            self.feed_statistik[status] += 1
+            if validator:
+                self._neue_validatoren[feed_info["url"]] = validator
+            # Wir nehmen nur die Top 20 pro Feed, um Kosten/Tokens zu sparen
+            for entry in entries[:20]:
+                item = {
+                    "title": entry.get("title", ""),
+                    "description": entry.get("description", ""),
+                    "published": entry.get("published_parsed", datetime.now())
+                }
+                item["fingerprint"] = fingerabdruck(item)
+                raw_items.append(item)
+        print(f"[NewsEngine] Feeds: {self.feed_statistik}")
         return raw_items
 
+    def _hole_feed(self, feed_info, validator):
+        """Ein Feed: gibt (status, entries, (etag, last_modified) oder None) zurück."""
+        headers = {}
+        if validator:
+            etag, last_modified = validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        try:
+            resp = self.session.get(feed_info["url"], headers=headers, timeout=self.fetch_timeout)
+            if resp.status_code == 304:
+                return "unveraendert", [], None
+            resp.raise_for_status()
+            feed = feedparser.parse(resp.content, response_headers={k.lower(): v for k, v in resp.headers.items()})
+            neu = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+            return "geladen", feed.entries, neu if any(neu) else None
+        except Exception as e:
+            print(f"[Feed Fehler] {feed_info['name']}: {e}")
+            return "fehler", [], None
+
+    @staticmethod
+    def _lade_feed_validatoren(conn):
+        """ETag/Last-Modified pro Feed-URL aus der Tabelle feed_cache."""
+        rows = conn.execute("SELECT url, etag, last_modified FROM feed_cache").fetchall()
+        return {url: (etag, last_modified) for url, etag, last_modified in rows}
+
+    def _speichere_feed_validatoren(self, conn):
+        if not self._neue_validatoren:
+            return
+        conn.executemany(
+            "INSERT OR REPLACE INTO feed_cache (url, etag, last_modified, geprueft_am) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            [(url, etag, lm) for url, (etag, lm) in self._neue_validatoren.items()],
+        )
+        self._neue_validatoren = {}
+
+    def _filtere_gesehene(self, conn, raw_items):
+        """
+        Trennt Artikel, deren Fingerabdruck noch nicht abgelaufen in news_seen steht
+        (und Doppelte im Scan), von den neuen. Rückgabe: (neue, wiederholte).
+        """
+        if not raw_items:
+            return [], []
+        abdruecke = list({item["fingerprint"] for item in raw_items})
+        grenze = (datetime.now() - timedelta(days=self.gesehen_tage)).isoformat(" ")
+        bekannt = set()
+        for start in range(0, len(abdruecke), 500):
+            teil = abdruecke[start:start + 500]
+            rows = conn.execute(
+                f"SELECT fingerprint FROM news_seen WHERE gesehen_am >= ? "
+                f"AND fingerprint IN ({','.join('?' * len(teil))})",
+                [grenze, *teil],
+            ).fetchall()
+            bekannt.update(row[0] for row in rows)
+
+        neue, wiederholte = [], []
+        for item in raw_items:
+            if item["fingerprint"] in bekannt:
+                wiederholte.append(item)
+            else:
+                bekannt.add(item["fingerprint"])  # dieselbe Meldung aus einem zweiten Feed
+                neue.append(item)
+        return neue, wiederholte
+
+    @staticmethod
+    def _fakten_pro_artikel(ergebnisse):
+        """Fingerabdruck -> Fakten, über die Artikel-Nummer, die Groq zu jedem Fakt angibt."""
+        fakten = {}
+        for chunk, facts in ergebnisse:
+            if facts is None:
+                continue
+            for fact in facts:
+                nummer = fact.get("artikel") if isinstance(fact, dict) else None
+                if isinstance(nummer, int) and 1 <= nummer <= len(chunk):
+                    fakten.setdefault(chunk[nummer - 1]["fingerprint"], []).append(fact)
+        return fakten
+
+    @staticmethod
+    def _gespeicherte_fakten(conn, abdruecke):
+        """Fakten bereits analysierter Artikel aus news_seen (Fingerabdruck -> Fakten)."""
+        fakten = {}
+        abdruecke = list(set(abdruecke))
+        for start in range(0, len(abdruecke), 500):
+            teil = abdruecke[start:start + 500]
+            rows = conn.execute(
+                f"SELECT fingerprint, fakten FROM news_seen "
+                f"WHERE fakten IS NOT NULL AND fingerprint IN ({','.join('?' * len(teil))})",
+                teil,
+            ).fetchall()
+            for fingerprint, daten in rows:
+                try:
+                    fakten[fingerprint] = json.loads(daten)
+                except json.JSONDecodeError:
+                    continue
+        return fakten
+
+    @staticmethod
+    def _merke_gesehen(conn, items, fakten=None):
+        jetzt = datetime.now().isoformat(" ")
+        fakten = fakten or {}
+        conn.executemany(
+            "INSERT OR REPLACE INTO news_seen (fingerprint, gesehen_am, fakten) VALUES (?, ?, ?)",
+            [
+                (item["fingerprint"], jetzt, json.dumps(fakten.get(item["fingerprint"], []), ensure_ascii=False))
+                for item in items
+            ],
+        )
+
     def _analysiere_mit_groq(self, raw_items):
         """
         Nutzt Groq (Llama 3), um rohe Texte in strukturierte Fakten zu verwandeln.
         Ziele: Topic ID (eindeutig), Fact (aktuell).
         """
+        return [fact for _, facts in self._analysiere_chunks(raw_items) if facts is not None for fact in facts]
+
+    def _analysiere_chunks(self, raw_items):
+        """
+        Die Artikel werden in Häppchen mit Token-Budget aufgeteilt und parallel
+        analysiert; ein fehlgeschlagenes Häppchen kostet nur seine eigenen Artikel.
+        Rückgabe: [(chunk, facts oder None bei Fehler), ...] in Reihenfolge der Feeds.
+        """
+        self.analyse_statistik = {"chunks": 0, "fehlgeschlagen": 0}
         if not raw_items:
             return []
-            
-        # Prompt Engineering f眉r Groq
-        prompt_intro = (
-            "Du bist ein journalistischer Assistent. Analysiere die folgenden Nachrichten-Auszüge.\n"
-            "Extrahiere die wichtigsten Fakten. Gib eine Liste von JSON-Objekten zurück.\n\n"
-            "Format für jedes Objekt:\n"
-            "- \"topic_id\": Ein kurzer, eindeutiger Bezeichner (keine Leerzeichen, Unterstriche statt Leerzeichen). "
-            "  Beispiel: 'pluto_status', 'krieg_irak', 'tech_ai_chip'.\n"
-            "- \"fact\": Der faktische Satz in Deutsch.\n\n"
-            "Nachrichten:\n"
-        )
-        
-        # Wir bauen einen Text aus den Items (Limitieren auf ~2000 Wörter pro Request)
-        combined_text = ""
+
+        chunks = self._baue_chunks(raw_items)
+        self.analyse_statistik["chunks"] = len(chunks)
+        with ThreadPoolExecutor(max_workers=min(self.groq_parallel, len(chunks))) as pool:
+            ergebnisse = list(pool.map(self._analysiere_chunk_sicher, chunks))
+
+        self.analyse_statistik["fehlgeschlagen"] = sum(1 for facts in ergebnisse if facts is None)
+        if self.analyse_statistik["fehlgeschlagen"]:
+            print(f"[Groq Analyse] {self.analyse_statistik['fehlgeschlagen']} von {len(chunks)} Häppchen fehlgeschlagen")
+        return list(zip(chunks, ergebnisse))
+
+    # Prompt Engineering für Groq
+    PROMPT_INTRO = (
+        "Du bist ein journalistischer Assistent. Analysiere die folgenden Nachrichten-Auszüge.\n"
+        "Extrahiere die wichtigsten Fakten. Gib ein JSON-Objekt zurück: {\"facts\": [...]}.\n\n"
+        "Format für jedes Objekt:\n"
+        "- \"topic_id\": Ein kurzer, eindeutiger Bezeichner (keine Leerzeichen, Unterstriche statt Leerzeichen). "
+        "  Beispiel: 'pluto_status', 'krieg_irak', 'tech_ai_chip'.\n"
+        "- \"fact\": Der faktische Satz in Deutsch.\n"
+        "- \"artikel\": Die Nummer des Artikels, aus dem der Fakt stammt.\n\n"
+        "Nachrichten:\n"
+    )
+
+    @staticmethod
+    def _item_text(item, nummer: int) -> str:
+        return f"Artikel {nummer}\nTitel: {item['title']}\nText: {item['description']}\n\n"
+
+    def _baue_chunks(self, raw_items):
+        """Teilt die Artikel so auf, dass jeder Prompt (inkl. Einleitung) ins Token-Budget passt."""
+        budget = max(1, self.chunk_tokens - schaetze_tokens(self.PROMPT_INTRO))
+        chunks, aktuell, belegt = [], [], 0
         for item in raw_items:
-            combined_text += f"Titel: {item['title']}\nText: {item['description']}\n\n"
-        
+            # Die Artikel-Nummer im Prompt ist höchstens ein paar Zeichen lang, die Schätzung rechnet sie mit
+            kosten = schaetze_tokens(self._item_text(item, len(aktuell) + 1))
+            if kosten > budget:
+                # Überlange Beschreibung kürzen statt das Häppchen zu sprengen
+                item = dict(item, description=item["description"][: max(0, (budget - 50) * ZEICHEN_PRO_TOKEN)])
+                kosten = schaetze_tokens(self._item_text(item, len(aktuell) + 1))
+            if aktuell and belegt + kosten > budget:
+                chunks.append(aktuell)
+                aktuell, belegt = [], 0
+            aktuell.append(item)
+            belegt += kosten
+        if aktuell:
+            chunks.append(aktuell)
+        return chunks
+
+    def _analysiere_chunk_sicher(self, chunk):
+        """Wie _analysiere_chunk, gibt aber None statt einer Exception zurück."""
         try:
-            response = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt_intro + combined_text}],
-                model="llama3-70b-8192", # Wir brauchen Qualit盲t für die Analyse
-                temperature=0.1, # Geringe Temperatur für deterministische IDs
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            # Wir expectieren eine Liste unter dem Key "facts" oder direkt eine Liste
-            if isinstance(result, list):
-                return result
-            elif isinstance(result, dict) and "facts" in result:
-                return result["facts"]
-            else:
-                return []
-                
+            return self._analysiere_chunk(chunk)
         except Exception as e:
             print(f"[Groq Analyse Fehler]: {e}")
-            return []
+            return None
 
-    def _speichere_in_buffer(self, analyzed_data):
-        """Speichert die analysierten Daten in den Zwischenpuffer."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        today = datetime.now().date()
-        
+    def _analysiere_chunk(self, chunk):
+        """Ein Groq-Aufruf pro Häppchen; bei Fehlern Wiederholung mit exponentiellem Backoff."""
+        prompt = self.PROMPT_INTRO + "".join(self._item_text(item, nummer) for nummer, item in enumerate(chunk, 1))
+        for versuch in range(self.groq_versuche):
+            try:
+                response = self.groq_client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=GROQ_MODELL,
+                    temperature=0.1, # Geringe Temperatur für deterministische IDs
+                    response_format={"type": "json_object"}
+                )
+                result = json.loads(response.choices[0].message.content)
+
+                # Wir erwarten eine Liste unter dem Key "facts" oder direkt eine Liste
+                if isinstance(result, list):
+                    return result
+                elif isinstance(result, dict) and "facts" in result:
+                    return result["facts"]
+                else:
+                    return []
+            except Exception:
+                if versuch == self.groq_versuche - 1:
+                    raise
+                # 1s, 2s, 4s ... mit Jitter, damit parallele Häppchen nicht gleichzeitig wiederkommen
+                time.sleep(self.groq_backoff * (2 ** versuch) * random.uniform(0.5, 1.5))
+
+    @staticmethod
+    def _speichere_in_buffer(conn, analyzed_data):
+        """Speichert die analysierten Daten in den Zwischenpuffer (ein executemany). Gibt die Topic IDs zurück."""
+        today = datetime.now().date().isoformat()
+        zeilen = []
         for item in analyzed_data:
-            topic_id = item.get("topic_id", "").strip().lower().replace(" ", "_")
+            topic_id = str(item.get("topic_id", "")).strip().lower().replace(" ", "_")
             fact = item.get("fact", "")
-            
+
             if not topic_id or not fact:
                 continue
-                
-            try:
-                c.execute("INSERT INTO news_buffer (topic_id, content, date) VALUES (?, ?, ?)",
-                          (topic_id, fact, today))
-            except sqlite3.IntegrityError:
-                # Sollte nicht passieren, da Buffer keine unique constraints hat
-                pass
-                
-        conn.commit()
-        conn.close()
-
-    def _validiere_und_update(self):
+            zeilen.append((topic_id, fact, today))
+
+        conn.executemany("INSERT INTO news_buffer (topic_id, content, date) VALUES (?, ?, ?)", zeilen)
+        return sorted({zeile[0] for zeile in zeilen})
+
+    @staticmethod
+    def _validiere_und_update(conn, topic_ids=None):
         """
         Die 3-5 Tage Regel.
         Themen, die Öfter als 1x in den letzten 5 Tagen im Puffer sind,
         werden in die Haupt-Wissensbank verschoben (UPSERT).
+
+        topic_ids: nur diese Themen prüfen (die eines Scans). Nicht berührte Themen
+        können sich nicht geändert haben, ihr Stand in knowledge_base ist schon
+        aktuell. None prüft den ganzen Puffer.
         """
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        today = datetime.now().date()
-        cutoff_date = today - timedelta(days=5)
-        
-        # Prüfen: Welche Themen sind "bestätigt"?
-        c.execute('''
+        cutoff_date = (datetime.now().date() - timedelta(days=5)).isoformat()
+        if topic_ids is not None and not topic_ids:
+            return 0
+        filter_sql, parameter = "", [cutoff_date]
+        if topic_ids is not None:
+            filter_sql = "AND topic_id IN (SELECT value FROM json_each(?))"
+            parameter.append(json.dumps(list(topic_ids)))
+
+        # Prüfen: Welche Themen sind "bestätigt"? (content gehört zur Zeile mit MAX(date))
+        # UPSERT LOGIK: INSERT OR REPLACE INTO knowledge_base (UNIQUE topic_id)
+        # Das löst das "Überschreiben"-Problem elegant.
+        cur = conn.execute(f'''
+            INSERT OR REPLACE INTO knowledge_base (topic_id, fact, last_updated)
             SELECT topic_id, content, MAX(date) as last_seen
             FROM news_buffer
-            WHERE date >= ?
+            WHERE date >= ? {filter_sql}
             GROUP BY topic_id
             HAVING COUNT(*) >= 2
-        ''', (cutoff_date,))
-        
-        valid_topics = c.fetchall()
-        count = 0
-        
-        for topic_id, content, last_seen in valid_topics:
-            # UPSERT LOGIK: INSERT OR REPLACE INTO knowledge_base
-            # Das läst das "Überschreiben"-Problem elegant.
-            c.execute('''
-                INSERT OR REPLACE INTO knowledge_base (topic_id, fact, last_updated)
-                VALUES (?, ?, ?)
-            ''', (topic_id, content, last_seen))
-            count += 1
-            
-        conn.commit()
-        conn.close()
-        return count
-
-    def _cleanup_buffer(self):
+        ''', parameter)
+        return cur.rowcount
+
+    def _cleanup_buffer(self, conn):
         """Löscht alte Einträge aus dem Puffer (Älter als 7 Tage), damit er nicht Überläuft."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        cutoff = datetime.now().date() - timedelta(days=7)
-        c.execute("DELETE FROM news_buffer WHERE date < ?", (cutoff,))
-        conn.commit()
-        conn.close()
+        cutoff = (datetime.now().date() - timedelta(days=7)).isoformat()
+        conn.execute("DELETE FROM news_buffer WHERE date < ?", (cutoff,))
+        # Abgelaufene Fingerabdrücke: diese Artikel dürfen wieder analysiert werden
+        grenze = (datetime.now() - timedelta(days=self.gesehen_tage)).isoformat(" ")
+        conn.execute("DELETE FROM news_seen WHERE gesehen_am < ?", (grenze,))
 
     def get_wissenskontext(self):
         """Holt das aktuelle Wissen aus der Haupttabelle."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT topic_id, fact FROM knowledge_base")
-        rows = c.fetchall()
-        conn.close()
+        conn = news_schema.verbinde(self.db_path)
+        try:
+            rows = conn.execute("SELECT topic_id, fact FROM knowledge_base").fetchall()
+        finally:
+            conn.close()
         
         if not rows:
             return []
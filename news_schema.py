@@ -0,0 +1,93 @@
+"""
+Schema und Migrationen der News-Datenbank (NewsEngine).
+Die Version steht in ``PRAGMA user_version``; jede Migration läuft genau einmal,
+in einer eigenen Transaktion, und hebt die Version an.
+"""
+
+import sqlite3
+
+# Jede Migration ist eine Liste von Anweisungen. Index + 1 = Schema-Version danach.
+MIGRATIONEN = [
+    # 1: Tabellen (bestehende Datenbanken behalten ihre Tabellen)
+    [
+        """CREATE TABLE IF NOT EXISTS news_buffer (
+            id INTEGER PRIMARY KEY,
+            topic_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            date DATE NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS knowledge_base (
+            topic_id TEXT PRIMARY KEY,
+            fact TEXT NOT NULL,
+            last_updated DATE
+        )""",
+        """CREATE TABLE IF NOT EXISTS feed_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            geprueft_am TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS news_seen (
+            fingerprint TEXT PRIMARY KEY,
+            gesehen_am TIMESTAMP
+        )""",
+    ],
+    # 2: Indizes für Validierung, Aufräumen (Datumsfenster) und Ablauf der Fingerabdrücke
+    [
+        "CREATE INDEX IF NOT EXISTS idx_news_buffer_date_topic ON news_buffer(date, topic_id)",
+        # Validierung nur der Themen eines Scans: direkter Zugriff pro Thema
+        "CREATE INDEX IF NOT EXISTS idx_news_buffer_topic_date ON news_buffer(topic_id, date)",
+        # Alte knowledge_base ohne UNIQUE: Doppelte entfernen, der zuletzt geschriebene Eintrag gewinnt
+        """DELETE FROM knowledge_base WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM knowledge_base GROUP BY topic_id
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_knowledge_base_topic ON knowledge_base(topic_id)",
+        "CREATE INDEX IF NOT EXISTS idx_news_seen_gesehen ON news_seen(gesehen_am)",
+    ],
+    # 3: Fakten pro analysiertem Artikel (JSON), damit ein erneut gesehener Artikel
+    # ohne neuen Groq-Aufruf wieder im Puffer zählt
+    [
+        "ALTER TABLE news_seen ADD COLUMN fakten TEXT",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONEN)
+
+
+def version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migriere(conn: sqlite3.Connection) -> int:
+    """Bringt die Datenbank auf SCHEMA_VERSION. Gibt die Anzahl ausgeführter Migrationen zurück."""
+    ausgefuehrt = 0
+    if version(conn) >= SCHEMA_VERSION:
+        return ausgefuehrt
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Erst in der Schreibsperre lesen: zwei Prozesse migrieren nie doppelt
+            aktuell = version(conn)
+            if aktuell >= SCHEMA_VERSION:
+                conn.execute("COMMIT")
+                return ausgefuehrt
+            for anweisung in MIGRATIONEN[aktuell]:
+                conn.execute(anweisung)
+            conn.execute(f"PRAGMA user_version = {aktuell + 1}")
+            conn.execute("COMMIT")
+            ausgefuehrt += 1
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def verbinde(db_path) -> sqlite3.Connection:
+    """
+    Verbindung mit aktuellem Schema. Transaktionen werden explizit gesteuert
+    (isolation_level=None): ``BEGIN IMMEDIATE`` ... ``COMMIT``.
+    """
+    conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    migriere(conn)
+    return conn
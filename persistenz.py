@@ -0,0 +1,31 @@
+"""
+Gemeinsame Hilfsfunktionen für das persistente Speichern von Sulees Daten.
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomar_json_schreiben(datei, daten, indent=2, fsync=True):
+    """
+    Schreibt ``daten`` als JSON in eine temporäre Datei im selben Ordner
+    und benennt sie danach atomar um. Leser sehen so immer entweder die alte
+    oder die vollständige neue Datei, nie eine halb geschriebene.
+    """
+    ordner = os.path.dirname(os.path.abspath(datei))
+    os.makedirs(ordner, exist_ok=True)
+    fd, tmp_pfad = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=ordner)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(daten, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_pfad, datei)
+    except BaseException:
+        try:
+            os.remove(tmp_pfad)
+        except OSError:
+            pass
+        raise
@@ -1,30 +1,61 @@
 import random
 
+from . import keyword_matcher
+
 class SafetyGuard:
     """
     Sicherheitslogik für Sulee.
     ADAPTIV: Die Reaktion ändert sich je nach Alter (Panik vs. Stabilität).
     """
 
+    MEDICAL_KEYWORDS = frozenset({
+        "diagnose", "krankheit", "symptom", "symptome", "medikament",
+        "therapie", "psychiater", "psychologe", "depression", "angst",
+        "angststörung", "suizid", "selbstmord", "suizidal", "arzt", "klinik",
+        "blut", "verletzt", "wehtut"
+    })
+    CRITICAL_KEYWORDS = frozenset({
+        "suizid", "selbstmord", "sterben wollen", "töten", "missbrauch", "vergewaltigung",
+        "gewalt gegen mich", "notfall", "bewusstlos", "ich beende es", "lebensmüde"
+    })
+
     def __init__(self):
-        self.medical_keywords = {
-            "diagnose", "krankheit", "symptom", "symptome", "medikament",
-            "therapie", "psychiater", "psychologe", "depression", "angst",
-            "angststörung", "suizid", "selbstmord", "suizidal", "arzt", "klinik",
-            "blut", "verletzt", "wehtut"
-        }
-        self.critical_keywords = {
-            "suizid", "selbstmord", "sterben wollen", "töten", "missbrauch", "vergewaltigung",
-            "gewalt gegen mich", "notfall", "bewusstlos", "ich beende es", "lebensmüde"
-        }
+        # Anpassbar pro Instanz; weichen die Listen von den Klassen-Listen ab,
+        # prüft diese Instanz mit einem eigenen Matcher statt dem gemeinsamen
+        self.medical_keywords = self.MEDICAL_KEYWORDS
+        self.critical_keywords = self.CRITICAL_KEYWORDS
+        self._eigener = None
+        self._eigener_fuer = None
+
+    def _eigener_matcher(self):
+        """Matcher über die Listen dieser Instanz, None solange sie den Klassen-Listen entsprechen."""
+        if self.medical_keywords is self.MEDICAL_KEYWORDS and self.critical_keywords is self.CRITICAL_KEYWORDS:
+            return None
+        listen = (frozenset(self.medical_keywords), frozenset(self.critical_keywords))
+        if listen == (self.MEDICAL_KEYWORDS, self.CRITICAL_KEYWORDS):
+            return None
+        if self._eigener_fuer != listen:
+            self._eigener = keyword_matcher.KeywordMatcher({"safety.medical": listen[0], "safety.critical": listen[1]})
+            self._eigener_fuer = listen
+        return self._eigener
 
-    def is_medical_question(self, text: str) -> bool:
-        tl = text.lower()
-        return any(k in tl for k in self.medical_keywords)
+    # Ein gemeinsamer Scan für alle Stichwort-Listen (siehe keyword_matcher),
+    # mit ``analyse`` (MessageAnalysis des Zuges) ganz ohne neuen Scan
+    def is_medical_question(self, text: str, analyse=None) -> bool:
+        eigener = self._eigener_matcher()
+        if eigener is not None:
+            return eigener.hat(text, "safety.medical")
+        if analyse is not None:
+            return analyse.hat("safety.medical")
+        return keyword_matcher.gemeinsamer_matcher().hat(text, "safety.medical")
 
-    def is_critical_question(self, text: str) -> bool:
-        tl = text.lower()
-        return any(k in tl for k in self.critical_keywords)
+    def is_critical_question(self, text: str, analyse=None) -> bool:
+        eigener = self._eigener_matcher()
+        if eigener is not None:
+            return eigener.hat(text, "safety.critical")
+        if analyse is not None:
+            return analyse.hat("safety.critical")
+        return keyword_matcher.gemeinsamer_matcher().hat(text, "safety.critical")
 
     def medical_response(self, text: str, alter: int = 13) -> str:
         """
@@ -76,4 +107,10 @@ class SafetyGuard:
                 "Das ist eine sehr ernste Situation. Ich muss dir sagen: Bitte such dir jetzt Hilfe. "
                 "Denke nicht darüber nach, sondern handle. Rufe den Notdienst (112) oder geh zur nächsten Klinik. "
                 "Es gibt Wege da raus, aber du musst jetzt aktiv werden und dich melden."
-            )
\ No newline at end of file
+            )
+
+
+keyword_matcher.registriere("safety", {
+    "medical": SafetyGuard.MEDICAL_KEYWORDS,
+    "critical": SafetyGuard.CRITICAL_KEYWORDS,
+})
@@ -4,18 +4,47 @@ Verwaltet persistente Zustände wie Hunger, Energie und Tages-Statistiken.
 """
 
 import os
+import re
 import json
+import atexit
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
 from datetime import datetime, date
 
+from .persistenz import atomar_json_schreiben
+
+
+# Alle StatusManager mit Write-Behind, damit beim Beenden nichts verloren geht
+_offene_manager = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_alle():
+    for manager in list(_offene_manager):
+        manager.flush()
+
 
 class StatusManager:
     """
     Verwaltet Sulees interne Zustände (Hunger, Energie, etc.)
     und speichert diese persistent.
+
+    flush_intervall:
+        None  - jede Änderung wird sofort geschrieben (Standard, atomar, aber ohne fsync)
+        float - Write-Behind: Änderungen werden gesammelt und spätestens nach
+                so vielen Sekunden in einem Rutsch geschrieben, außerdem bei
+                ``flush()`` und beim Beenden des Interpreters (mit fsync)
     """
 
-    def __init__(self, datei="sulee_status.json"):
+    def __init__(self, datei="sulee_status.json", flush_intervall: float | None = None):
         self.datei = datei
+        self.flush_intervall = flush_intervall
+        self._lock = threading.Lock()
+        self._schreib_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
         self.status = {
             "hunger": 30,  # 0 = satt, 100 = verhungert
             "energie": 90,  # 0 = schläfrig, 100 = wach
@@ -44,13 +73,40 @@ class StatusManager:
                 print(f"[Warnung] Konnte Status nicht laden: {e}")
 
     def _speichere_status(self):
-        """Speichert den Status persistent."""
+        """Speichert den Status persistent (bzw. merkt ihn im Write-Behind-Modus vor)."""
+        if self.flush_intervall is None:
+            # Sofort-Modus liegt im Anfrage-Pfad: atomar umbenennen, aber ohne fsync
+            self._schreibe(dict(self.status), fsync=False)
+            return
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                _offene_manager.add(self)
+                self._timer = threading.Timer(self.flush_intervall, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _schreibe(self, daten: dict, fsync: bool = True):
         try:
-            with open(self.datei, "w", encoding="utf-8") as f:
-                json.dump(self.status, f, ensure_ascii=False, indent=2)
+            atomar_json_schreiben(self.datei, daten, fsync=fsync)
         except Exception as e:
             print(f"[Fehler] Konnte Status nicht speichern: {e}")
 
+    def flush(self):
+        """Schreibt vorgemerkte Änderungen sofort auf die Platte."""
+        # Der Schreib-Lock hält die Reihenfolge der Snapshots ein,
+        # der kurze Status-Lock blockiert Änderungen nur für die Kopie.
+        with self._schreib_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                daten = dict(self.status)
+                self._dirty = False
+            self._schreibe(daten)
+
     def set_hunger(self, wert: int):
         """Setzt den Hunger-Level (0-100)."""
         self.status["hunger"] = max(0, min(100, wert))
@@ -105,3 +161,88 @@ class StatusManager:
 
     def __repr__(self):
         return f"<StatusManager hunger={self.status['hunger']} energie={self.status['energie']}>"
+
+
+class StatusStore:
+    """
+    Status pro Nutzer/Session statt eines globalen Status.
+
+    Jeder Nutzer bekommt einen eigenen StatusManager mit eigener Datei im Ordner
+    ``ordner``. Manager werden erst beim ersten Zugriff geladen und nach
+    ``max_aktiv`` Nutzern nach LRU wieder aus dem Speicher entfernt (vorher geflusht;
+    wer während des Flushs zugreift, bekommt denselben Manager zurück).
+    Sessions teilen sich so weder Datei noch Lock.
+    ``max_aktiv`` sollte größer sein als die Zahl gleichzeitig aktiver Sessions,
+    sonst wird ein noch benutzter Manager verdrängt und neu geladen.
+    """
+
+    def __init__(self, ordner="sulee_status", max_aktiv: int = 256, flush_intervall: float | None = 2.0):
+        self.ordner = ordner
+        self.max_aktiv = max_aktiv
+        self.flush_intervall = flush_intervall
+        os.makedirs(ordner, exist_ok=True)
+        self._aktiv = OrderedDict()   # user_id -> StatusManager, zuletzt genutzt am Ende
+        self._lade_locks = {}
+        # Verdrängte Manager, deren flush() noch läuft: ein erneuter Zugriff übernimmt
+        # diesen Manager, statt die (noch alte) Datei ein zweites Mal zu laden
+        self._verdraengt = {}
+        self._lock = threading.Lock()
+
+    def _datei(self, user_id: str) -> str:
+        """Dateiname aus lesbarem Präfix + Hash (keine Pfad-Tricks, keine Kollisionen)."""
+        lesbar = re.sub(r"[^A-Za-z0-9_-]", "_", str(user_id))[:40]
+        kurz_hash = hashlib.sha1(str(user_id).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.ordner, f"{lesbar}_{kurz_hash}.json")
+
+    def get(self, user_id: str) -> StatusManager:
+        """Gibt den StatusManager dieses Nutzers zurück (lädt ihn bei Bedarf)."""
+        with self._lock:
+            manager = self._aktiv.get(user_id)
+            if manager is not None:
+                self._aktiv.move_to_end(user_id)
+                return manager
+            lade_lock = self._lade_locks.setdefault(user_id, threading.Lock())
+
+        # Laden passiert außerhalb des globalen Locks, nur pro Nutzer serialisiert
+        with lade_lock:
+            with self._lock:
+                manager = self._aktiv.get(user_id)
+                if manager is not None:
+                    self._aktiv.move_to_end(user_id)
+                    return manager
+                manager = self._verdraengt.get(user_id)
+            if manager is None:
+                manager = StatusManager(self._datei(user_id), flush_intervall=self.flush_intervall)
+
+            verdraengt = []
+            with self._lock:
+                self._aktiv[user_id] = manager
+                while len(self._aktiv) > self.max_aktiv:
+                    alt_id, alt_manager = self._aktiv.popitem(last=False)
+                    self._lade_locks.pop(alt_id, None)
+                    self._verdraengt[alt_id] = alt_manager
+                    verdraengt.append((alt_id, alt_manager))
+
+        for alt_id, alt_manager in verdraengt:
+            try:
+                alt_manager.flush()
+            finally:
+                with self._lock:
+                    if self._verdraengt.get(alt_id) is alt_manager:
+                        del self._verdraengt[alt_id]
+        return manager
+
+    def flush_alle(self):
+        """Schreibt die Änderungen aller geladenen Nutzer."""
+        with self._lock:
+            manager = list(self._aktiv.values())
+        for m in manager:
+            m.flush()
+
+    def aktive_nutzer(self) -> list:
+        with self._lock:
+            return list(self._aktiv)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._aktiv)
@@ -0,0 +1,11 @@
+"""
+Die Tests importieren das Paket wie die Benchmarks (benchmarks/_paket.py)
+und nutzen deren lokale Stubs (z.B. feed_stub).
+"""
+
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
@@ -0,0 +1,107 @@
+"""LlamaScheduler: Abbruch wartender Aufträge, auch aus einem verlorenen Hedge-Rennen."""
+
+import threading
+import time
+
+from _paket import lade
+
+answer_engine = lade("answer_engine")
+llama_scheduler = lade("llama_scheduler")
+
+
+class BlockierendeEngine:
+    """Hält den Worker mit dem Prompt "blockiere" fest, bis ``frei`` gesetzt ist."""
+
+    def __init__(self):
+        self.frei = threading.Event()
+        self.gerechnet = []
+
+    def generate(self, prompt):
+        self.gerechnet.append(prompt)
+        if prompt == "blockiere":
+            self.frei.wait(5)
+        return f"Antwort auf {prompt}, lang genug"
+
+    def generate_stream(self, prompt):
+        yield self.generate(prompt)
+
+
+class FakeRouter:
+    cache = None
+
+    def __init__(self):
+        self.gemeldet = []
+
+    def melde_ergebnis(self, backend, latenz, erfolg):
+        self.gemeldet.append((backend, erfolg))
+
+    def latenz_budget(self, backend, perzentil=95, standard=None):
+        return standard
+
+
+def _belegter_scheduler():
+    engine = BlockierendeEngine()
+    scheduler = llama_scheduler.LlamaScheduler(engine)
+    belegt = scheduler.submit("blockiere")
+    while not engine.gerechnet:
+        time.sleep(0.001)
+    return engine, scheduler, belegt
+
+
+def test_abbruch_weckt_wartenden_stream_und_leert_warteschlange():
+    engine, scheduler, belegt = _belegter_scheduler()
+    abbruch = llama_scheduler.Abbruch()
+    teile = []
+    leser = threading.Thread(target=lambda: teile.extend(scheduler.generate_stream("frage", abbruch=abbruch)))
+    leser.start()
+    while scheduler.queue_tiefe() == 0:
+        time.sleep(0.001)
+
+    abbruch.set()
+    leser.join(1)
+    assert not leser.is_alive()
+    assert teile == []
+    assert scheduler.queue_tiefe() == 0
+
+    engine.frei.set()
+    belegt.result(1)
+    scheduler.stop(1)
+    assert engine.gerechnet == ["blockiere"]
+    assert scheduler.zaehler["abgebrochen"] == 1
+
+
+def test_verlorenes_hedge_rennen_laesst_keinen_llama_auftrag_zurueck(monkeypatch):
+    engine, scheduler, belegt = _belegter_scheduler()
+    monkeypatch.setattr(answer_engine, "_get_llama_engine", lambda: scheduler)
+    monkeypatch.setattr(answer_engine, "HEDGE_BUDGET", 0.05)
+
+    antwort_engine = answer_engine.AnswerEngine.__new__(answer_engine.AnswerEngine)
+    antwort_engine.router = FakeRouter()
+    antwort_engine.hedge_statistik = {"gestartet": 0, "gewonnen_deepseek": 0, "gewonnen_llama": 0, "aufgegeben": 0}
+    antwort_engine._hedge_lock = threading.Lock()
+
+    def langsames_deepseek(frage, system_prompt):
+        time.sleep(0.3)
+        return "DeepSeek war schneller als der belegte Worker"
+
+    antwort_engine._frage_deepseek = langsames_deepseek
+    freie_plaetze = answer_engine._hedge_plaetze["llama"]._value
+
+    antwort, quelle = antwort_engine._hedged("Warum ist der Himmel blau?", "System", "factual")
+    assert quelle == "deepseek"
+    assert antwort_engine.hedge_statistik["gestartet"] == 1
+    assert antwort_engine.hedge_statistik["gewonnen_deepseek"] == 1
+    assert scheduler.queue_tiefe() == 0
+    assert scheduler.zaehler["abgebrochen"] == 1
+
+    # Der Hedge-Thread wartet nicht auf das erste Token: sein Platz ist gleich wieder frei
+    frist = time.monotonic() + 1
+    while answer_engine._hedge_plaetze["llama"]._value < freie_plaetze and time.monotonic() < frist:
+        time.sleep(0.01)
+    assert answer_engine._hedge_plaetze["llama"]._value == freie_plaetze
+
+    engine.frei.set()
+    belegt.result(1)
+    scheduler.stop(1)
+    assert engine.gerechnet == ["blockiere"]
+    assert ("llama", False) not in antwort_engine.router.gemeldet
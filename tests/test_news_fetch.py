@@ -0,0 +1,83 @@
+"""NewsEngine-Feedabruf gegen lokale RSS-Feeds (benchmarks/feed_stub.py)."""
+
+import time
+
+import pytest
+
+from _paket import lade
+from feed_stub import starte_feeds
+
+news_engine = lade("news_engine")
+news_schema = lade("news_schema")
+
+
+@pytest.fixture
+def feeds():
+    verzoegerungen = {"a": 0.3, "b": 0.3, "c": 0.3}
+    server, feeds, zaehler = starte_feeds(verzoegerungen, anzahl=5)
+    yield verzoegerungen, feeds, zaehler
+    server.shutdown()
+
+
+def _engine(tmp_path, feeds, **kwargs):
+    # groq_client wird für den Abruf nicht gebraucht
+    return news_engine.NewsEngine(tmp_path / "news.db", feeds=feeds, groq_client=object(), **kwargs)
+
+
+def _scan(engine, validatoren_speichern=True):
+    conn = news_schema.verbinde(engine.db_path)
+    try:
+        start = time.perf_counter()
+        items = engine._fetch_raw_feeds(conn)
+        dauer = time.perf_counter() - start
+        if validatoren_speichern:
+            engine._speichere_feed_validatoren(conn)
+        return items, dauer
+    finally:
+        conn.close()
+
+
+def _feed_cache(engine):
+    conn = news_schema.verbinde(engine.db_path)
+    try:
+        return dict(conn.execute("SELECT url, etag FROM feed_cache").fetchall())
+    finally:
+        conn.close()
+
+
+def test_feeds_werden_parallel_geladen(tmp_path, feeds):
+    _, feed_liste, _ = feeds
+    items, dauer = _scan(_engine(tmp_path, feed_liste))
+    assert len(items) == 15
+    # Sequentiell wären es 0.9 s
+    assert dauer < 0.6
+
+
+def test_zweiter_scan_bekommt_304(tmp_path, feeds):
+    _, feed_liste, zaehler = feeds
+    engine = _engine(tmp_path, feed_liste)
+    _scan(engine)
+    items, _ = _scan(engine)
+    assert items == []
+    assert engine.feed_statistik == {"geladen": 0, "unveraendert": 3, "fehler": 0}
+    assert zaehler == {"200": 3, "304": 3}
+
+
+def test_timeout_gilt_pro_feed(tmp_path, feeds):
+    verzoegerungen, feed_liste, _ = feeds
+    verzoegerungen["c"] = 2.0
+    items, dauer = _scan(_engine(tmp_path, feed_liste, fetch_timeout=0.6))
+    assert len(items) == 10
+    assert dauer < 1.5
+
+
+def test_validatoren_eines_gescheiterten_scans_werden_nicht_spaeter_gespeichert(tmp_path, feeds):
+    verzoegerungen, feed_liste, _ = feeds
+    engine = _engine(tmp_path, feed_liste, fetch_timeout=0.6)
+    # Scan 1: Analyse gescheitert, Validatoren werden nicht gespeichert
+    _scan(engine, validatoren_speichern=False)
+    # Scan 2: Feed c scheitert, der Scan selbst gelingt
+    verzoegerungen["c"] = 2.0
+    _scan(engine)
+    gespeichert = _feed_cache(engine)
+    assert set(gespeichert) == {feed_liste[0]["url"], feed_liste[1]["url"]}
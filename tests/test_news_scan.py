@@ -0,0 +1,57 @@
+"""NewsEngine-Scan: bekannte Artikel kosten keinen Groq-Aufruf, zählen aber weiter für die 3-5 Tage Regel."""
+
+import pytest
+
+from _paket import lade
+from bench_news_groq import StubGroq
+
+news_engine = lade("news_engine")
+news_schema = lade("news_schema")
+
+
+def _artikel(*titel):
+    items = []
+    for t in titel:
+        item = {"title": t, "description": f"Beschreibung zu {t}.", "published": None}
+        item["fingerprint"] = news_engine.fingerabdruck(item)
+        items.append(item)
+    return items
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    client = StubGroq(grundlatenz=0, sekunden_pro_1k=0)
+    engine = news_engine.NewsEngine(tmp_path / "news.db", feeds=[], groq_client=client)
+    feed = []
+    monkeypatch.setattr(engine, "_fetch_raw_feeds", lambda conn: list(feed))
+    return engine, client, feed
+
+
+def _wissen(engine):
+    conn = news_schema.verbinde(engine.db_path)
+    try:
+        return {topic for topic, in conn.execute("SELECT topic_id FROM knowledge_base")}
+    finally:
+        conn.close()
+
+
+def test_artikel_im_naechsten_scan_zaehlt_ohne_neue_analyse(engine):
+    engine, client, feed = engine
+    feed.extend(_artikel("Pluto Status"))
+    engine.scanne_und_lerne()
+    assert _wissen(engine) == set()
+    assert client.aufrufe == 1
+
+    # Der Artikel steht noch im Feed: kein Groq-Aufruf, aber ein zweiter Puffer-Eintrag
+    engine.scanne_und_lerne()
+    assert client.aufrufe == 1
+    assert engine.scan_statistik == {"artikel": 1, "uebersprungen": 1, "neu": 0}
+    assert _wissen(engine) == {"pluto_status"}
+
+
+def test_dieselbe_meldung_aus_zwei_feeds_zaehlt_doppelt(engine):
+    engine, client, feed = engine
+    feed.extend(_artikel("Krieg Irak", "Tech AI Chip", "Krieg Irak"))
+    engine.scanne_und_lerne()
+    assert client.aufrufe == 1
+    assert _wissen(engine) == {"krieg_irak"}
@@ -0,0 +1,25 @@
+"""SafetyGuard: Stichwort-Listen pro Instanz."""
+
+from _paket import lade
+
+safety_guardrails = lade("safety_guardrails")
+message_analysis = lade("message_analysis")
+
+
+def test_standard_listen_nutzen_gemeinsamen_matcher():
+    guard = safety_guardrails.SafetyGuard()
+    assert guard.is_medical_question("ich brauche ein medikament")
+    assert guard.is_critical_question("das ist ein notfall")
+    assert not guard.is_medical_question("wie war die schule")
+    assert guard._eigener_matcher() is None
+
+
+def test_angepasste_listen_werden_beachtet():
+    guard = safety_guardrails.SafetyGuard()
+    guard.medical_keywords = guard.MEDICAL_KEYWORDS | {"fieber"}
+    guard.critical_keywords = {"hilfe sofort"}
+    text = "ich habe fieber, hilfe sofort"
+    analyse = message_analysis.MessageAnalysis(text)
+    assert guard.is_medical_question(text, analyse)
+    assert guard.is_critical_question(text, analyse)
+    assert not guard.is_critical_question("das ist ein notfall")
@@ -0,0 +1,26 @@
+"""
+Text-Normalisierung für Vergleiche, Cache-Schlüssel und Suchindizes.
+Macht aus "Wie GROSS ist der Mond?!" und "wie  gross ist der mond" denselben Text.
+"""
+
+import re
+import unicodedata
+
+_UMLAUTE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NICHT_WORT = re.compile(r"[^\w\s]+")
+_LEERRAUM = re.compile(r"\s+")
+
+
+def normalisiere(text: str) -> str:
+    """
+    Kleinschreibung, Umlaute ausgeschrieben (ä -> ae, ß -> ss), Satzzeichen entfernt,
+    Leerraum zusammengefasst.
+    """
+    text = unicodedata.normalize("NFKC", text).lower().translate(_UMLAUTE)
+    text = _NICHT_WORT.sub(" ", text).replace("_", " ")
+    return _LEERRAUM.sub(" ", text).strip()
+
+
+def tokens(text: str) -> list:
+    """Wörter eines bereits normalisierten Textes."""
+    return text.split()
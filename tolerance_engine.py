@@ -1,64 +1,246 @@
+import atexit
 import sqlite3
+import threading
+import time
+import weakref
+
+from . import keyword_matcher
+
+STANDARD_SCORE = 50  # Fremde starten neutral
+
+# Alle Engines mit Write-Behind, damit beim Beenden keine Scores verloren gehen
+_offene_engines = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_alle():
+    for engine in list(_offene_engines):
+        engine.flush()
+
 
 class ToleranceEngine:
     """
     Der Soziale Filter.
     Verwaltet Beziehungspunkte (Scores) und bestimmt,
     wie Sulee reagiert: Offen, Abweisend oder Blockiert.
+
+    Scores liegen nach dem ersten Lesen im Speicher (Read-Through-Cache,
+    höchstens ``cache_ttl`` Sekunden alt, damit Änderungen anderer Engines
+    oder Prozesse ankommen).
+    flush_intervall:
+        None  - jede Änderung geht sofort als atomares Update in die Datenbank
+        float - Write-Behind: Änderungen (Deltas) werden gesammelt und spätestens
+                nach so vielen Sekunden in einer Transaktion relativ geschrieben
+                (score = score + delta), außerdem bei ``flush()`` und beim
+                Beenden des Interpreters
     """
 
-    def __init__(self, db_conn):
+    # NEGATIVE LISTE (Beleidigungen, Befehle)
+    NEGATIV = (
+        "idiot", "blöd", "hure", "fick dich", "verschwinde",
+        "kannst nichts", "du nervst"
+    )
+    # POSITIVE LISTE (Höflichkeit)
+    POSITIV = ("bitte", "danke", "entschuldigung", "entschuldige")
+
+    def __init__(self, db_conn, flush_intervall: float | None = 2.0, cache_ttl: float = 5.0):
         self.db = db_conn
         self.breaking_point = 10  # Unter 10 wird sie kalt, unter 0 blockt sie.
+        self.flush_intervall = flush_intervall
+        self.cache_ttl = cache_ttl
+        # Eine Verbindung pro Thread; sie gehört nur dem Thread-Local und wird
+        # mit dem Thread freigegeben (Streamlit startet pro Rerun neue Threads)
+        self._lokal = threading.local()
+        self._lock = threading.Lock()
+        self._schreib_lock = threading.Lock()
+        self._scores = {}                 # user -> (Score, gelesen_um) (Cache)
+        self._deltas = {}                 # user -> noch nicht geschriebene Änderung
+        self._timer = None
+        self._schreib_conn = None
+
+    # ---------------------------------------------------------
+    # DATENBANK
+    # ---------------------------------------------------------
+
+    def _verbinde(self, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db, timeout=10, isolation_level=None, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_profiles "
+            "(user_id TEXT PRIMARY KEY, score INTEGER, last_seen TIMESTAMP)"
+        )
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """Verbindung des aktuellen Threads (wird einmal geöffnet und wiederverwendet)."""
+        conn = getattr(self._lokal, "conn", None)
+        if conn is None:
+            conn = self._lokal.conn = self._verbinde()
+        return conn
+
+    def _flush_conn(self) -> sqlite3.Connection:
+        """Eigene Verbindung fürs Write-Behind (Timer-Threads wechseln), nur unter _schreib_lock."""
+        if self._schreib_conn is None:
+            self._schreib_conn = self._verbinde(check_same_thread=False)
+        return self._schreib_conn
+
+    def _lese_score(self, user_name: str) -> int:
+        res = self._conn().execute("SELECT score FROM user_profiles WHERE user_id = ?", (user_name,)).fetchone()
+        return res[0] if res else STANDARD_SCORE
+
+    @staticmethod
+    def _aendere_relativ(conn, user_name: str, change: int):
+        """Score relativ ändern (auf 0..100 begrenzt), neue User anlegen. Läuft in der Transaktion des Aufrufers."""
+        cur = conn.execute(
+            "UPDATE user_profiles SET score = MIN(100, MAX(0, score + ?)), last_seen = CURRENT_TIMESTAMP "
+            "WHERE user_id = ?",
+            (change, user_name),
+        )
+        if cur.rowcount == 0:
+            conn.execute(
+                "INSERT INTO user_profiles (user_id, score, last_seen) "
+                "VALUES (?, MIN(100, MAX(0, ? + ?)), CURRENT_TIMESTAMP)",
+                (user_name, STANDARD_SCORE, change),
+            )
+
+    def _aendere_atomar(self, conn, user_name: str, change: int) -> int:
+        """Eine Transaktion: Score relativ ändern und den neuen Wert zurückgeben."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._aendere_relativ(conn, user_name, change)
+            score = conn.execute("SELECT score FROM user_profiles WHERE user_id = ?", (user_name,)).fetchone()[0]
+            conn.execute("COMMIT")
+            return score
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---------------------------------------------------------
+    # SCORES
+    # ---------------------------------------------------------
+
+    def _merke(self, user_name: str, db_score: int):
+        """Cache aus dem Datenbank-Wert setzen; noch offene Deltas bleiben sichtbar. Nur unter _lock."""
+        score = max(0, min(100, db_score + self._deltas.get(user_name, 0)))
+        self._scores[user_name] = (score, time.monotonic())
+        return score
 
     def get_score(self, user_name: str) -> int:
         """Holt den aktuellen Score. Fallback 50 für Fremde."""
-        conn = sqlite3.connect(self.db)
-        c = conn.cursor()
-        
-        c.execute("SELECT score FROM user_profiles WHERE user_id = ?", (user_name,))
-        res = c.fetchone()
-        conn.close()
-        
-        return res[0] if res else 50
+        with self._lock:
+            eintrag = self._scores.get(user_name)
+            if eintrag is not None and (
+                user_name in self._deltas or time.monotonic() - eintrag[1] < self.cache_ttl
+            ):
+                return eintrag[0]
+        db_score = self._lese_score(user_name)
+        with self._lock:
+            return self._merke(user_name, db_score)
+
+    def invalidiere(self, user_name: str | None = None):
+        """Vergisst gecachte Scores (einen User oder alle); der nächste Zugriff liest aus der Datenbank."""
+        with self._lock:
+            if user_name is None:
+                self._scores.clear()
+            else:
+                self._scores.pop(user_name, None)
 
     def update_score(self, user_name: str, change: int):
-        """Ver盲ndert den Score (+ Respekt, - Beleidigung)."""
+        """Verändert den Score (+ Respekt, - Beleidigung)."""
+        if self.flush_intervall is None:
+            score = self._aendere_atomar(self._conn(), user_name, change)
+            with self._lock:
+                self._scores[user_name] = (score, time.monotonic())
+            return score
+
         current = self.get_score(user_name)
-        new_score = max(0, min(100, current + change))
-        
-        conn = sqlite3.connect(self.db)
-        c = conn.cursor()
-        
-        # UPSERT (Update oder Insert, wenn User neu)
-        c.execute('''
-            INSERT OR REPLACE INTO user_profiles (user_id, score, last_seen)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (user_name, new_score))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            current = self._scores.get(user_name, (current, 0))[0]
+            new_score = max(0, min(100, current + change))
+            self._scores[user_name] = (new_score, time.monotonic())
+            self._deltas[user_name] = self._deltas.get(user_name, 0) + change
+            if self._timer is None:
+                _offene_engines.add(self)
+                self._timer = threading.Timer(self.flush_intervall, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
         return new_score
 
-    def analyse_tonfall(self, text: str) -> int:
+    def flush(self):
+        """
+        Schreibt vorgemerkte Änderungen sofort in die Datenbank (eine Transaktion).
+        Geschrieben werden Deltas, keine absoluten Werte: Engines und Prozesse,
+        die dieselbe Datenbank nutzen, überschreiben sich nicht gegenseitig.
+        """
+        with self._schreib_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._deltas:
+                    return
+                deltas, self._deltas = self._deltas, {}
+            try:
+                conn = self._flush_conn()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for user, delta in deltas.items():
+                        self._aendere_relativ(conn, user, delta)
+                    neu = dict(conn.execute(
+                        f"SELECT user_id, score FROM user_profiles WHERE user_id IN ({','.join('?' * len(deltas))})",
+                        list(deltas),
+                    ).fetchall())
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except Exception as e:
+                print(f"[Fehler] Konnte Scores nicht speichern: {e}")
+                with self._lock:
+                    # Nicht verlieren: beim nächsten flush() erneut versuchen
+                    for user, delta in deltas.items():
+                        self._deltas[user] = self._deltas.get(user, 0) + delta
+                return
+            with self._lock:
+                # Cache auf den Stand der Datenbank bringen (inkl. Änderungen anderer)
+                for user, score in neu.items():
+                    self._merke(user, score)
+
+    def close(self):
+        """Schreibt offene Scores und schließt die eigenen Verbindungen."""
+        self.flush()
+        with self._schreib_lock:
+            schreib_conn, self._schreib_conn = self._schreib_conn, None
+        if schreib_conn is not None:
+            schreib_conn.close()
+        conn = getattr(self._lokal, "conn", None)
+        if conn is not None:
+            conn.close()
+        # Verbindungen anderer Threads werden mit ihrem Thread freigegeben
+        self._lokal = threading.local()
+
+    def analyse_tonfall(self, text: str, analyse=None) -> int:
         """
         Analysiert den Text auf emotionalen Gehalt.
+        Mit ``analyse`` (MessageAnalysis des Zuges) wird nicht neu gescannt.
         Rückgabe: Score-Change (Plus oder Minus).
         """
-        text_low = text.lower()
+        if analyse is not None:
+            return analyse.ton_delta
+        return self.ton_aenderung(text, keyword_matcher.gemeinsamer_matcher().kategorien_von(text))
+
+    @staticmethod
+    def ton_aenderung(text: str, gefunden) -> int:
+        """Score-Change aus den Stichwort-Kategorien des Textes (siehe keyword_matcher)."""
         change = 0
         
         # NEGATIVE LISTE (Beleidigungen, Befehle)
-        if any(w in text_low for w in [
-            "idiot", "blöd", "hure", "fick dich", "verschwinde", 
-            "kannst nichts", "du nervst"
-        ]):
+        if "ton.negativ" in gefunden:
             change = -10 # Harte Strafe
         
         # POSITIVE LISTE (Höflichkeit)
-        elif any(w in text_low for w in [
-            "bitte", "danke", "entschuldigung", "entschuldige"
-        ]):
+        elif "ton.positiv" in gefunden:
             change = +5
 
         # GROSSSCHREIBUNG (Verdacht auf Aggression)
@@ -89,4 +271,7 @@ class ToleranceEngine:
         elif modus == "COLD":
             return f"({alter} Jahre) Ich bin noch da, aber ich bin enttauscht von deiner Art. Bitte rede respektvoller, damit wir weitermachen k枚nnen."
         else: # WARM
-            return f"({alter} Jahre) Ich bin hier für dich. Worüber möchtest du reden?"
\ No newline at end of file
+            return f"({alter} Jahre) Ich bin hier für dich. Worüber möchtest du reden?"
+
+
+keyword_matcher.registriere("ton", {"negativ": ToleranceEngine.NEGATIV, "positiv": ToleranceEngine.POSITIV})
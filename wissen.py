@@ -6,18 +6,34 @@ Speichert gelernte Antworten persistent ab.
 import os
 import json
 from datetime import datetime
+from .wissen_index import NGramIndex
+from .wissen_journal import WissenJournal
+from .persistenz import atomar_json_schreiben
+from .text_normalisierung import normalisiere
 
 
 class Wissen:
     """
     Verwaltet das gelernte Wissen von Sulee.
     Speichert Frage-Antwort-Paare persistent in einer JSON-Datei.
+
+    speicher_modus:
+        "json"    - jede Änderung schreibt die ganze Datei neu (Standard, atomar, ohne fsync)
+        "journal" - jede Änderung wird an ein Append-only-Journal angehängt,
+                    ab ``journal_schwelle`` Einträgen wird im Hintergrund kompaktiert
     """
 
-    def __init__(self, datei="sulee_wissen.json"):
+    def __init__(self, datei="sulee_wissen.json", speicher_modus="json", journal_schwelle=1000):
         self.datei = datei
+        self.speicher_modus = speicher_modus
+        self._journal = WissenJournal(datei, schwelle=journal_schwelle) if speicher_modus == "journal" else None
         self.wissen = {}
         self._lade_wissen()
+        self._index = NGramIndex(self.wissen)
+        # Normalisierte Frage -> gespeicherte Frage (für Cache-Treffer bei anderer Schreibweise)
+        self._normalisiert = {}
+        for key in self.wissen:
+            self._normalisiert.setdefault(normalisiere(key), key)
 
     def _lade_wissen(self):
         """Lädt das gespeicherte Wissen aus der JSON-Datei."""
@@ -28,15 +44,32 @@ class Wissen:
             except Exception as e:
                 print(f"[Warnung] Konnte Wissen nicht laden: {e}")
                 self.wissen = {}
+        if self._journal:
+            try:
+                self._journal.wiederherstellen(self.wissen)
+            except Exception as e:
+                print(f"[Warnung] Konnte Wissens-Journal nicht einspielen: {e}")
 
     def _speichere_wissen(self):
         """Speichert das aktuelle Wissen in die JSON-Datei."""
         try:
-            with open(self.datei, "w", encoding="utf-8") as f:
-                json.dump(self.wissen, f, ensure_ascii=False, indent=2)
+            # Läuft bei jedem lerne/korrigiere im Anfrage-Pfad: atomar, aber ohne fsync
+            atomar_json_schreiben(self.datei, self.wissen, fsync=False)
         except Exception as e:
             print(f"[Fehler] Konnte Wissen nicht speichern: {e}")
 
+    def _persistiere(self, frage_low: str, entry: dict):
+        """Schreibt eine einzelne Änderung, je nach Speicher-Modus."""
+        if not self._journal:
+            self._speichere_wissen()
+            return
+        try:
+            self._journal.anhaengen(frage_low, entry)
+            if self._journal.braucht_kompaktierung():
+                self._journal.kompaktieren(self.wissen)
+        except Exception as e:
+            print(f"[Fehler] Konnte Wissen nicht ins Journal schreiben: {e}")
+
     def pruefe_wissen(self, frage: str) -> str:
         """
         Prüft, ob Sulee diese Frage schon beantworten kann.
@@ -48,19 +81,36 @@ class Wissen:
             Die gelernte Antwort oder None
         """
         frage_low = frage.lower().strip()
-        for gespeicherte_frage, meta in self.wissen.items():
-            if gespeicherte_frage in frage_low or frage_low in gespeicherte_frage:
-                # Only return accepted/core facts
-                if meta.get("quelle") == "core":
-                    return meta
-                status = meta.get("status")
-                confidence = meta.get("confidence") or 0
-                if status == "accepted" or confidence == 1.0:
-                    return meta
-                # pending or low-confidence facts are NOT returned as known
-                return None
+        # Der Index liefert den zuerst gespeicherten Treffer, wie der frühere lineare Scan
+        gespeicherte_frage = self._index.erster_treffer(frage_low)
+        if gespeicherte_frage is None:
+            return None
+        meta = self.wissen[gespeicherte_frage]
+        # Only return accepted/core facts
+        if meta.get("quelle") == "core":
+            return meta
+        status = meta.get("status")
+        confidence = meta.get("confidence") or 0
+        if status == "accepted" or confidence == 1.0:
+            return meta
+        # pending or low-confidence facts are NOT returned as known
         return None
 
+    def nachschlagen(self, frage: str):
+        """
+        Eintrag genau zu dieser Frage, auch wenn er noch pending ist.
+        Passt die Frage nicht wörtlich, zählt die normalisierte Form
+        (Groß/klein, Satzzeichen, Umlaute, Leerraum).
+
+        Returns:
+            Der Eintrag (dict) oder None
+        """
+        frage_low = frage.lower().strip()
+        if frage_low in self.wissen:
+            return self.wissen[frage_low]
+        key = self._normalisiert.get(normalisiere(frage_low))
+        return self.wissen[key] if key is not None else None
+
     def speichere_wissen(self, frage: str, antwort: str, source: str = "user", allow_overwrite: bool = False):
         """
         Speichert eine neue Frage-Antwort-Kombination.
@@ -92,7 +142,9 @@ class Wissen:
             entry["status"] = "pending"
 
         self.wissen[frage_low] = entry
-        self._speichere_wissen()
+        self._index.hinzufuegen(frage_low)
+        self._normalisiert.setdefault(normalisiere(frage_low), frage_low)
+        self._persistiere(frage_low, entry)
         return True
 
     def get_all(self):
@@ -0,0 +1,94 @@
+"""
+Invertierter N-Gramm-Index für Sulees Wissens-Speicher.
+Findet gespeicherte Fragen, die in einer Anfrage enthalten sind (oder umgekehrt),
+ohne jedes Mal den ganzen Speicher linear durchzugehen.
+"""
+
+from collections import defaultdict
+
+
+class NGramIndex:
+    """
+    Zeichen-Trigramm-Index über die Schlüssel (gespeicherte Fragen) des Wissens.
+
+    Liefert exakt dieselben Treffer wie der alte Substring-Scan
+    (``schluessel in frage or frage in schluessel``) und behält die
+    Einfüge-Reihenfolge bei, damit die Vorrang-Regeln (core/accepted/pending)
+    gleich bleiben.
+    """
+
+    N = 3
+
+    def __init__(self, schluessel=()):
+        self._reihenfolge = {}                 # Schlüssel -> Einfüge-Nummer
+        self._postings = defaultdict(set)      # Trigramm -> Schlüssel, die es enthalten
+        self._anker = defaultdict(set)         # seltenstes Trigramm beim Einfügen -> Schlüssel
+        for key in schluessel:
+            self.hinzufuegen(key)
+
+    def _ngramme(self, text: str):
+        n = self.N
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def hinzufuegen(self, key: str):
+        """Nimmt einen Schlüssel auf. Bereits bekannte Schlüssel behalten ihre Position."""
+        if key in self._reihenfolge:
+            return
+        self._reihenfolge[key] = len(self._reihenfolge)
+        gramme = self._ngramme(key)
+        # Jeder Schlüssel wird unter genau einem (möglichst seltenen) Trigramm verankert.
+        # Steckt der Schlüssel in einer Frage, steckt auch sein Anker darin.
+        if gramme:
+            anker = min(gramme, key=lambda g: len(self._postings.get(g, ())))
+        else:
+            anker = key  # kürzer als N Zeichen
+        self._anker[anker].add(key)
+        for gramm in gramme:
+            self._postings[gramm].add(key)
+
+    def _enthaltene_schluessel(self, frage: str):
+        """Schlüssel, die als Teilstring in der Frage vorkommen."""
+        kandidaten = set(self._anker.get("", ()))
+        for i in range(len(frage)):
+            for laenge in range(1, self.N + 1):
+                if i + laenge > len(frage):
+                    break
+                kandidaten.update(self._anker.get(frage[i:i + laenge], ()))
+        return {k for k in kandidaten if k in frage}
+
+    def _umfassende_schluessel(self, frage: str):
+        """Schlüssel, die die Frage als Teilstring enthalten."""
+        if len(frage) < self.N:
+            # Zu kurz für Trigramme: seltener Fall, direkter Vergleich
+            return {k for k in self._reihenfolge if frage in k}
+        listen = []
+        for gramm in self._ngramme(frage):
+            posting = self._postings.get(gramm)
+            if not posting:
+                return set()
+            listen.append(posting)
+        listen.sort(key=len)
+        kandidaten = set(listen[0])
+        for posting in listen[1:]:
+            kandidaten &= posting
+            if not kandidaten:
+                return set()
+        return {k for k in kandidaten if frage in k}
+
+    def treffer(self, frage: str) -> list:
+        """Alle passenden Schlüssel in Einfüge-Reihenfolge."""
+        gefunden = self._enthaltene_schluessel(frage) | self._umfassende_schluessel(frage)
+        return sorted(gefunden, key=self._reihenfolge.__getitem__)
+
+    def erster_treffer(self, frage: str):
+        """Der zuerst gespeicherte passende Schlüssel oder None."""
+        gefunden = self._enthaltene_schluessel(frage) | self._umfassende_schluessel(frage)
+        if not gefunden:
+            return None
+        return min(gefunden, key=self._reihenfolge.__getitem__)
+
+    def __contains__(self, key):
+        return key in self._reihenfolge
+
+    def __len__(self):
+        return len(self._reihenfolge)
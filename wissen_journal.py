@@ -0,0 +1,191 @@
+"""
+Append-only Journal (Write-Ahead-Log) für Sulees Wissens-Speicher.
+Jede Änderung wird als eine JSON-Zeile angehängt, statt den ganzen Speicher
+neu zu schreiben. Ab einer Schwelle wird im Hintergrund zu einem Snapshot kompaktiert.
+"""
+
+import json
+import os
+import threading
+
+from .persistenz import atomar_json_schreiben
+
+
+class WissenJournal:
+    """
+    Verwaltet ``<datei>.journal`` neben dem JSON-Snapshot ``<datei>``.
+
+    Ablauf der Kompaktierung:
+    1. Das aktuelle Journal wird zu ``<datei>.journal.kompakt`` umbenannt,
+       neue Änderungen landen sofort in einem frischen Journal.
+    2. Ein Hintergrund-Thread schreibt eine Kopie des Wissens atomar als Snapshot.
+    3. Danach wird ``.journal.kompakt`` gelöscht. Scheitert der Snapshot, wird
+       ``.journal.kompakt`` wieder vor das Journal gestellt.
+
+    Beim Laden gilt: Snapshot + ``.journal.kompakt`` + ``.journal``.
+    Das Wiederholen von Einträgen ist idempotent, ein Absturz an jeder Stelle
+    verliert daher keine Daten.
+    """
+
+    def __init__(self, datei, schwelle=1000, fsync=False):
+        self.datei = datei
+        self.journal_datei = f"{datei}.journal"
+        self.kompakt_datei = f"{datei}.journal.kompakt"
+        self.schwelle = schwelle
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._handle = None
+        self._zeilen = 0
+        self._kompakt_thread = None
+
+    # ---------------------------------------------------------
+    # LADEN
+    # ---------------------------------------------------------
+
+    def _lese_journal(self, pfad, wissen):
+        """Spielt eine Journal-Datei in ``wissen`` ein. Gibt die Anzahl Zeilen zurück."""
+        if not os.path.exists(pfad):
+            return 0
+        anzahl = 0
+        with open(pfad, "r", encoding="utf-8") as f:
+            for zeile in f:
+                zeile = zeile.strip()
+                if not zeile:
+                    continue
+                try:
+                    eintrag = json.loads(zeile)
+                except json.JSONDecodeError:
+                    # Abgebrochene letzte Zeile nach einem Absturz
+                    print(f"[Warnung] Unvollständige Journal-Zeile in {pfad} übersprungen.")
+                    continue
+                if eintrag.get("op") == "set":
+                    wissen[eintrag["frage"]] = eintrag["eintrag"]
+                anzahl += 1
+        return anzahl
+
+    def wiederherstellen(self, wissen: dict) -> int:
+        """
+        Spielt alle offenen Journal-Einträge in ``wissen`` ein (nach dem Laden des Snapshots).
+        Eine unterbrochene Kompaktierung wird dabei abgeschlossen.
+        """
+        with self._lock:
+            unterbrochen = os.path.exists(self.kompakt_datei)
+            anzahl = self._lese_journal(self.kompakt_datei, wissen)
+            self._zeilen = self._lese_journal(self.journal_datei, wissen)
+            anzahl += self._zeilen
+
+            if unterbrochen:
+                # Snapshot enthält danach alles, beide Journale sind überflüssig
+                atomar_json_schreiben(self.datei, wissen)
+                os.remove(self.kompakt_datei)
+                self._schliesse_handle()
+                open(self.journal_datei, "w", encoding="utf-8").close()
+                self._zeilen = 0
+        return anzahl
+
+    # ---------------------------------------------------------
+    # SCHREIBEN
+    # ---------------------------------------------------------
+
+    def _schliesse_handle(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def anhaengen(self, frage: str, eintrag: dict):
+        """Hängt eine Änderung als JSON-Zeile an das Journal an."""
+        zeile = json.dumps({"op": "set", "frage": frage, "eintrag": eintrag}, ensure_ascii=False)
+        with self._lock:
+            if self._handle is None:
+                self._handle = open(self.journal_datei, "a", encoding="utf-8")
+            self._handle.write(zeile + "\n")
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+            self._zeilen += 1
+
+    def braucht_kompaktierung(self) -> bool:
+        return self._zeilen >= self.schwelle
+
+    def kompaktieren(self, wissen: dict, hintergrund: bool = True):
+        """
+        Schreibt einen neuen Snapshot und verwirft das bisherige Journal.
+        Läuft bereits eine Kompaktierung, passiert nichts.
+        """
+        with self._lock:
+            if self._kompakt_thread is not None and self._kompakt_thread.is_alive():
+                return None
+            if os.path.exists(self.kompakt_datei):
+                # Überbleibsel einer gescheiterten Kompaktierung, deren Aufräumen auch scheiterte
+                try:
+                    self._kompakt_zurueckfuehren()
+                except OSError as e:
+                    print(f"[Fehler] Kompaktierung des Wissens nicht möglich: {e}")
+                    return None
+            self._schliesse_handle()
+            if os.path.exists(self.journal_datei):
+                os.replace(self.journal_datei, self.kompakt_datei)
+            self._zeilen = 0
+            # Einträge werden nur ersetzt, nie verändert: eine flache Kopie genügt
+            kopie = dict(wissen)
+
+        def _schreibe_snapshot():
+            try:
+                atomar_json_schreiben(self.datei, kopie)
+                if os.path.exists(self.kompakt_datei):
+                    os.remove(self.kompakt_datei)
+            except Exception as e:
+                print(f"[Fehler] Kompaktierung des Wissens fehlgeschlagen: {e}")
+                # Der Snapshot fehlt: die Einträge aus .journal.kompakt zurück ins Journal,
+                # sonst bliebe jede weitere Kompaktierung bis zum Neustart gesperrt
+                try:
+                    with self._lock:
+                        self._kompakt_zurueckfuehren()
+                except OSError as e:
+                    print(f"[Fehler] Konnte {self.kompakt_datei} nicht zurückführen: {e}")
+
+        if not hintergrund:
+            _schreibe_snapshot()
+            return None
+
+        self._kompakt_thread = threading.Thread(target=_schreibe_snapshot, name="wissen-kompaktierung", daemon=True)
+        self._kompakt_thread.start()
+        return self._kompakt_thread
+
+    def _kompakt_zurueckfuehren(self):
+        """
+        Stellt ``.journal.kompakt`` wieder vor das aktuelle Journal (``self._lock`` halten).
+        Bis zum Löschen stehen die Einträge doppelt auf der Platte; das Wiederholen ist idempotent.
+        """
+        if not os.path.exists(self.kompakt_datei):
+            return
+        self._schliesse_handle()
+        zusammen = f"{self.journal_datei}.neu"
+        zeilen = 0
+        with open(zusammen, "w", encoding="utf-8") as ziel:
+            for pfad in (self.kompakt_datei, self.journal_datei):
+                if not os.path.exists(pfad):
+                    continue
+                with open(pfad, "r", encoding="utf-8") as quelle:
+                    for zeile in quelle:
+                        if not zeile.strip():
+                            continue
+                        ziel.write(zeile if zeile.endswith("\n") else zeile + "\n")
+                        zeilen += 1
+            ziel.flush()
+            if self.fsync:
+                os.fsync(ziel.fileno())
+        os.replace(zusammen, self.journal_datei)
+        os.remove(self.kompakt_datei)
+        self._zeilen = zeilen
+
+    def warte(self, timeout=None):
+        """Wartet auf eine laufende Hintergrund-Kompaktierung."""
+        thread = self._kompakt_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def schliessen(self):
+        self.warte()
+        with self._lock:
+            self._schliesse_handle()
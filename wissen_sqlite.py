@@ -0,0 +1,363 @@
+"""
+SQLite-basierter Wissens-Speicher für Sulee.
+Drop-in-Ersatz für ``Wissen`` (wissen.py / knowledge.py): gleiche Schnittstelle,
+aber das Wissen liegt in einer SQLite-Datenbank (WAL-Modus) statt komplett im RAM.
+Lookups laufen über Indizes und eine FTS5-Tabelle, der Start lädt nichts vorab.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from .text_normalisierung import normalisiere
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wissen (
+    id INTEGER PRIMARY KEY,
+    frage TEXT NOT NULL UNIQUE,
+    anker TEXT NOT NULL,
+    antwort TEXT,
+    eintrag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_wissen_anker ON wissen(anker);
+CREATE TABLE IF NOT EXISTS wissen_norm (
+    norm TEXT PRIMARY KEY,
+    frage TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wissen_gramm (
+    gramm TEXT PRIMARY KEY,
+    anzahl INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wissen_meta (
+    schluessel TEXT PRIMARY KEY,
+    wert TEXT
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS wissen_fts USING fts5(
+    frage, antwort, content='wissen', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS wissen_ai AFTER INSERT ON wissen BEGIN
+    INSERT INTO wissen_fts(rowid, frage, antwort) VALUES (new.id, new.frage, new.antwort);
+END;
+CREATE TRIGGER IF NOT EXISTS wissen_ad AFTER DELETE ON wissen BEGIN
+    INSERT INTO wissen_fts(wissen_fts, rowid, frage, antwort) VALUES ('delete', old.id, old.frage, old.antwort);
+END;
+CREATE TRIGGER IF NOT EXISTS wissen_au AFTER UPDATE ON wissen BEGIN
+    INSERT INTO wissen_fts(wissen_fts, rowid, frage, antwort) VALUES ('delete', old.id, old.frage, old.antwort);
+    INSERT INTO wissen_fts(rowid, frage, antwort) VALUES (new.id, new.frage, new.antwort);
+END;
+"""
+
+# Anker wie im NGramIndex: jede gespeicherte Frage "k" wird unter ihrem beim
+# Einfügen seltensten Trigramm verankert (kürzere Fragen unter sich selbst).
+# k steckt nur dann in der Anfrage "q", wenn der Anker ein Teilstring von q ist.
+# Ein Präfix wäre kein guter Anker: fast alle Fragen beginnen mit "was"/"wie"/"wer".
+ANKER_LAENGE = 3
+ANKER_VERSION = "trigramm-selten"
+
+
+def _trigramme(frage: str) -> set:
+    return {frage[i:i + ANKER_LAENGE] for i in range(len(frage) - ANKER_LAENGE + 1)}
+
+
+def _waehle_anker(frage: str, zaehler: dict) -> str:
+    """Seltenstes Trigramm laut ``zaehler`` (Trigramm -> Anzahl Fragen); zählt die Frage danach mit."""
+    gramme = _trigramme(frage)
+    if not gramme:
+        return frage
+    anker = min(sorted(gramme), key=lambda g: zaehler.get(g, 0))
+    for gramm in gramme:
+        zaehler[gramm] = zaehler.get(gramm, 0) + 1
+    return anker
+
+
+def _teilstrings_bis_anker(frage: str) -> list:
+    """Alle Teilstrings der Länge 0..ANKER_LAENGE (Kandidaten für Anker)."""
+    teile = {""}
+    for i in range(len(frage)):
+        for laenge in range(1, ANKER_LAENGE + 1):
+            if i + laenge > len(frage):
+                break
+            teile.add(frage[i:i + laenge])
+    return list(teile)
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SQLiteWissen:
+    """
+    Verwaltet das gelernte Wissen von Sulee in SQLite.
+
+    Treffer-Logik wie beim JSON-Speicher: eine gespeicherte Frage passt, wenn sie
+    in der Anfrage enthalten ist oder umgekehrt. Bei mehreren Treffern zählt der
+    zuerst gespeicherte (kleinste id).
+    """
+
+    def __init__(self, datei="sulee_data/sulee_wissen.db", json_datei=None):
+        self.datei = datei
+        ordner = os.path.dirname(datei)
+        if ordner:
+            os.makedirs(ordner, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(datei, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._fts = self._erstelle_fts()
+        if json_datei:
+            self.migriere_aus_json(json_datei)
+        self._normalisierung_nachtragen()
+        self._anker_nachtragen()
+
+    def _erstelle_fts(self) -> bool:
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError as e:
+            # Ältere SQLite-Versionen ohne FTS5/Trigram: Fallback auf instr()-Scan
+            print(f"[Warnung] FTS5 (trigram) nicht verfügbar, Suche ohne Volltext-Index: {e}")
+            return False
+
+    # ---------------------------------------------------------
+    # MIGRATION
+    # ---------------------------------------------------------
+
+    def _normalisierung_nachtragen(self):
+        """Füllt wissen_norm für Datenbanken, die vor dieser Tabelle angelegt wurden."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM wissen_norm LIMIT 1").fetchone() or len(self) == 0:
+                return
+            fragen = [f for (f,) in self._conn.execute("SELECT frage FROM wissen ORDER BY id")]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO wissen_norm (norm, frage) VALUES (?, ?)",
+                    ((normalisiere(f), f) for f in fragen),
+                )
+
+    def _anker_nachtragen(self):
+        """Verankert Datenbanken mit den früheren Präfix-Ankern neu (in id-Reihenfolge)."""
+        with self._lock:
+            zeile = self._conn.execute("SELECT wert FROM wissen_meta WHERE schluessel = 'anker'").fetchone()
+            if zeile and zeile[0] == ANKER_VERSION:
+                return
+            zaehler = {}
+            anker = [
+                (_waehle_anker(frage, zaehler), frage_id)
+                for frage_id, frage in self._conn.execute("SELECT id, frage FROM wissen ORDER BY id").fetchall()
+            ]
+            with self._conn:
+                self._conn.executemany("UPDATE wissen SET anker = ? WHERE id = ?", anker)
+                self._conn.execute("DELETE FROM wissen_gramm")
+                self._conn.executemany("INSERT INTO wissen_gramm (gramm, anzahl) VALUES (?, ?)", zaehler.items())
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO wissen_meta (schluessel, wert) VALUES ('anker', ?)", (ANKER_VERSION,)
+                )
+
+    def _gramm_zaehler(self, fragen) -> dict:
+        """Aktuelle Trigramm-Zähler für die Trigramme der gegebenen Fragen."""
+        gramme = set()
+        for frage in fragen:
+            gramme |= _trigramme(frage)
+        if not gramme:
+            return {}
+        return dict(self._conn.execute(
+            "SELECT gramm, anzahl FROM wissen_gramm WHERE gramm IN (SELECT value FROM json_each(?))",
+            (json.dumps(sorted(gramme), ensure_ascii=False),),
+        ).fetchall())
+
+    def _speichere_zaehler(self, zaehler: dict):
+        self._conn.executemany("INSERT OR REPLACE INTO wissen_gramm (gramm, anzahl) VALUES (?, ?)", zaehler.items())
+
+    def migriere_aus_json(self, json_datei) -> int:
+        """
+        Einmalige Übernahme eines bestehenden JSON-Speichers.
+        Läuft nur, wenn die Datenbank noch leer ist und nicht schon migriert wurde.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM wissen_meta WHERE schluessel = 'migriert_aus'").fetchone():
+                return 0
+            if len(self) > 0 or not os.path.exists(json_datei):
+                return 0
+            try:
+                with open(json_datei, "r", encoding="utf-8") as f:
+                    daten = json.load(f)
+            except Exception as e:
+                print(f"[Warnung] Konnte Wissen nicht migrieren: {e}")
+                return 0
+
+            zaehler = self._gramm_zaehler(daten)
+            zeilen = [
+                (frage, _waehle_anker(frage, zaehler), meta.get("antwort"), json.dumps(meta, ensure_ascii=False))
+                for frage, meta in daten.items()
+            ]
+            with self._conn:
+                self._speichere_zaehler(zaehler)
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO wissen (frage, anker, antwort, eintrag) VALUES (?, ?, ?, ?)",
+                    zeilen,
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO wissen_norm (norm, frage) VALUES (?, ?)",
+                    ((normalisiere(frage), frage) for frage in daten),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO wissen_meta (schluessel, wert) VALUES ('migriert_aus', ?)",
+                    (os.path.abspath(json_datei),),
+                )
+            return len(zeilen)
+
+    # ---------------------------------------------------------
+    # ABFRAGEN
+    # ---------------------------------------------------------
+
+    def _treffer(self, frage_low: str, limit: int = -1):
+        """(frage, eintrag)-Paare, deren Frage in frage_low steckt oder umgekehrt, nach id sortiert."""
+        teile = json.dumps(_teilstrings_bis_anker(frage_low), ensure_ascii=False)
+        enthalten = "SELECT id, frage, eintrag FROM wissen WHERE anker IN (SELECT value FROM json_each(?)) AND instr(?, frage) > 0"
+        parameter = [teile, frage_low]
+        with self._lock:
+            # Umgekehrte Richtung (Anfrage steckt in einer gespeicherten Frage): jede solche
+            # Frage enthält alle Trigramme der Anfrage. Fehlt eins in wissen_gramm, gibt es keine.
+            umfassend = True
+            seltenste = []
+            if len(frage_low) >= ANKER_LAENGE:
+                zaehler = self._gramm_zaehler([frage_low])
+                gramme = _trigramme(frage_low)
+                umfassend = len(zaehler) == len(gramme)
+                seltenste = sorted(gramme, key=lambda g: (zaehler.get(g, 0), g))[:3]
+
+            if not umfassend:
+                sql = enthalten
+            elif self._fts and seltenste:
+                # Nur die seltensten Trigramme im Volltext-Index, Rest prüft instr()
+                sql = enthalten + """
+                    UNION
+                    SELECT w.id, w.frage, w.eintrag FROM wissen_fts
+                    JOIN wissen w ON w.id = wissen_fts.rowid
+                    WHERE wissen_fts MATCH ? AND instr(w.frage, ?) > 0
+                """
+                parameter += ["frage : (" + " AND ".join(_fts_phrase(g) for g in seltenste) + ")", frage_low]
+            else:
+                sql = enthalten + " UNION SELECT id, frage, eintrag FROM wissen WHERE instr(frage, ?) > 0"
+                parameter.append(frage_low)
+            zeilen = self._conn.execute(sql + " ORDER BY id LIMIT ?", [*parameter, limit]).fetchall()
+        return [(frage, json.loads(eintrag)) for _, frage, eintrag in zeilen]
+
+    def pruefe_wissen(self, frage: str):
+        """Gibt core/accepted Wissen zurück, pending Einträge gelten nicht als Wissen."""
+        frage_low = frage.lower().strip()
+        treffer = self._treffer(frage_low, limit=1)
+        if not treffer:
+            return None
+        meta = treffer[0][1]
+        if meta.get("quelle") == "core":
+            return meta
+        if meta.get("status") == "accepted":
+            return meta
+        return None # Pending Facts werden nicht als "Wissen" ausgegeben, nur für Reflexion
+
+    def get_relevant_context(self, frage: str):
+        """Gibt ALLE relevanten Infos zurück (auch Pending) für die Reflexion."""
+        frage_low = frage.lower().strip()
+        return [meta for _, meta in self._treffer(frage_low)]
+
+    def nachschlagen(self, frage: str):
+        """Eintrag genau zu dieser Frage (auch pending), sonst zur normalisierten Frage, sonst None."""
+        frage_low = frage.lower().strip()
+        with self._lock:
+            zeile = self._conn.execute("SELECT eintrag FROM wissen WHERE frage = ?", (frage_low,)).fetchone()
+            if zeile is None:
+                zeile = self._conn.execute(
+                    "SELECT w.eintrag FROM wissen_norm n JOIN wissen w ON w.frage = n.frage WHERE n.norm = ?",
+                    (normalisiere(frage_low),),
+                ).fetchone()
+        return json.loads(zeile[0]) if zeile else None
+
+    def suche(self, begriff: str, limit: int = 10):
+        """Volltextsuche über Fragen und Antworten (FTS5), beste Treffer zuerst."""
+        begriff = begriff.lower().strip()
+        with self._lock:
+            if self._fts and len(begriff) >= ANKER_LAENGE:
+                zeilen = self._conn.execute(
+                    """
+                    SELECT w.frage, w.eintrag FROM wissen_fts
+                    JOIN wissen w ON w.id = wissen_fts.rowid
+                    WHERE wissen_fts MATCH ? ORDER BY rank LIMIT ?
+                    """,
+                    (_fts_phrase(begriff), limit),
+                ).fetchall()
+            else:
+                zeilen = self._conn.execute(
+                    "SELECT frage, eintrag FROM wissen WHERE instr(frage, ?) > 0 OR instr(lower(antwort), ?) > 0 "
+                    "ORDER BY id LIMIT ?",
+                    (begriff, begriff, limit),
+                ).fetchall()
+        return [(frage, json.loads(eintrag)) for frage, eintrag in zeilen]
+
+    # ---------------------------------------------------------
+    # SCHREIBEN
+    # ---------------------------------------------------------
+
+    def speichere_wissen(self, frage: str, antwort: str, source: str = "user", allow_overwrite: bool = False):
+        frage_low = frage.lower().strip()
+        with self._lock:
+            zeile = self._conn.execute("SELECT eintrag FROM wissen WHERE frage = ?", (frage_low,)).fetchone()
+            existing = json.loads(zeile[0]) if zeile else None
+            if existing and not allow_overwrite:
+                return False
+
+            entry = {
+                "antwort": antwort,
+                "gelernt_am": datetime.now().isoformat(),
+                "häufigkeit": (existing.get("häufigkeit", 0) if existing else 0) + 1,
+                "quelle": source,
+            }
+
+            if source == "core":
+                entry["confidence"] = 1.0
+                entry["status"] = "accepted"
+            else:
+                entry["confidence"] = None  # unbekannt, bis der Eintrag geprüft ist
+                entry["status"] = "pending"
+
+            # Neue Fragen zählen in die Trigramm-Statistik; bestehende behalten ihren Anker
+            zaehler = self._gramm_zaehler([frage_low])
+            anker = _waehle_anker(frage_low, zaehler)
+
+            # ON CONFLICT ... DO UPDATE behält die id (und den Anker) und damit die Treffer-Reihenfolge
+            with self._conn:
+                if existing is None:
+                    self._speichere_zaehler(zaehler)
+                self._conn.execute(
+                    """
+                    INSERT INTO wissen (frage, anker, antwort, eintrag) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(frage) DO UPDATE SET antwort = excluded.antwort, eintrag = excluded.eintrag
+                    """,
+                    (frage_low, anker, antwort, json.dumps(entry, ensure_ascii=False)),
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO wissen_norm (norm, frage) VALUES (?, ?)",
+                    (normalisiere(frage_low), frage_low),
+                )
+        return True
+
+    def get_all(self):
+        """Gibt all das gelernte Wissen zurück (lädt dafür den ganzen Speicher)."""
+        with self._lock:
+            zeilen = self._conn.execute("SELECT frage, eintrag FROM wissen ORDER BY id").fetchall()
+        return {frage: json.loads(eintrag) for frage, eintrag in zeilen}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM wissen").fetchone()[0]
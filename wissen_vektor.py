@@ -0,0 +1,152 @@
+"""
+Semantische Nächste-Nachbarn-Suche über gespeicherte Fragen.
+Offline, ohne Modell: gehashtes TF-IDF (Wörter + Zeichen-Trigramme) in einer
+NumPy-Matrix, abgefragt per (gebündelter) Kosinus-Ähnlichkeit.
+So findet Sulee auch umformulierte Fragen wieder, nicht nur wörtliche Teilstrings.
+"""
+
+import math
+import zlib
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # optional: ohne NumPy bleibt nur die wörtliche Suche
+    np = None
+
+from .text_normalisierung import normalisiere, tokens
+
+
+def ist_verfuegbar() -> bool:
+    return np is not None
+
+
+class VektorIndex:
+    """
+    Hält für jede gespeicherte Frage einen L2-normierten TF-IDF-Vektor.
+
+    dimensionen: Größe des Hash-Raums (Speicher: Einträge x dimensionen x 4 Byte)
+    schwelle:    minimale Kosinus-Ähnlichkeit für einen Treffer
+    """
+
+    def __init__(self, dimensionen: int = 512, schwelle: float = 0.55):
+        if np is None:
+            raise ImportError("numpy wird für den VektorIndex benötigt")
+        self.dimensionen = dimensionen
+        self.schwelle = schwelle
+        self._schluessel = []
+        self._position = {}
+        self._roh = np.zeros((0, dimensionen), dtype=np.float32)       # Term-Frequenzen
+        self._matrix = np.zeros((0, dimensionen), dtype=np.float32)    # gewichtet + normiert
+        self._df = np.zeros(dimensionen, dtype=np.float64)
+        self._idf = np.ones(dimensionen, dtype=np.float32)
+        self._gewichtet_bei = 0
+
+    # ---------------------------------------------------------
+    # VEKTORISIERUNG
+    # ---------------------------------------------------------
+
+    def _merkmale(self, text: str) -> Counter:
+        woerter = tokens(normalisiere(text))
+        merkmale = Counter(f"w:{w}" for w in woerter)
+        for w in woerter:
+            w = f" {w} "
+            merkmale.update(f"c:{w[i:i + 3]}" for i in range(len(w) - 2))
+        return merkmale
+
+    def _tf_vektor(self, text: str):
+        vektor = np.zeros(self.dimensionen, dtype=np.float32)
+        for merkmal, anzahl in self._merkmale(text).items():
+            h = zlib.crc32(merkmal.encode("utf-8"))
+            vorzeichen = 1.0 if h & 0x80000000 else -1.0
+            vektor[h % self.dimensionen] += vorzeichen * (1.0 + math.log(anzahl))
+        return vektor
+
+    def _gewichte(self, roh):
+        gewichtet = roh * self._idf
+        normen = np.linalg.norm(gewichtet, axis=-1, keepdims=True)
+        normen[normen == 0] = 1.0
+        return gewichtet / normen
+
+    def _aktualisiere_idf(self):
+        n = len(self._schluessel)
+        self._idf = (np.log((1.0 + n) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        self._matrix[:n] = self._gewichte(self._roh[:n])
+        self._gewichtet_bei = n
+
+    # ---------------------------------------------------------
+    # AUFBAU
+    # ---------------------------------------------------------
+
+    def _platz_schaffen(self, benoetigt: int):
+        if benoetigt <= len(self._roh):
+            return
+        kapazitaet = max(benoetigt, 2 * len(self._roh), 64)
+        for name in ("_roh", "_matrix"):
+            alt = getattr(self, name)
+            neu = np.zeros((kapazitaet, self.dimensionen), dtype=np.float32)
+            neu[:len(alt)] = alt
+            setattr(self, name, neu)
+
+    def hinzufuegen(self, key: str):
+        """Nimmt eine gespeicherte Frage auf (bekannte Fragen werden ignoriert)."""
+        self.hinzufuegen_viele([key])
+
+    def hinzufuegen_viele(self, keys):
+        neue = [k for k in dict.fromkeys(keys) if k not in self._position]
+        if not neue:
+            return
+        start = len(self._schluessel)
+        self._platz_schaffen(start + len(neue))
+        for i, key in enumerate(neue, start):
+            roh = self._tf_vektor(key)
+            self._roh[i] = roh
+            self._df += roh != 0
+            self._position[key] = i
+            self._schluessel.append(key)
+
+        n = len(self._schluessel)
+        # IDF nur neu berechnen, wenn der Bestand spürbar gewachsen ist (amortisiert O(1))
+        if n >= 1.1 * self._gewichtet_bei or n - self._gewichtet_bei >= 1000:
+            self._aktualisiere_idf()
+        else:
+            self._matrix[start:n] = self._gewichte(self._roh[start:n])
+
+    # ---------------------------------------------------------
+    # SUCHE
+    # ---------------------------------------------------------
+
+    def suche_batch(self, fragen, k: int = 5, schwelle: float | None = None) -> list:
+        """
+        Für jede Frage die bis zu ``k`` ähnlichsten gespeicherten Fragen
+        als Liste von (frage, ähnlichkeit), absteigend sortiert.
+        """
+        schwelle = self.schwelle if schwelle is None else schwelle
+        n = len(self._schluessel)
+        if n == 0 or not fragen:
+            return [[] for _ in fragen]
+
+        anfragen = self._gewichte(np.stack([self._tf_vektor(f) for f in fragen]))
+        aehnlichkeiten = anfragen @ self._matrix[:n].T      # (anfragen x einträge)
+        k = min(k, n)
+        if k < n:
+            top = np.argpartition(-aehnlichkeiten, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n), (len(fragen), 1))
+
+        ergebnisse = []
+        for zeile, indizes in zip(aehnlichkeiten, top):
+            indizes = indizes[np.argsort(-zeile[indizes])]
+            ergebnisse.append([
+                (self._schluessel[i], float(zeile[i])) for i in indizes if zeile[i] >= schwelle
+            ])
+        return ergebnisse
+
+    def suche(self, frage: str, k: int = 5, schwelle: float | None = None) -> list:
+        return self.suche_batch([frage], k=k, schwelle=schwelle)[0]
+
+    def __contains__(self, key):
+        return key in self._position
+
+    def __len__(self):
+        return len(self._schluessel)